@@ -1,138 +1,798 @@
+import codecs
+import hashlib
+import heapq
+import io
+import itertools
+import marshal
+import math
+import mmap
+import os
 import re
+import sqlite3
+import sys
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
+# Common English stop words to filter out from frequency analysis
+STOP_WORDS = frozenset({
+    "the",
+    "a",
+    "an",
+    "and",
+    "or",
+    "but",
+    "in",
+    "on",
+    "at",
+    "to",
+    "for",
+    "with",
+    "by",
+    "about",
+    "as",
+    "into",
+    "like",
+    "through",
+    "after",
+    "over",
+    "between",
+    "out",
+    "of",
+    "is",
+    "are",
+    "was",
+    "were",
+    "be",
+    "been",
+    "being",
+    "have",
+    "has",
+    "had",
+    "do",
+    "does",
+    "did",
+    "this",
+    "that",
+    "these",
+    "those",
+    "it",
+    "its",
+    "from",
+    "there",
+    "their",
+})
+
+# DONE: Implement word extraction using regex
+# Find all words in the content (lowercase for consistency)
+WORD_PATTERN = re.compile(r"\w+")
+## zgodnie z definicją \w to word characters, a \b to granice słowa, więc \b\w+\b to słowo.
+## Maksymalny ciąg znaków \w zawsze zaczyna się i kończy na granicy słowa, więc \w+ znajduje dokładnie te same słowa co \b\w+\b, tylko szybciej.
+
+# DONE: Implement sentence splitting using regex
+# A sentence typically ends with ., !, or ? followed by a space
+# Be careful about abbreviations (e.g., "Dr.", "U.S.A.")
+SENTENCE_PATTERN = re.compile(r"[\w,/ -]+[.!?][ \n]")
+## Zdanie bardzo ciężko zdefiniować ze ze względu na obecność kropek w wielu innych miejscach.
+## dla przykładu "Odliczałem od 1 do 10. 9 pominąłem." znajdują się 2 zdania, a w "Umówiłem się z nią na 9. tak jak dziś." tylko jedno.
+## Ani duże litery, ani typy znaków, ani kropki nie są wystarczające do wyłapania zdań.
+## Dlatego używam regexa który wyłapuje zdania kończące się kropką, wykrzyknikiem lub znakiem zapytania, a następnie spacją lub nową linią,
+## co pozwala wyłapać wszystkie zdania chociaż niektóre w częściach, a także stringi które nie są zdaniami.
+## Jako znaki mogące wystąpić w zdaniu używam liter, cyfr, przecinków, spacji i myślników, co wynika z analizy pliku testowego 
+## i pozwala lekko zredukować niepoprawnie matchowane zdania.
+
+# SENTENCE_PATTERN is slow to search: in a long run of [\w,/ -] characters
+# without a sentence end, every position starts a scan to the end of the run.
+# Only the number of its matches is needed, and that can be counted from the
+# sentence ends alone, see count_sentences().
+SENTENCE_END_PATTERN = re.compile(r"(?<=[\w,/ -])[.!?][ \n]")
+
+# DONE: Implement email extraction using regex
+# Extract all valid email addresses from the content
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9!#$%&'*+-/=?^_`{|}~][A-Za-z0-9!#$%&'*+-/=?^_`{|}~.]*@([A-Za-z0-9][A-Za-z0-9-]*[A-Za-z0-9]\.)+[A-Za-z]{2,}")
+## Regex na email pisany był zgodnie z informacjami z wikipedii.
+## Adres może się zaczynać jednym z legalnych znaków ale bez kropki, po czym może następować dowolna ilość legalnych znaków,
+## a następnie @, po którym następują domeny składajace się z znaków alfanumerycznych i myślników, z czego myślniki nie mogą występować na początku i końcu.
+## każda domena oddzielona jest kropką i może być ich dowowolna niezerowa ilość.
+## Ostania domena to "Top level domain" i z dostępnych mi informacji wszystkie takie domeny sładają się z jedynie, co najmniej dwóch liter.
+
+# DONE: Implement date extraction with multiple formats
+# Detect dates in various formats: YYYY-MM-DD, DD.MM.YYYY, MM/DD/YYYY, etc.
+# Create multiple regex patterns for different date formats
+DATE_PATTERNS = [
+    re.compile(r"\b\d{4}[./-]\d{1,2}[./-]\d{1,2}\b"),
+    re.compile(r"\b\d{1,2}[./-]\d{1,2}[./-]\d{4}\b"),
+    re.compile(r"[A-Z][a-z]{2,8} \d{1,2}, \d{4}"),
+]
+## Jako patterny przyjmuję te które zaczynają się od roku, albo na nim końćzą, a dzień, miesiąc i rok są oddzielone kropką, myślnikiem lub ukośnikiem.
+## Dodatkowo dodaję pattern na daty w formacie "Miesiąc dzień, rok" gdzie miesiąc zaczyna się dużą literą, a reszta jest cyframi.
+
+# DONE: Analyze paragraphs
+# Split the content into paragraphs and count words in each
+# Paragraphs are typically separated by one or more blank lines
+PARAGRAPH_SEPARATOR = re.compile(r"\n\s*\n")
+## Za rozdzielenie akapitów przyjmuję przynajmniej jedną pustą linię, a więc linie w której występują jedynie znaki nowej linii i spacje, 
+## co równocześnie łączy wiele pustych linii w tylko jedno rozdzielenie akapitów.
+
+# Size of the blocks read from the input, in bytes (or characters for text files).
+CHUNK_SIZE = 1 << 20
+# Files larger than this are split into shards of about this many bytes by analyze_corpus.
+SHARD_SIZE = 64 << 20
+# Unfinished lines longer than this many characters are added up to the last
+# place where they can be cut without changing any match, see TextStatistics.feed.
+MAX_LINE_LENGTH = 1 << 20
+
+# A maximal run of ASCII whitespace between two printable ASCII characters, so
+# the run cannot continue into a multi-byte whitespace character.
+_WHITESPACE_RUN = re.compile(rb"(?<=[!-~])[\t-\r\x1c-\x20]+(?=[!-~])")
+# Newlines as open() translates them in text mode.
+_NEWLINE = re.compile(rb"\r\n|\r|\n")
+# A whitespace character followed by one that cannot continue a match across
+# it: no word, email or numeric date contains whitespace, in "May 23, 1977" a
+# space is always followed by a digit, and a sentence end must not start a
+# part of a line, since count_sentences() only counts ends after the start.
+_LINE_CUT = re.compile(r"\s(?=[^\s\d.!?])")
+
+
+def _find_last_cut(text, start, end):
+    """Position of the last _LINE_CUT match in text[start:end], searched from the end in growing windows."""
+    window = 1 << 10
+    while True:
+        window_start = max(start, end - window)
+        cut = None
+        for cut in _LINE_CUT.finditer(text, window_start, end):
+            pass
+        if cut is not None:
+            return cut.start()
+        if window_start == start:
+            return None
+        # A match just before the window looks ahead at its first character.
+        end = window_start + 1
+        window *= 4
+
+
+def count_sentences(text, start=0, end=None):
+    """
+    Count the matches of SENTENCE_PATTERN in text[start:end], in linear time.
+
+    A match is a run of word characters, commas, slashes, spaces and hyphens
+    followed by a sentence end, and such a run can only be cut short at its
+    front by the end of the previous match. So the next match ends at the
+    first sentence end with at least one run character between it and the
+    end of the previous match.
+    """
+    if end is None:
+        end = len(text)
+    count = 0
+    position = start
+    for match in SENTENCE_END_PATTERN.finditer(text, start, end):
+        if match.start() > position:
+            count += 1
+            position = match.end()
+    return count
+
+
+class SpaceSaving:
+    """
+    Approximate counts of the most frequent items in bounded memory (the Space-Saving algorithm).
+
+    At most ``capacity`` items are monitored. A new item replaces the one with
+    the smallest count and takes over that count, so a count is never too low
+    and too high by at most ``error()``, which never exceeds
+    ``total / capacity``. Every item counted more often than that is monitored.
+    """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError(f"Capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.total = 0
+        self.counts = {}
+        # A (count, item) entry per monitored item, the count may be outdated but never too high.
+        self._heap = []
+
+    def add(self, item, count=1):
+        self.total += count
+        counts = self.counts
+        if item in counts:
+            counts[item] += count
+        elif len(counts) < self.capacity:
+            counts[item] = count
+            heapq.heappush(self._heap, (count, item))
+        else:
+            smallest = self._pop_smallest()
+            counts[item] = smallest + count
+            heapq.heappush(self._heap, (smallest + count, item))
+
+    def _pop_smallest(self):
+        heap = self._heap
+        while True:
+            count, item = heap[0]
+            current = self.counts[item]
+            if current == count:
+                heapq.heappop(heap)
+                del self.counts[item]
+                return count
+            heapq.heapreplace(heap, (current, item))
+
+    def error(self):
+        """The largest possible overestimate of any count: the smallest count once all slots are taken."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def merge(self, other):
+        """
+        Add the counts of another summary, as if its items were added to this one.
+
+        An item monitored by only one summary gets the error of the other one
+        added, so counts stay upper bounds, and the errors of both add up.
+        """
+        missing, other_missing = self.error(), other.error()
+        counts = {item: count + other.counts.get(item, other_missing) for item, count in self.counts.items()}
+        for item, count in other.counts.items():
+            if item not in counts:
+                counts[item] = count + missing
+        if len(counts) > self.capacity:
+            counts = dict(heapq.nlargest(self.capacity, counts.items(), key=lambda item: item[1]))
+        self.counts = counts
+        self._heap = [(count, item) for item, count in counts.items()]
+        heapq.heapify(self._heap)
+        self.total += other.total
+        return self
+
+    def most_common(self, n=None):
+        """The ``n`` items with the largest counts (all of them if None), largest first."""
+        if n is None:
+            return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return heapq.nlargest(n, self.counts.items(), key=lambda item: item[1])
+
+    def memory_usage(self):
+        """Approximate number of bytes taken by the counts, the heap and the monitored items."""
+        return _mapping_memory_usage(self.counts) + sys.getsizeof(self._heap) + sum(
+            sys.getsizeof(entry) for entry in self._heap
+        )
+
+
+def _mapping_memory_usage(mapping):
+    return sys.getsizeof(mapping) + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in mapping.items())
+
+
+def count_paragraph(text, start=0, end=None):
+    """
+    The counts of text[start:end] that TextStatistics adds up.
+
+    Returns a tuple (word_count, sentence_count, emails, dates, words) with
+    the dates as a list per pattern of DATE_PATTERNS and the words as a list
+    of their raw forms.
+    """
+    if end is None:
+        end = len(text)
+    words = WORD_PATTERN.findall(text, start, end)
+    return (
+        len(words),
+        count_sentences(text, start, end),
+        [match.group() for match in EMAIL_PATTERN.finditer(text, start, end)],
+        [pattern.findall(text, start, end) for pattern in DATE_PATTERNS],
+        words,
+    )
+
+
+# Part of every cache key, so that changing a pattern invalidates the cached counts.
+# The marshal format of the values can change between Python versions, so an
+# entry written by another version is a miss too.
+_CACHE_KEY = hashlib.blake2b(
+    "\n".join(
+        [
+            *(pattern.pattern for pattern in [WORD_PATTERN, SENTENCE_END_PATTERN, EMAIL_PATTERN, *DATE_PATTERNS]),
+            f"python {sys.version_info[0]}.{sys.version_info[1]}, marshal {marshal.version}",
+        ]
+    ).encode()
+).digest()
+
+
+class AnalysisCache:
+    """
+    Persistent cache of analysis results in an SQLite database.
+
+    Paragraph counts (see count_paragraph) are keyed by a hash of the
+    paragraph text, whole results by a hash of the file content and the
+    options, so a document that changed a little is analyzed again by
+    counting only the paragraphs that changed. Use it as a context manager,
+    or call close() to save the new entries.
+    """
+
+    # Keys looked up in one query, below the smallest SQLite limit on query parameters.
+    BATCH_SIZE = 900
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        # Lookups are random, so keep more of the database in memory than the default 2 MB.
+        self.connection.execute("PRAGMA cache_size = -65536")
+        self.connection.execute("PRAGMA mmap_size = 1073741824")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key BLOB PRIMARY KEY, value BLOB NOT NULL) WITHOUT ROWID"
+        )
+        self.hits = 0
+        self.misses = 0
+        self._pending = {}
+
+    @staticmethod
+    def key(kind, data):
+        return kind + hashlib.blake2b(data, digest_size=16, key=_CACHE_KEY).digest()
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """The cached values of those of ``keys`` that are in the cache, as a dict."""
+        found = {}
+        missing = []
+        for key in keys:
+            value = self._pending.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        for i in range(0, len(missing), self.BATCH_SIZE):
+            batch = missing[i:i + self.BATCH_SIZE]
+            query = f"SELECT key, value FROM entries WHERE key IN ({', '.join('?' * len(batch))})"
+            found.update(self.connection.execute(query, batch))
+        hits = sum(key in found for key in keys)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return {key: marshal.loads(value) for key, value in found.items()}
+
+    def put(self, key, value):
+        self._pending[key] = marshal.dumps(value)
+        if len(self._pending) >= 10_000:
+            self.flush()
+
+    def flush(self):
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?)", self._pending.items())
+        self._pending.clear()
+
+    def count_paragraphs(self, text, segments):
+        """
+        count_paragraph(text, start, end) for each (start, end) of ``segments``.
+
+        The counts of a text seen before come from the cache, all segments
+        are looked up together.
+        """
+        keys = [self.key(b"p", text[start:end].encode("utf-8", "surrogatepass")) for start, end in segments]
+        found = self.get_many(keys)
+        for key, (start, end) in zip(keys, segments):
+            counts = found.get(key)
+            if counts is None:
+                counts = count_paragraph(text, start, end)
+                word_count, sentence_count, emails, dates, words = counts
+                # Words never contain spaces, a single string is faster to save and load than a list.
+                found[key] = word_count, sentence_count, emails, dates, " ".join(words)
+                self.put(key, found[key])
+            else:
+                word_count, sentence_count, emails, dates, words = counts
+                counts = word_count, sentence_count, emails, dates, words.split()
+            yield counts
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TextStatistics:
+    """
+    Running totals of analyze_text_file, fed one paragraph at a time.
+
+    No word, email or date can contain a newline and a sentence can only end
+    with one, so every match lies inside a single paragraph plus the first
+    character of the separator after it. Scanning paragraph by paragraph
+    therefore finds exactly what scanning the whole content would, while each
+    paragraph is read only once for words, counts, frequencies and its size.
+    Since the same holds for single lines, a long paragraph can also be added
+    line by line.
+
+    With ``word_error`` the frequent words are only approximated, in a
+    SpaceSaving summary of ``ceil(1 / word_error)`` words, so that a count is
+    at most ``word_error`` times the number of counted words too high (see
+    result()). Otherwise every distinct word form is counted exactly.
+
+    With an AnalysisCache, paragraphs counted in an earlier run are not
+    scanned again.
+    """
+
+    def __init__(self, word_error=None, cache=None):
+        self.word_count = 0
+        self.sentence_count = 0
+        self.emails = []
+        self.dates = [[] for _ in DATE_PATTERNS]
+        self.paragraph_sizes = {}
+        # Raw word forms, lowercased only once per distinct form in result().
+        self.words = Counter()
+        self.cache = cache
+        self.word_summary = None
+        if word_error is not None:
+            if not 0 < word_error <= 1:
+                raise ValueError(f"word_error must be in (0, 1], got {word_error}")
+            # self.words then only holds the forms of the last chunk fed.
+            self.word_summary = SpaceSaving(math.ceil(1 / word_error))
+        # Words in the lines already added of a paragraph that is not finished yet.
+        self._paragraph_size = 0
+        # The text fed but not added yet, which has no newline before
+        # self._scanned and no place to cut a line before self._cut_from.
+        self._rest = ""
+        self._scanned = 0
+        self._cut_from = 0
+
+    def add_paragraph(self, text, start=0, end=None, complete=True):
+        """
+        Add the paragraph text[start:end].
+
+        ``end`` should include the first character of the following separator
+        (a newline), which can end the last sentence of the paragraph. With
+        ``complete=False`` the text is only the next few lines of a paragraph
+        (ending with a newline) and the following call continues it.
+        """
+        if end is None:
+            end = len(text)
+        self._add_paragraphs(text, [(start, end)], complete)
+
+    def _add_paragraphs(self, text, segments, last_complete=True):
+        """Add the paragraphs text[start:end] for each (start, end) of ``segments``."""
+        if self.cache is None:
+            all_counts = (count_paragraph(text, start, end) for start, end in segments)
+        else:
+            all_counts = self.cache.count_paragraphs(text, segments)
+        last = len(segments) - 1
+        for index, (word_count, sentence_count, emails, dates, words) in enumerate(all_counts):
+            self.word_count += word_count
+            self.words.update(words)
+            self._paragraph_size += word_count
+            if index < last or last_complete:
+                self.paragraph_sizes[len(self.paragraph_sizes)] = self._paragraph_size
+                self._paragraph_size = 0
+
+            self.sentence_count += sentence_count
+            self.emails.extend(emails)
+            for all_dates, paragraph_dates in zip(self.dates, dates):
+                all_dates.extend(paragraph_dates)
+
+    def feed(self, chunk, final=False):
+        """
+        Add the next chunk of the input, up to what no later chunk can change.
+
+        A separator is only taken once the whitespace run it belongs to is
+        followed by other text, since more whitespace could still extend it.
+        Of an unfinished paragraph the complete lines are added, and of a line
+        longer than MAX_LINE_LENGTH everything up to the last whitespace where
+        _LINE_CUT allows to cut it. The rest is kept for the next call, with
+        the offsets already searched, so every character is scanned once. With
+        ``final`` the chunk is the end of the input and everything is added.
+        """
+        text = self._rest + chunk
+        end = len(text) if final else len(text.rstrip())
+        segments = []
+        start = 0
+        for separator in PARAGRAPH_SEPARATOR.finditer(text, self._scanned, end):
+            segments.append((start, separator.start() + 1))
+            start = separator.end()
+        if final:
+            segments.append((start, len(text)))
+            self._add_paragraphs(text, segments)
+            self._summarize_words()
+            self._rest = ""
+            self._scanned = self._cut_from = 0
+            return
+
+        cut_from = max(start, self._cut_from)
+        line_end = text.rfind("\n", max(start, self._scanned), end)
+        if line_end != -1:
+            cut_from = line_end + 1
+        if end - cut_from > MAX_LINE_LENGTH:
+            cut = _find_last_cut(text, cut_from, end)
+            if cut is not None:
+                line_end = cut
+            # A cut found later must start after the last character searched.
+            cut_from = max(cut_from, end - 1)
+        if line_end != -1:
+            segments.append((start, line_end + 1))
+            start = line_end + 1
+        self._add_paragraphs(text, segments, last_complete=line_end == -1)
+        self._summarize_words()
+        self._rest = text[start:]
+        self._scanned = end - start
+        self._cut_from = max(cut_from - start, 0)
+
+    def _summarize_words(self):
+        """Move the word forms counted so far into the approximate summary, if there is one."""
+        if self.word_summary is None:
+            return
+        for word, count in self.words.items():
+            word = word.lower()
+            if word not in STOP_WORDS and len(word) > 2:
+                self.word_summary.add(word, count)
+        self.words.clear()
+
+    def feed_chunks(self, chunks):
+        """Feed all the chunks of one input, then finish it."""
+        for chunk in chunks:
+            self.feed(chunk)
+        self.feed("", final=True)
+        return self
+
+    def merge(self, other):
+        """Add the statistics of a text that follows this one after a paragraph break."""
+        self.word_count += other.word_count
+        self.sentence_count += other.sentence_count
+        self.emails.extend(other.emails)
+        for dates, other_dates in zip(self.dates, other.dates):
+            dates.extend(other_dates)
+        offset = len(self.paragraph_sizes)
+        for index, size in other.paragraph_sizes.items():
+            self.paragraph_sizes[offset + index] = size
+        self.words.update(other.words)
+        if self.word_summary is not None:
+            self._summarize_words()
+            other._summarize_words()
+            self.word_summary.merge(other.word_summary)
+        return self
+
+    def result(self, top_k=None):
+        """
+        The analysis results, with only the ``top_k`` most frequent words if given.
+
+        In the approximate mode the frequent words are ordered from the most
+        frequent one and two more keys are added: "frequent_words_error", by
+        how much any of their counts may be too high, and
+        "frequent_words_memory", the bytes taken by the summary.
+        """
+        if self.word_summary is not None:
+            self._summarize_words()
+            frequent_words = {
+                word: count for word, count in self.word_summary.most_common(top_k) if count > 1
+            }
+            result = self._result(frequent_words)
+            result["frequent_words_error"] = self.word_summary.error()
+            result["frequent_words_memory"] = self.word_summary.memory_usage()
+            return result
+
+        # DONE: Calculate word frequencies
+        # Count occurrences of each word, excluding stop words and short words
+        # Use the Counter class from collections
+        word_counter = Counter()
+        for word, count in self.words.items():
+            word_counter[word.lower()] += count
+        frequent_words = {}
+        for word, count in word_counter.items():
+            if word not in STOP_WORDS and len(word) > 2 and count > 1:
+                frequent_words[word] = count
+        ## Wykonuję dokładnie treść polecenia, gdzie za słowa krótkie uznaję te o długości 2 i krótszej.
+        if top_k is not None:
+            frequent_words = dict(heapq.nlargest(top_k, frequent_words.items(), key=lambda item: item[1]))
+        return self._result(frequent_words)
+
+    def _result(self, frequent_words):
+        return {
+            "word_count": self.word_count,
+            "sentence_count": self.sentence_count,
+            "emails": self.emails,
+            "frequent_words": frequent_words,
+            "dates": [date for dates in self.dates for date in dates],
+            "paragraph_sizes": self.paragraph_sizes,
+        }
+
+
+def read_chunks(source, chunk_size=CHUNK_SIZE):
+    """
+    Yield the text of a path, a file object or a bytes-like/mmap object in chunks.
+
+    Bytes are decoded as UTF-8 incrementally and newlines are translated to
+    "\\n" like open() does in text mode, also when a multi-byte character or
+    a "\\r\\n" pair is split between two chunks. Text file objects are read
+    as they are.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            yield from read_chunks(file, chunk_size)
+        return
+
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        with memoryview(source) as view:
+            blocks = (bytes(view[i:i + chunk_size]) for i in range(0, len(view), chunk_size))
+            yield from _decode(blocks)
+        return
+
+    blocks = iter(lambda: source.read(chunk_size), source.read(0))
+    first = next(blocks, None)
+    if first is None:
+        return
+    if isinstance(first, str):
+        yield first
+        yield from blocks
+    else:
+        yield from _decode(itertools.chain([first], blocks))
+
+
+def _decode(blocks):
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(), translate=True)
+    for block in blocks:
+        yield decoder.decode(block)
+    yield decoder.decode(b"", final=True)
+
+
+def _file_digest(source, options, chunk_size):
+    """A cache key for the content of a path or bytes-like source and the options, None for file objects."""
+    digest = hashlib.blake2b(repr(options).encode(), digest_size=16, key=_CACHE_KEY)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            for block in iter(lambda: file.read(chunk_size), b""):
+                digest.update(block)
+    elif isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        digest.update(source)
+    else:
+        return None
+    return b"f" + digest.digest()
+
+
+def analyze_text_file(
+    filename, chunk_size: int = CHUNK_SIZE, word_error: float = None, top_k: int = None, cache=None
+) -> dict:
+    """
+    Analyze a text file, reading it in chunks of ``chunk_size``.
+
+    ``filename`` may also be a binary or text file object, or a bytes-like or
+    mmap object with UTF-8 text. Memory use is bounded by the chunk size,
+    MAX_LINE_LENGTH (or the longest line that cannot be cut, see
+    TextStatistics.feed), the word frequency table and the emails and dates found.
+
+    The word frequency table grows with the number of distinct words; with
+    ``word_error`` it is replaced by an approximate one of bounded size, see
+    TextStatistics. ``top_k`` limits "frequent_words" to the most frequent words.
+
+    With an AnalysisCache the result of an unchanged path or bytes content is
+    returned from the cache, and of a changed one only the new paragraphs are
+    counted.
+    """
+    digest = None
+    if cache is not None:
+        try:
+            digest = _file_digest(filename, (word_error, top_k), chunk_size)
+        except Exception as e:
+            return {"error": f"Could not read file: {str(e)}"}
+        result = cache.get(digest) if digest is not None else None
+        if result is not None:
+            return result
+
+    statistics = TextStatistics(word_error, cache)
+    chunks = read_chunks(filename, chunk_size)
+    while True:
+        try:
+            chunk = next(chunks, None)
+        except Exception as e:
+            return {"error": f"Could not read file: {str(e)}"}
+        if chunk is None:
+            break
+        statistics.feed(chunk)
+    statistics.feed("", final=True)
+    result = statistics.result(top_k)
+    if digest is not None:
+        cache.put(digest, result)
+    return result
+
+
+def analyze_text_files(
+    filenames, chunk_size: int = CHUNK_SIZE, word_error: float = None, top_k: int = None, cache=None
+) -> list[dict]:
+    """Analyze many text files one after another, returning the result of analyze_text_file for each of them."""
+    return [analyze_text_file(filename, chunk_size, word_error, top_k, cache) for filename in filenames]
+
+
+def find_shards(path, shard_size=SHARD_SIZE):
+    """
+    Split a file into (start, end) byte ranges of about ``shard_size`` bytes at paragraph breaks.
+
+    Every range but the last ends just after the first newline of a paragraph
+    separator, the next range starts just after its last newline, so each
+    shard can be analyzed on its own exactly as analyze_text_file would
+    analyze that part of the whole file.
+    """
+    size = os.path.getsize(path)
+    shards = []
+    start = 0
+    if size > shard_size:
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            while size - start > shard_size:
+                paragraph_break = _find_paragraph_break(data, start + shard_size)
+                if paragraph_break is None:
+                    break
+                end, next_start = paragraph_break
+                shards.append((start, end))
+                start = next_start
+    shards.append((start, size))
+    return shards
+
+
+def _find_paragraph_break(data, position):
+    # A whitespace run with two newlines is exactly one separator match: it
+    # starts at the first newline and ends after the last one.
+    for run in _WHITESPACE_RUN.finditer(data, position):
+        newlines = list(_NEWLINE.finditer(run.group()))
+        if len(newlines) >= 2:
+            return run.start() + newlines[0].end(), run.start() + newlines[-1].end()
+    return None
+
+
+def _analyze_shard(path, start, end, chunk_size, word_error):
+    with open(path, "rb") as file:
+        file.seek(start)
+
+        def blocks():
+            remaining = end - start
+            while remaining > 0:
+                block = file.read(min(chunk_size, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                yield block
+
+        return TextStatistics(word_error).feed_chunks(_decode(blocks()))
+
+
+def analyze_corpus(
+    paths, workers=None, shard_size=SHARD_SIZE, chunk_size=CHUNK_SIZE, word_error=None, top_k=None
+) -> dict:
+    """
+    Analyze many files in a pool of ``workers`` processes and merge the results.
+
+    Files larger than ``shard_size`` are split at paragraph breaks (see
+    find_shards) and their shards are analyzed in parallel as well. The result
+    has the keys of analyze_text_file for all the files taken one after the
+    other: counts and frequencies are summed, emails and dates concatenated
+    and paragraphs numbered through the whole corpus. Files that could not be
+    read are left out and listed under "errors", with the same message that
+    analyze_text_file would return. ``word_error`` and ``top_k`` are passed on
+    as for analyze_text_file; approximate summaries of shards are merged,
+    adding up their errors.
+    """
+    statistics = TextStatistics(word_error)
+    errors = {}
+    with ProcessPoolExecutor(workers) as executor:
+        files = []
+        for path in paths:
+            try:
+                shards = find_shards(path, shard_size)
+            except Exception as e:
+                errors[str(path)] = f"Could not read file: {str(e)}"
+                continue
+            futures = [
+                executor.submit(_analyze_shard, path, start, end, chunk_size, word_error)
+                for start, end in shards
+            ]
+            files.append((path, futures))
+
+        for path, futures in files:
+            try:
+                file_statistics = futures[0].result()
+                for future in futures[1:]:
+                    file_statistics.merge(future.result())
+            except Exception as e:
+                errors[str(path)] = f"Could not read file: {str(e)}"
+                continue
+            statistics.merge(file_statistics)
+
+    result = statistics.result(top_k)
+    result["errors"] = errors
+    return result
 
-def analyze_text_file(filename: str) -> dict:
-    try:
-        with open(filename, "r", encoding="utf-8") as file:
-            content = file.read()
-    except Exception as e:
-        return {"error": f"Could not read file: {str(e)}"}
-    # Common English stop words to filter out from frequency analysis
-    stop_words = {
-        "the",
-        "a",
-        "an",
-        "and",
-        "or",
-        "but",
-        "in",
-        "on",
-        "at",
-        "to",
-        "for",
-        "with",
-        "by",
-        "about",
-        "as",
-        "into",
-        "like",
-        "through",
-        "after",
-        "over",
-        "between",
-        "out",
-        "of",
-        "is",
-        "are",
-        "was",
-        "were",
-        "be",
-        "been",
-        "being",
-        "have",
-        "has",
-        "had",
-        "do",
-        "does",
-        "did",
-        "this",
-        "that",
-        "these",
-        "those",
-        "it",
-        "its",
-        "from",
-        "there",
-        "their",
-    }
-
-    # DONE: Implement word extraction using regex
-    # Find all words in the content (lowercase for consistency)
-
-    word_pattern = r"\b\w+\b"
-    ## zgodnie z definicją \w to word characters, a \b to granice słowa, więc \b\w+\b to słowo.
-    word_count = len(re.findall(word_pattern, content))
-    ## używam re.findall aby znaleźć wszystkie słowa w treści i liczę ich ilość.
-
-
-    # DONE: Implement sentence splitting using regex
-    # A sentence typically ends with ., !, or ? followed by a space
-    # Be careful about abbreviations (e.g., "Dr.", "U.S.A.")
-    sentence_pattern = r"[\w,/ -]+[.!?][ \n]"
-    ## Zdanie bardzo ciężko zdefiniować ze ze względu na obecność kropek w wielu innych miejscach.
-    ## dla przykładu "Odliczałem od 1 do 10. 9 pominąłem." znajdują się 2 zdania, a w "Umówiłem się z nią na 9. tak jak dziś." tylko jedno.
-    ## Ani duże litery, ani typy znaków, ani kropki nie są wystarczające do wyłapania zdań.
-    ## Dlatego używam regexa który wyłapuje zdania kończące się kropką, wykrzyknikiem lub znakiem zapytania, a następnie spacją lub nową linią,
-    ## co pozwala wyłapać wszystkie zdania chociaż niektóre w częściach, a także stringi które nie są zdaniami.
-    ## Jako znaki mogące wystąpić w zdaniu używam liter, cyfr, przecinków, spacji i myślników, co wynika z analizy pliku testowego 
-    ## i pozwala lekko zredukować niepoprawnie matchowane zdania.
-    sentences = [match.group() for match in re.finditer(sentence_pattern, content)]
-    sentence_count = len([s for s in sentences if s.strip()])
-
-    # DONE: Implement email extraction using regex
-    # Extract all valid email addresses from the content
-    email_pattern = r"[A-Za-z0-9!#$%&'*+-/=?^_`{|}~][A-Za-z0-9!#$%&'*+-/=?^_`{|}~.]*@([A-Za-z0-9][A-Za-z0-9-]*[A-Za-z0-9]\.)+[A-Za-z]{2,}"
-    ## Regex na email pisany był zgodnie z informacjami z wikipedii.
-    ## Adres może się zaczynać jednym z legalnych znaków ale bez kropki, po czym może następować dowolna ilość legalnych znaków,
-    ## a następnie @, po którym następują domeny składajace się z znaków alfanumerycznych i myślników, z czego myślniki nie mogą występować na początku i końcu.
-    ## każda domena oddzielona jest kropką i może być ich dowowolna niezerowa ilość.
-    ## Ostania domena to "Top level domain" i z dostępnych mi informacji wszystkie takie domeny sładają się z jedynie, co najmniej dwóch liter.
-
-    emails = [ match.group() for match in re.finditer(email_pattern, content)]
-
-    # DONE: Calculate word frequencies
-    # Count occurrences of each word, excluding stop words and short words
-    # Use the Counter class from collections
-    frequent_words = {}
-    word_counter = Counter(match.group().lower() for match in re.finditer(word_pattern, content))
-    for word, count in word_counter.items():
-        if word not in stop_words and len(word) > 2 and count > 1:
-            frequent_words[word] = count
-    ## Wykonuję dokładnie treść polecenia, gdzie za słowa krótkie uznaję te o długości 2 i krótszej.
-
-    # DONE: Implement date extraction with multiple formats
-    # Detect dates in various formats: YYYY-MM-DD, DD.MM.YYYY, MM/DD/YYYY, etc.
-    # Create multiple regex patterns for different date formats
-    date_patterns = [r"\b\d{4}[./-]\d{1,2}[./-]\d{1,2}\b", r"\b\d{1,2}[./-]\d{1,2}[./-]\d{4}\b", r"[A-Z][a-z]{2,8} \d{1,2}, \d{4}"]
-    ## Jako patterny przyjmuję te które zaczynają się od roku, albo na nim końćzą, a dzień, miesiąc i rok są oddzielone kropką, myślnikiem lub ukośnikiem.
-    ## Dodatkowo dodaję pattern na daty w formacie "Miesiąc dzień, rok" gdzie miesiąc zaczyna się dużą literą, a reszta jest cyframi.
-    dates = [ match.group() for pattern in date_patterns for match in re.finditer(pattern, content)]
-
-    # DONE: Analyze paragraphs
-    # Split the content into paragraphs and count words in each
-    # Paragraphs are typically separated by one or more blank lines
-    paragraphs = re.split(r"\n\s*\n", content)
-    ## Za rozdzielenie akapitów przyjmuję przynajmniej jedną pustą linię, a więc linie w której występują jedynie znaki nowej linii i spacje, 
-    ## co równocześnie łączy wiele pustych linii w tylko jedno rozdzielenie akapitów.
-    paragraph_sizes = {}
-    for i, paragraph in enumerate(paragraphs):
-        paragraph_size = 0
-        for match in re.finditer(word_pattern, paragraph):
-            paragraph_size += 1
-        paragraph_sizes[i] = paragraph_size
-
-    return {
-        "word_count": word_count,
-        "sentence_count": sentence_count,
-        "emails": emails,
-        "frequent_words": frequent_words,
-        "dates": dates,
-        "paragraph_sizes": paragraph_sizes,
-    }
 
 if __name__ == "__main__":
     # Example usage
     result = analyze_text_file("python-labs\\lab_1\\tests\\test_file.md")
     # print(result)
-
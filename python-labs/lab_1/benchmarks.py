@@ -0,0 +1,720 @@
+"""
+Benchmarks for the lab_1 modules.
+
+Run them from the python-labs directory, either all at once or by name:
+
+    python -m lab_1.benchmarks
+    python -m lab_1.benchmarks build_dfa
+
+The size of the generated text corpus (in MB, 500 by default) can be set with
+the CORPUS_MB environment variable.
+"""
+import gc
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from lab_1.build_dfa import (
+    Alternative,
+    CharClass,
+    CompiledDFA,
+    Concatenation,
+    KleeneStar,
+    LazyDFA,
+    RegEx,
+    Symbol,
+    build_dfa,
+    build_multi_dfa,
+    derivative_cache,
+)
+from lab_1 import regex_parser
+from lab_1.extract_links import LINK_PATTERN, extract_links, extract_links_batch, extract_links_stream
+from lab_1.link_pipeline import LinkPipeline, normalize_url
+from lab_1.parse_publication import AUTHOR_PATTERN, PUBLICATION_PATTERN, parse_publication, parse_publication_batch
+from lab_1.analyze_text_file import (
+    CHUNK_SIZE,
+    AnalysisCache,
+    TextStatistics,
+    _mapping_memory_usage,
+    analyze_corpus,
+    analyze_text_file,
+    read_chunks,
+)
+
+
+def _balanced(node_class, items):
+    """Combine the items pairwise into a balanced tree of binary nodes."""
+    while len(items) > 1:
+        items = [
+            node_class(items[i], items[i + 1]) if i + 1 < len(items) else items[i]
+            for i in range(0, len(items), 2)
+        ]
+    return items[0]
+
+
+def _count_nodes(regex):
+    """Count distinct nodes of an (interned) regex without recursion."""
+    seen = {regex}
+    stack = [regex]
+    while stack:
+        node = stack.pop()
+        for child in node._key[1:]:
+            if isinstance(child, RegEx) and child not in seen:
+                seen.add(child)
+                stack.append(child)
+    return len(seen)
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def benchmark_build_dfa(words=1500, word_length=10, star_length=600, seed=0):
+    """Build DFAs for regexes with thousands of nodes."""
+    rng = random.Random(seed)
+    alphabet = "abcdef"
+
+    dictionary = _balanced(
+        Alternative,
+        [
+            _balanced(Concatenation, [Symbol(rng.choice(alphabet)) for _ in range(word_length)])
+            for _ in range(words)
+        ],
+    )
+    long_star = KleeneStar(
+        _balanced(Concatenation, [Symbol(rng.choice(alphabet)) for _ in range(star_length)])
+    )
+    a_or_b = Alternative(Symbol("a"), Symbol("b"))
+    nth_from_end = Concatenation(KleeneStar(a_or_b), Symbol("a"))
+    for _ in range(9):
+        nth_from_end = Concatenation(nth_from_end, a_or_b)
+
+    cases = [
+        (f"{words} words of length {word_length}", dictionary, set(alphabet)),
+        (f"star of a {star_length}-symbol word", long_star, set(alphabet)),
+        ("(a|b)*a(a|b){9}", nth_from_end, {"a", "b"}),
+    ]
+    print("build_dfa:")
+    for name, regex, symbols in cases:
+        dfa, elapsed = _timed(build_dfa, regex, symbols)
+        print(
+            f"  {name:<32} {_count_nodes(regex):>7} distinct nodes "
+            f"{len(dfa.states):>6} states {elapsed:8.3f} s"
+        )
+
+
+def benchmark_derivative_cache(alphabet_size=60, suffix_length=5):
+    """Compare build_dfa with and without the derivative cache on a large alphabet."""
+    alphabet = [chr(0x100 + i) for i in range(alphabet_size)]
+    any_symbol = _balanced(Alternative, [Symbol(symbol) for symbol in alphabet])
+    # Σ*aΣ{k}: every state is a union of shifted suffixes sharing the same Σ subterms.
+    regex = Concatenation(KleeneStar(any_symbol), Symbol(alphabet[0]))
+    for _ in range(suffix_length):
+        regex = Concatenation(regex, any_symbol)
+
+    print(f"derivative cache ({alphabet_size} symbols, {_count_nodes(regex)} distinct nodes):")
+    previous_size = derivative_cache.maxsize
+    try:
+        for maxsize in (0, 1024, None):
+            derivative_cache.clear()
+            derivative_cache.resize(maxsize)
+            dfa, elapsed = _timed(build_dfa, regex, set(alphabet))
+            print(
+                f"  maxsize={str(maxsize):<6} {len(dfa.states):>6} states {elapsed:8.3f} s "
+                f"hits={derivative_cache.hits} misses={derivative_cache.misses}"
+            )
+    finally:
+        derivative_cache.clear()
+        derivative_cache.resize(previous_size)
+
+
+def _accepts_throughput(dfa, strings):
+    start = time.perf_counter()
+    for string in strings:
+        dfa.accepts(string)
+    elapsed = time.perf_counter() - start
+    return sum(map(len, strings)) / elapsed
+
+
+def benchmark_minimize(words=300, strings=2000, string_length=200, seed=0):
+    """Compare state counts and accepts() throughput before and after minimize()."""
+    rng = random.Random(seed)
+    alphabet = "abcdef"
+    keywords = [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(3, 8))) for _ in range(words)
+    ]
+    keyword_union = _balanced(
+        Alternative,
+        [_balanced(Concatenation, [Symbol(symbol) for symbol in word]) for word in keywords],
+    )
+    any_symbol = _balanced(Alternative, [Symbol(symbol) for symbol in alphabet])
+    a_or_b = Alternative(Symbol("a"), Symbol("b"))
+    cases = [
+        # Σ*(w1|...|wn): "ends with a keyword", tails of one keyword are often
+        # covered by Σ*(...) itself, which derivatives cannot see syntactically.
+        (
+            f"Σ* and {words} keywords",
+            Concatenation(KleeneStar(any_symbol), keyword_union),
+            alphabet,
+        ),
+        # The same language spelled in three different ways.
+        (
+            "((a*b*)*|(a|b)*|(a*|b)*)c(a|b)*",
+            Concatenation(
+                Alternative(
+                    KleeneStar(Concatenation(KleeneStar(Symbol("a")), KleeneStar(Symbol("b")))),
+                    Alternative(
+                        KleeneStar(a_or_b),
+                        KleeneStar(Alternative(KleeneStar(Symbol("a")), Symbol("b"))),
+                    ),
+                ),
+                Concatenation(Symbol("c"), KleeneStar(a_or_b)),
+            ),
+            "abc",
+        ),
+    ]
+
+    print("minimize:")
+    for name, regex, symbols in cases:
+        inputs = [
+            "".join(rng.choice(symbols) for _ in range(string_length)) for _ in range(strings)
+        ]
+        dfa, build_time = _timed(build_dfa, regex, set(symbols))
+        minimal, minimize_time = _timed(dfa.minimize)
+        print(
+            f"  {name:<36} {len(dfa.states):>6} -> {len(minimal.states):>6} states "
+            f"(build {build_time:.3f} s, minimize {minimize_time:.3f} s)"
+        )
+        print(
+            f"  {'':<36} accepts() {_accepts_throughput(dfa, inputs):>12,.0f} chars/s before, "
+            f"{_accepts_throughput(minimal, inputs):>12,.0f} chars/s after"
+        )
+
+
+def benchmark_compiled_dfa(megabytes=4, seed=0):
+    """Compare DFA.accepts with the table-driven CompiledDFA on multi-megabyte inputs."""
+    rng = random.Random(seed)
+    a = Symbol("a")
+    b = Symbol("b")
+    # (a|b)*abb
+    regex = Concatenation(
+        Concatenation(Concatenation(KleeneStar(Alternative(a, b)), a), b), b
+    )
+    dfa = build_dfa(regex, {"a", "b"}).minimize()
+    compiled = dfa.compile()
+
+    size = megabytes * 1024 * 1024
+    text = "".join(rng.choice("ab") for _ in range(size - 3)) + "abb"
+    data = text.encode("ascii")
+
+    print(f"compiled DFA ((a|b)*abb, {megabytes} MB input, {compiled.class_count} classes):")
+    for name, function, argument in [
+        ("DFA.accepts(str)", dfa.accepts, text),
+        ("CompiledDFA.accepts(str)", compiled.accepts, text),
+        ("CompiledDFA.accepts(bytes)", compiled.accepts, data),
+    ]:
+        result, elapsed = _timed(function, argument)
+        assert result
+        print(f"  {name:<28} {size / elapsed:>14,.0f} chars/s")
+
+
+def benchmark_lazy_dfa(alphabet_size=0x10000, strings=2000, string_length=100, seed=0):
+    """Compare eager build_dfa with LazyDFA when the alphabet is Unicode-sized."""
+    rng = random.Random(seed)
+    alphabet = {chr(codepoint) for codepoint in range(alphabet_size)}
+    a = Symbol("a")
+    b = Symbol("b")
+    # (a|b)*abb
+    regex = Concatenation(Concatenation(Concatenation(KleeneStar(Alternative(a, b)), a), b), b)
+    inputs = ["".join(rng.choice("ab") for _ in range(string_length)) for _ in range(strings)]
+
+    print(f"lazy DFA ((a|b)*abb over {alphabet_size} symbols, {strings} strings):")
+    dfa, build_time = _timed(build_dfa, regex, alphabet)
+    _, match_time = _timed(lambda: [dfa.accepts(string) for string in inputs])
+    print(f"  build_dfa  {build_time:8.3f} s build, {match_time:8.3f} s matching")
+
+    lazy = LazyDFA(regex)
+    _, match_time = _timed(lambda: [lazy.accepts(string) for string in inputs])
+    print(
+        f"  LazyDFA    {0:8.3f} s build, {match_time:8.3f} s matching, "
+        f"{lazy.computed} transitions computed"
+    )
+
+
+def benchmark_char_classes(alphabet_size=0x3000):
+    """Compare per-symbol construction with CharClass partitions for [a-z0-9]+@[a-z0-9]+\\.[a-z]+."""
+    alphabet = {chr(codepoint) for codepoint in range(alphabet_size)}
+    letters = [chr(codepoint) for codepoint in range(ord("a"), ord("z") + 1)]
+    digits = [chr(codepoint) for codepoint in range(ord("0"), ord("9") + 1)]
+
+    def email(word, domain):
+        return _balanced(
+            Concatenation,
+            [
+                word, KleeneStar(word), Symbol("@"), word, KleeneStar(word),
+                Symbol("."), domain, KleeneStar(domain),
+            ],
+        )
+
+    chains = email(
+        _balanced(Alternative, [Symbol(symbol) for symbol in letters + digits]),
+        _balanced(Alternative, [Symbol(symbol) for symbol in letters]),
+    )
+    classes = email(CharClass([("a", "z"), ("0", "9")]), CharClass([("a", "z")]))
+
+    print("char classes ([a-z0-9]+@[a-z0-9]+\\.[a-z]+):")
+    for name, regex, symbols in [
+        (f"Alternative chains, {alphabet_size} symbols", chains, alphabet),
+        (f"CharClass, {alphabet_size} symbols", classes, alphabet),
+        ("CharClass, all of Unicode", classes, None),
+    ]:
+        dfa, elapsed = _timed(build_dfa, regex, symbols)
+        assert dfa.accepts("john.doe@example.com") is False
+        assert dfa.accepts("jd42@example.com")
+        print(
+            f"  {name:<36} {len(dfa.states):>4} states {len(dfa.alphabet):>3} labels "
+            f"{len(dfa.transitions):>5} transitions {elapsed:8.3f} s"
+        )
+
+
+def benchmark_regex_compile(patterns=10_000, seed=0):
+    """Measure regex_parser.compile throughput for distinct patterns, cold and cached."""
+    rng = random.Random(seed)
+    templates = [
+        "{word}[0-9]{{{low},{high}}}",
+        "(?:{word}|{other})+\\.[a-z]{{2,4}}",
+        "[a-z]*{word}.*",
+        "{word}\\d+-\\w*{other}?",
+    ]
+    texts = set()
+    while len(texts) < patterns:
+        texts.add(
+            rng.choice(templates).format(
+                word="".join(rng.choice("abcdefgh") for _ in range(rng.randint(2, 6))),
+                other="".join(rng.choice("xyz") for _ in range(rng.randint(1, 3))),
+                low=rng.randint(0, 2),
+                high=rng.randint(2, 5),
+            )
+        )
+    texts = sorted(texts)
+
+    print(f"regex compile ({patterns} distinct patterns):")
+    _, elapsed = _timed(lambda: [regex_parser.parse(text) for text in texts])
+    print(f"  parse only           {patterns / elapsed:>10,.0f} patterns/s")
+
+    previous_size = regex_parser.compile.cache_info().maxsize
+    regex_parser.compile.cache_clear()
+    _, elapsed = _timed(lambda: [regex_parser.compile(text) for text in texts])
+    print(f"  compile, cold cache  {patterns / elapsed:>10,.0f} patterns/s")
+    _, elapsed = _timed(lambda: [regex_parser.compile(text) for text in texts[-previous_size:]])
+    print(f"  compile, cache hits  {min(patterns, previous_size) / elapsed:>10,.0f} patterns/s")
+    print(f"  {regex_parser.compile.cache_info()}")
+    regex_parser.compile.cache_clear()
+
+
+def benchmark_dfa_artifact(words=2000, seed=0):
+    """Compare building a big DFA from scratch with loading its saved artifact."""
+    rng = random.Random(seed)
+    pattern = "|".join(
+        "".join(rng.choice("abcdefghij") for _ in range(rng.randint(4, 12))) + "[0-9]*"
+        for _ in range(words)
+    )
+
+    print(f"DFA artifact ({words}-word alternative):")
+    compiled, build_time = _timed(lambda: build_dfa(regex_parser.parse(pattern)).minimize().compile())
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "words.dfa")
+        _, save_time = _timed(compiled.save, path)
+        print(
+            f"  build from scratch   {build_time:8.4f} s "
+            f"({compiled.state_count} states, {compiled.class_count} classes)"
+        )
+        print(f"  save                 {save_time:8.4f} s ({os.path.getsize(path):,} bytes)")
+        for shared in (True, False):
+            loaded, load_time = _timed(CompiledDFA.load, path, shared)
+            with loaded:
+                assert loaded.accepting == compiled.accepting
+                assert list(loaded.table) == list(compiled.table)
+            print(f"  load(shared={shared!s:<5})  {load_time:8.4f} s ({build_time / load_time:,.0f}x faster)")
+
+
+def benchmark_multi_dfa(patterns=100, megabytes=1, seed=0):
+    """Compare one MultiDFA pass with one search pass per pattern."""
+    rng = random.Random(seed)
+    texts = sorted({
+        "".join(rng.choice("abcdefgh") for _ in range(rng.randint(4, 7)))
+        + rng.choice(["", "[0-9]+", "s?"])
+        for _ in range(patterns)
+    })
+    regexes = [regex_parser.parse(text) for text in texts]
+    text = "".join(rng.choice("abcdefgh0123 ") for _ in range(megabytes * 1024 * 1024))
+
+    print(f"multi-pattern DFA ({len(texts)} patterns, {megabytes} MB text):")
+    multi, build_time = _timed(lambda: build_multi_dfa(regexes, search=True).minimize())
+    found, scan_time = _timed(multi.scan, text)
+    matches = sum(len(pattern_ids) for _, pattern_ids in found)
+    print(
+        f"  MultiDFA          build {build_time:7.3f} s, scan {scan_time:7.3f} s, "
+        f"{len(multi.states)} states, {matches} matches"
+    )
+
+    matchers, build_time = _timed(
+        lambda: [build_dfa(regex).minimize().compile().matcher(search=True) for regex in regexes]
+    )
+    separate, scan_time = _timed(lambda: sum(len(matcher.feed(text)) for matcher in matchers))
+    assert separate == matches
+    print(f"  one pass each     build {build_time:7.3f} s, scan {scan_time:7.3f} s")
+
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), "tests", "test_file.md")
+
+
+def _corpus_megabytes():
+    return int(os.environ.get("CORPUS_MB", 500))
+
+
+def _write_corpus(path, megabytes, seed=0):
+    """Write about ``megabytes`` MB of text made of shuffled paragraphs of the test file."""
+    rng = random.Random(seed)
+    with open(TEST_FILE, encoding="utf-8") as file:
+        paragraphs = file.read().split("\n\n")
+    size = megabytes * 1024 * 1024
+    written = 0
+    with open(path, "w", encoding="utf-8") as file:
+        while written < size:
+            chunk = "\n\n".join(rng.sample(paragraphs, len(paragraphs))) + "\n\n"
+            file.write(chunk)
+            written += len(chunk)
+
+
+_PEAK_MEMORY = """
+import sys
+from lab_1.analyze_text_file import analyze_text_file
+analyze_text_file(sys.argv[1])
+try:
+    import resource
+except ImportError:
+    print("n/a")
+else:
+    print(f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+"""
+
+
+def benchmark_analyze_text_file(megabytes=None):
+    """Run analyze_text_file on a generated corpus (CORPUS_MB megabytes) and report its peak memory."""
+    megabytes = megabytes or _corpus_megabytes()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "corpus.md")
+        _write_corpus(path, megabytes)
+        result, elapsed = _timed(analyze_text_file, path)
+        print(f"analyze_text_file ({megabytes} MB corpus):")
+        print(
+            f"  {elapsed:8.3f} s, {megabytes / elapsed:6.1f} MB/s, {result['word_count']:,} words, "
+            f"{len(result['paragraph_sizes']):,} paragraphs"
+        )
+        # A fresh process, so that the peak is not the one of the corpus generation.
+        peak = subprocess.run(
+            [sys.executable, "-c", _PEAK_MEMORY, path],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip()
+        print(f"  peak memory (max RSS) {peak}")
+
+
+def benchmark_corpus_analysis(megabytes=None):
+    """Compare analyze_corpus on a generated corpus for 1 up to cpu_count() worker processes."""
+    megabytes = megabytes or _corpus_megabytes()
+    with tempfile.TemporaryDirectory() as directory:
+        # Half of the corpus in one large file to be sharded, half in files of 16 MB.
+        paths = [os.path.join(directory, "large.md")]
+        _write_corpus(paths[0], max(megabytes // 2, 1))
+        for index in range(max(megabytes // 2 // 16, 1)):
+            paths.append(os.path.join(directory, f"part_{index}.md"))
+            _write_corpus(paths[-1], 16, seed=index + 1)
+
+        print(f"analyze_corpus ({megabytes} MB in {len(paths)} files, {os.cpu_count()} CPUs):")
+        _, baseline = _timed(analyze_corpus, paths, 1)
+        print(f"  workers  1: {baseline:8.3f} s, {megabytes / baseline:6.1f} MB/s")
+        for workers in range(2, (os.cpu_count() or 1) + 1):
+            _, elapsed = _timed(analyze_corpus, paths, workers)
+            print(
+                f"  workers {workers:2}: {elapsed:8.3f} s, {megabytes / elapsed:6.1f} MB/s, "
+                f"speedup {baseline / elapsed:4.2f}x"
+            )
+
+
+def benchmark_frequent_words(megabytes=None):
+    """Compare the exact and approximate word frequency tables on text full of unique identifiers."""
+    megabytes = max((megabytes or _corpus_megabytes()) // 10, 1)
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "corpus.md")
+        _write_corpus(path, megabytes)
+        # A random hexadecimal identifier after every line, as in logs or code.
+        with open(path, encoding="utf-8") as file:
+            lines = file.read().split("\n")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n".join(f"{line} id{rng.getrandbits(48):012x}" if line else line for line in lines))
+
+        print(f"frequent words ({megabytes} MB corpus):")
+        exact, elapsed = _timed(lambda: TextStatistics().feed_chunks(read_chunks(path)))
+        expected = exact.result()["frequent_words"]
+        print(
+            f"  exact:             {elapsed:8.3f} s, {len(exact.words):9,} forms, "
+            f"{_mapping_memory_usage(exact.words) / 2**20:7.1f} MB"
+        )
+        for word_error in (0.001, 0.0001, 0.00001):
+            result, elapsed = _timed(analyze_text_file, path, CHUNK_SIZE, word_error, 100)
+            top = sorted(expected, key=expected.get, reverse=True)[:100]
+            found = len(set(top) & result["frequent_words"].keys())
+            print(
+                f"  word_error {word_error:<7}: {elapsed:8.3f} s, {result['frequent_words_memory'] / 2**20:7.1f} MB, "
+                f"error bound {result['frequent_words_error']:,}, top 100 recall {found}%"
+            )
+
+
+def benchmark_analysis_cache(megabytes=None):
+    """Re-analyze a document (100 MB unless CORPUS_MB is set) after editing one paragraph, with AnalysisCache."""
+    megabytes = megabytes or int(os.environ.get("CORPUS_MB", 100))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "document.md")
+        _write_corpus(path, megabytes)
+        # Number the paragraphs, so that the repeated ones of the test file differ.
+        with open(path, encoding="utf-8") as file:
+            paragraphs = file.read().split("\n\n")
+        paragraphs = [f"{paragraph} ({index})" for index, paragraph in enumerate(paragraphs)]
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n\n".join(paragraphs))
+
+        print(f"analysis cache ({megabytes} MB document, {len(paragraphs):,} paragraphs):")
+        _, elapsed = _timed(analyze_text_file, path)
+        print(f"  no cache:              {elapsed:8.3f} s")
+        cache_path = os.path.join(directory, "cache.sqlite")
+        with AnalysisCache(cache_path) as cache:
+            _, elapsed = _timed(analyze_text_file, path, CHUNK_SIZE, None, None, cache)
+        print(f"  cold cache:            {elapsed:8.3f} s, {os.path.getsize(cache_path) / 2**20:.0f} MB on disk")
+
+        with AnalysisCache(cache_path) as cache:
+            _, elapsed = _timed(analyze_text_file, path, CHUNK_SIZE, None, None, cache)
+        print(f"  unchanged document:    {elapsed:8.3f} s")
+
+        paragraphs[len(paragraphs) // 2] += " An edited sentence."
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n\n".join(paragraphs))
+        with AnalysisCache(cache_path) as cache:
+            _, elapsed = _timed(analyze_text_file, path, CHUNK_SIZE, None, None, cache)
+            print(f"  one paragraph edited:  {elapsed:8.3f} s, {cache.misses - 1} paragraphs counted again")
+
+
+def _extract_links_uncompiled(html):
+    # extract_links as it was before the patterns were compiled at import time.
+    return [
+        {"url": match.group("url"), "title": match.group("title"), "text": match.group("text")}
+        for match in re.finditer(LINK_PATTERN.pattern, html)
+    ]
+
+
+def _parse_publication_uncompiled(reference):
+    # parse_publication as it was before the patterns were compiled at import time.
+    if not re.match(PUBLICATION_PATTERN.pattern, reference):
+        return None
+    authors = [
+        {"last_name": match.group(1), "initial": match.group(2)}
+        for match in re.finditer(AUTHOR_PATTERN.pattern, reference)
+    ]
+    match = re.match(PUBLICATION_PATTERN.pattern, reference)
+    return {
+        "authors": authors,
+        "year": int(match.group("year")),
+        "title": match.group("title"),
+        "journal": match.group("journal"),
+        "volume": int(match.group("volume")),
+        "issue": int(match.group("issue")) if match.group("issue") else None,
+        "pages": {"start": int(match.group("start")), "end": int(match.group("end"))},
+    }
+
+
+def _evicting(function):
+    # Empty the re cache before every call, as other code using more than 512 patterns would.
+    def call(argument):
+        re.purge()
+        return function(argument)
+
+    return call
+
+
+def benchmark_pattern_registry(calls=100_000, seed=0):
+    """Calls per second of the extractors with patterns compiled at import time, one by one and in batches."""
+    rng = random.Random(seed)
+    htmls = [
+        f'<li><a href="https://example.com/{i}" title="Page {i}">Page {i}</a>, '
+        f'<a href="/local/{rng.randrange(1000)}">link</a></li>'
+        for i in range(calls)
+    ]
+    references = [
+        f"Kowalski, J., Nowak, A. ({rng.randrange(1950, 2025)}). Analiza algorytmów tekstowych. "
+        f"Journal of Computer Science, {rng.randrange(1, 99)}({rng.randrange(1, 12)}), 123-145."
+        if i % 10 else "Niepoprawna referencja"
+        for i in range(calls)
+    ]
+
+    def each(function, inputs):
+        return [function(item) for item in inputs]
+
+    def timed(function, *args):
+        # Like timeit, without the garbage collector passes over the growing list of results.
+        gc.collect()
+        gc.disable()
+        try:
+            return _timed(function, *args)
+        finally:
+            gc.enable()
+
+    for name, inputs, single, batch, uncompiled in [
+        ("extract_links", htmls, extract_links, extract_links_batch, _extract_links_uncompiled),
+        ("parse_publication", references, parse_publication, parse_publication_batch, _parse_publication_uncompiled),
+    ]:
+        print(f"{name} ({calls:,} inputs):")
+        expected, elapsed = timed(each, uncompiled, inputs)
+        print(f"  pattern strings, re cache:       {calls / elapsed:10,.0f} calls/s")
+        _, elapsed = timed(each, _evicting(uncompiled), inputs)
+        print(f"  pattern strings, evicted cache:  {calls / elapsed:10,.0f} calls/s")
+        result, elapsed = timed(each, single, inputs)
+        assert result == expected
+        print(f"  compiled patterns:               {calls / elapsed:10,.0f} calls/s")
+        result, elapsed = timed(batch, inputs)
+        assert result == expected
+        print(f"  compiled patterns, batch:        {calls / elapsed:10,.0f} calls/s")
+
+
+_PUBLICATIONS_MEMORY = """
+import random, resource, sys, time
+from lab_1.parse_publication import parse_publication_batch, parse_publications
+
+def references(count):
+    rng = random.Random(0)
+    names = [f"Autor{i}" for i in range(5000)]
+    journals = [f"Journal of Topic {i}" for i in range(200)]
+    for index in range(count):
+        if index % 20 == 0:
+            yield "Niepoprawna referencja\\n"
+            continue
+        authors = ", ".join(f"{rng.choice(names)}, {rng.choice('ABCDEFGHIJ')}." for _ in range(rng.randrange(1, 5)))
+        issue = f"({rng.randrange(1, 12)})" if rng.random() < 0.8 else ""
+        yield (
+            f"{authors} ({rng.randrange(1950, 2025)}). Title number {index}. {rng.choice(journals)}, "
+            f"{rng.randrange(1, 200)}{issue}, {rng.randrange(1, 500)}-{rng.randrange(500, 999)}.\\n"
+        )
+
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+parse = parse_publications if sys.argv[1] == "columns" else parse_publication_batch
+result = parse(references(int(sys.argv[2])))
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+print(f"{elapsed:8.3f} s, {peak / 1024:8.1f} MB")
+"""
+
+
+def benchmark_publications(count=1_000_000):
+    """Parse a stream of references into a list of dicts and into columns, comparing time and peak memory."""
+    print(f"parse {count:,} references (5% invalid):")
+    for name, mode in [("list of dicts (batch)", "dicts"), ("columns", "columns")]:
+        # A fresh process for each, so that the peaks do not include each other.
+        output = subprocess.run(
+            [sys.executable, "-c", _PUBLICATIONS_MEMORY, mode, str(count)],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip()
+        print(f"  {name:22} {output}")
+
+
+def benchmark_link_stream(links=200_000, chunk_size=1 << 16):
+    """extract_links against extract_links_stream on a large page and on pages of unclosed links."""
+    html = "".join(
+        f'<li><a href="https://example.com/{i}" title="Page {i}">Page {i}</a></li>\n' for i in range(links)
+    )
+    chunks = [html[i:i + chunk_size] for i in range(0, len(html), chunk_size)]
+    print(f"links ({len(html) / 2**20:.1f} MB page, {links:,} links):")
+    expected, elapsed = _timed(extract_links, html)
+    print(f"  extract_links:        {elapsed:8.3f} s")
+    result, elapsed = _timed(lambda: list(extract_links_stream(chunks)))
+    assert result == expected
+    print(f"  extract_links_stream: {elapsed:8.3f} s, in {len(chunks)} chunks")
+
+    # Without a "</a>" or a line end, ".*?" scans to the end of the page from every link.
+    print("unclosed links on one line:")
+    for count in (2_000, 4_000, 8_000):
+        html = '<a href="x">text' * count
+        expected, regex_elapsed = _timed(extract_links, html)
+        result, elapsed = _timed(lambda: list(extract_links_stream([html])))
+        assert result == expected
+        print(f"  {count:6,} links: extract_links {regex_elapsed:8.3f} s, extract_links_stream {elapsed:8.3f} s")
+
+
+def benchmark_link_pipeline(pages=20_000, links_per_page=50, seed=0):
+    """Pages per second and index memory of LinkPipeline, against a Python set of the URLs."""
+    rng = random.Random(seed)
+    site_pages = pages * links_per_page // 3
+
+    def page(i):
+        links = "".join(
+            f'<li><a href="/article/{rng.randrange(site_pages)}#comments" title="Article">Read</a></li>\n'
+            if rng.random() < 0.7 else f'<li><a href="https://Other{rng.randrange(1000)}.example.com:443/x">x</a></li>\n'
+            for _ in range(links_per_page)
+        )
+        return f"https://news.example.com/section/{i}", f"<html><body><ul>{links}</ul></body></html>"
+
+    crawl = [page(i) for i in range(pages)]
+    print(f"link pipeline ({pages:,} pages, {links_per_page} links each, {os.cpu_count()} CPUs):")
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        pipeline = LinkPipeline(capacity=pages * links_per_page, error_rate=0.001, workers=workers)
+        new_urls = sum(len(urls) for _, urls in pipeline.run(crawl))
+        stats = pipeline.stats()
+        print(
+            f"  workers {workers:2}: {stats['pages_per_second']:8,.0f} pages/s, {new_urls:,} new URLs, "
+            f"index {stats['index_memory'] / 2**20:.1f} MB (false positive rate {stats['false_positive_rate']:.5f})"
+        )
+
+    seen = set()
+    start = time.perf_counter()
+    for page_url, html in crawl:
+        seen.update(normalize_url(link["url"], page_url) for link in extract_links(html))
+    elapsed = time.perf_counter() - start
+    set_memory = sys.getsizeof(seen) + sum(sys.getsizeof(url) for url in seen)
+    print(
+        f"  one process with a set: {pages / elapsed:8,.0f} pages/s, "
+        f"the set of {len(seen):,} URLs takes {set_memory / 2**20:.1f} MB"
+    )
+
+
+BENCHMARKS = {
+    "build_dfa": benchmark_build_dfa,
+    "derivative_cache": benchmark_derivative_cache,
+    "minimize": benchmark_minimize,
+    "compiled_dfa": benchmark_compiled_dfa,
+    "lazy_dfa": benchmark_lazy_dfa,
+    "char_classes": benchmark_char_classes,
+    "regex_compile": benchmark_regex_compile,
+    "dfa_artifact": benchmark_dfa_artifact,
+    "multi_dfa": benchmark_multi_dfa,
+    "analyze_text_file": benchmark_analyze_text_file,
+    "corpus_analysis": benchmark_corpus_analysis,
+    "frequent_words": benchmark_frequent_words,
+    "analysis_cache": benchmark_analysis_cache,
+    "pattern_registry": benchmark_pattern_registry,
+    "publications": benchmark_publications,
+    "link_stream": benchmark_link_stream,
+    "link_pipeline": benchmark_link_pipeline,
+}
+
+
+if __name__ == "__main__":
+    for benchmark_name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[benchmark_name]()
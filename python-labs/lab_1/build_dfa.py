@@ -1,9 +1,52 @@
-from abc import ABC, abstractmethod
-from collections import deque
+import bisect
+import itertools
+import mmap
+import struct
+import sys
+import weakref
+from array import array
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict, deque
 from typing import Optional
 
 
-class RegEx(ABC):
+class _Interned(ABCMeta):
+    """
+    Metaclass that hash-conses regex nodes.
+
+    Calling a node class first looks up the (class, *arguments) key in a weak
+    intern table, so structurally equal expressions are always the same object
+    and can be compared and hashed by identity. Every new node also gets a serial
+    number, which gives simplify() a cheap total order on operands. Classes
+    whose arguments have several spellings provide a ``_normalize`` hook that
+    maps them to one canonical tuple before the lookup.
+    """
+
+    table = weakref.WeakValueDictionary()
+    counter = itertools.count()
+
+    def __call__(cls, *args, **kwargs):
+        if cls._normalize is not None:
+            args = cls._normalize(*args, **kwargs)
+        key = (cls, *args)
+        node = _Interned.table.get(key)
+        if node is None:
+            node = super().__call__(*args)
+            node._key = key
+            node._order = next(_Interned.counter)
+            _Interned.table[key] = node
+        return node
+
+    # No virtual subclasses are ever registered, so skip the slow ABC checks
+    # on the isinstance() calls that derivative() and simplify() are full of.
+    __instancecheck__ = type.__instancecheck__
+    __subclasscheck__ = type.__subclasscheck__
+
+
+class RegEx(metaclass=_Interned):
+    _simplified = None
+    _normalize = None
+
     @abstractmethod
     def nullable(self):
         pass
@@ -12,13 +55,64 @@ class RegEx(ABC):
     def derivative(self, symbol):
         pass
 
-    def __eq__(self, other):
-        if not isinstance(other, RegEx):
-            return False
-        return str(self) == str(other)
+    # Nodes are interned, so structural equality is object identity and the
+    # default (C level) __eq__ and __hash__ of object are exactly right.
+
+    def __reduce__(self):
+        # Rebuild through the metaclass so unpickled nodes are interned as well.
+        return type(self), self._key[1:]
+
+
+class DerivativeCache:
+    """
+    Bounded LRU cache of derivatives of compound nodes, keyed by (node, symbol).
+
+    Derivatives of shared subterms are requested over and over by different
+    states of the same construction, so Concatenation, Alternative and
+    KleeneStar look them up here before recomputing them.
+    A ``maxsize`` of None means unbounded, 0 disables caching.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 65536):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def derivative(self, node, symbol):
+        key = (node, symbol)
+        entries = self._entries
+        result = entries.get(key)
+        if result is not None:
+            self.hits += 1
+            entries.move_to_end(key)
+            return result
+
+        self.misses += 1
+        result = node._derivative(symbol)
+        if self.maxsize != 0:
+            entries[key] = result
+            if self.maxsize is not None and len(entries) > self.maxsize:
+                entries.popitem(last=False)
+        return result
+
+    def resize(self, maxsize: Optional[int]):
+        """Change the size bound, evicting least recently used entries if needed."""
+        self.maxsize = maxsize
+        if maxsize is not None:
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
 
-    def __hash__(self):
-        return hash(str(self))
+
+derivative_cache = DerivativeCache()
 
 
 class Empty(RegEx):
@@ -59,15 +153,106 @@ class Symbol(RegEx):
         return self.symbol
 
 
+MAX_CODEPOINT = 0x10FFFF
+
+
+class CharClass(RegEx):
+    """
+    Set of characters stored as sorted, disjoint, inclusive code point ranges.
+
+    ``CharClass(items, negated=False)`` takes single characters and
+    ``(first, last)`` pairs of characters or code points, e.g.
+    ``CharClass([("a", "z"), ("0", "9"), "_"])`` for ``[a-z0-9_]``. With
+    ``negated`` the class is the complement within all of Unicode. Equal sets
+    are the same interned node however they were spelled.
+    """
+
+    def __init__(self, ranges):
+        self.ranges = ranges
+        self._starts = [first for first, _ in ranges]
+
+    @staticmethod
+    def _normalize(items, negated=False):
+        ranges = []
+        for item in items:
+            if isinstance(item, str):
+                first = last = item
+            else:
+                first, last = item
+            first = ord(first) if isinstance(first, str) else first
+            last = ord(last) if isinstance(last, str) else last
+            if not 0 <= first <= last <= MAX_CODEPOINT:
+                raise ValueError(f"Invalid character range {item!r}")
+            ranges.append((first, last))
+        ranges.sort()
+
+        merged = []
+        for first, last in ranges:
+            if merged and first <= merged[-1][1] + 1:
+                if last > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], last)
+            else:
+                merged.append((first, last))
+
+        if negated:
+            complement = []
+            start = 0
+            for first, last in merged:
+                if first > start:
+                    complement.append((start, first - 1))
+                start = last + 1
+            if start <= MAX_CODEPOINT:
+                complement.append((start, MAX_CODEPOINT))
+            merged = complement
+        return (tuple(merged),)
+
+    def __contains__(self, symbol):
+        if not isinstance(symbol, str) or len(symbol) != 1:
+            return False
+        codepoint = ord(symbol)
+        i = bisect.bisect_right(self._starts, codepoint) - 1
+        return i >= 0 and codepoint <= self.ranges[i][1]
+
+    def representative(self):
+        """Some character of the class."""
+        return chr(self.ranges[0][0])
+
+    def nullable(self):
+        return False
+
+    def derivative(self, symbol):
+        if symbol in self:
+            return Epsilon()
+        return Empty()
+
+    def __str__(self):
+        ranges = self.ranges
+        if ranges == ((0, MAX_CODEPOINT),):
+            return "."
+        prefix = ""
+        if ranges and ranges[0][0] == 0 and ranges[-1][1] == MAX_CODEPOINT:
+            ranges = CharClass(ranges, True).ranges
+            prefix = "^"
+        parts = [
+            chr(first) if first == last else f"{chr(first)}-{chr(last)}"
+            for first, last in ranges
+        ]
+        return f"[{prefix}{''.join(parts)}]"
+
+
 class Concatenation(RegEx):
     def __init__(self, left, right):
         self.left = left
         self.right = right
+        self._nullable = left.nullable() and right.nullable()
 
     def nullable(self):
-        return self.left.nullable() and self.right.nullable()
+        return self._nullable
 
     def derivative(self, symbol):
+        return derivative_cache.derivative(self, symbol)
+
+    def _derivative(self, symbol):
         left_derivative = self.left.derivative(symbol)
 
         if isinstance(left_derivative, Empty):
@@ -93,11 +278,15 @@ class Alternative(RegEx):
     def __init__(self, left, right):
         self.left = left
         self.right = right
+        self._nullable = left.nullable() or right.nullable()
 
     def nullable(self):
-        return self.left.nullable() or self.right.nullable()
+        return self._nullable
 
     def derivative(self, symbol):
+        return derivative_cache.derivative(self, symbol)
+
+    def _derivative(self, symbol):
         left_derivative = self.left.derivative(symbol)
         right_derivative = self.right.derivative(symbol)
 
@@ -120,6 +309,9 @@ class KleeneStar(RegEx):
         return True
 
     def derivative(self, symbol):
+        return derivative_cache.derivative(self, symbol)
+
+    def _derivative(self, symbol):
         derivative = self.expression.derivative(symbol)
 
         if isinstance(derivative, Empty):
@@ -139,28 +331,137 @@ class DFA:
         self.start_state = start_state
         self.accept_states = accept_states
 
+        # Transitions are labelled either by plain symbols or by CharClass
+        # blocks; label() maps an input symbol to its label.
+        self._labels = {}
+        self._ranges = []
+        for label in alphabet:
+            if isinstance(label, CharClass):
+                self._ranges.extend((first, last, label) for first, last in label.ranges)
+            else:
+                self._labels[label] = label
+        self._ranges.sort(key=lambda item: item[0])
+        self._range_starts = [first for first, _, _ in self._ranges]
+
+    def label(self, symbol):
+        """Return the alphabet label the symbol belongs to, or None if there is none."""
+        label = self._labels.get(symbol)
+        if label is None and self._ranges and isinstance(symbol, str) and len(symbol) == 1:
+            codepoint = ord(symbol)
+            i = bisect.bisect_right(self._range_starts, codepoint) - 1
+            if i >= 0 and codepoint <= self._ranges[i][1]:
+                label = self._labels[symbol] = self._ranges[i][2]
+        return label
+
     def accepts(self, string):
         """Check if the DFA accepts the given string."""
         current_state = self.start_state
+        labels = self._labels
         # print(self)
         # print(f"Initial State: {current_state}")
         # print(f"String: {string}")
 
         for i, symbol in enumerate(string):
             # print(f"Step {i + 1}: Current State: {current_state}, Symbol: {symbol}")
-            if symbol not in self.alphabet:
+            label = labels.get(symbol)
+            if label is None:
+                label = self.label(symbol)
+            if label is None:
                 # print(f"Symbol '{symbol}' not in alphabet. Rejecting.")
                 return False
 
-            if (current_state, symbol) not in self.transitions:
+            if (current_state, label) not in self.transitions:
                 # print(f"No transition for state '{current_state}' with symbol '{symbol}'. Rejecting.")
                 return False
 
-            current_state = self.transitions[(current_state, symbol)]
+            current_state = self.transitions[(current_state, label)]
 
         # print(f"Final State: {current_state}, Status: {'Accept' if current_state in self.accept_states else 'Reject'}")
         return current_state in self.accept_states
 
+    def accept_tag(self, state):
+        """What the state reports when the input ends in it, states with equal tags may be merged."""
+        return state in self.accept_states
+
+    def minimize(self):
+        """
+        Return an equivalent DFA with the minimal number of states.
+
+        Uses Hopcroft's partition refinement, O(n·|Σ|·log n). Missing
+        transitions are treated as going to an implicit dead state, which is
+        dropped again from the result, so the minimized DFA stays partial just
+        like the ones produced by build_dfa.
+        """
+        representatives, transitions = self._minimal_states()
+        accept_states = {name for name, state in representatives.items() if self.accept_tag(state)}
+        return DFA(set(representatives), self.alphabet, transitions, "q0", accept_states)
+
+    def _minimal_states(self):
+        """Run Hopcroft's algorithm, return {new name: some old state of its block} and the new transitions."""
+        dead = None
+        states = set(self.states) | {dead}
+        predecessors = {symbol: {} for symbol in self.alphabet}
+        for state in states:
+            for symbol in self.alphabet:
+                next_state = self.transitions.get((state, symbol), dead)
+                predecessors[symbol].setdefault(next_state, []).append(state)
+
+        groups = {}
+        for state in states:
+            groups.setdefault(self.accept_tag(state), set()).add(state)
+        blocks = list(groups.values())
+        block_of = {state: i for i, block in enumerate(blocks) for state in block}
+        # Every block but the largest has to split the others, the largest one
+        # is the complement of their union.
+        largest = max(range(len(blocks)), key=lambda i: len(blocks[i]))
+        worklist = set(range(len(blocks))) - {largest}
+
+        while worklist:
+            splitter = list(blocks[worklist.pop()])
+            for symbol in self.alphabet:
+                incoming = predecessors[symbol]
+                touched = {}
+                for state in splitter:
+                    for previous in incoming.get(state, ()):
+                        touched.setdefault(block_of[previous], set()).add(previous)
+
+                for i, inside in touched.items():
+                    block = blocks[i]
+                    if len(inside) == len(block):
+                        continue
+                    block -= inside
+                    new_index = len(blocks)
+                    blocks.append(inside)
+                    for state in inside:
+                        block_of[state] = new_index
+                    if i in worklist:
+                        worklist.add(new_index)
+                    else:
+                        worklist.add(new_index if len(inside) <= len(block) else i)
+
+        # Name the blocks in BFS order from the start state and leave out the dead one.
+        dead_block = block_of[dead]
+        names = {block_of[self.start_state]: "q0"}
+        queue = deque([block_of[self.start_state]])
+        transitions = {}
+        representatives = {}
+        while queue:
+            i = queue.popleft()
+            representative = representatives[names[i]] = next(iter(blocks[i]))
+            for symbol in self.alphabet:
+                next_block = block_of[self.transitions.get((representative, symbol), dead)]
+                if next_block == dead_block:
+                    continue
+                if next_block not in names:
+                    names[next_block] = f"q{len(names)}"
+                    queue.append(next_block)
+                transitions[(names[i], symbol)] = names[next_block]
+        return representatives, transitions
+
+    def compile(self):
+        """Compile the DFA into a dense, table-driven CompiledDFA."""
+        return CompiledDFA.from_dfa(self)
+
     def __str__(self):
         result = "DFA:\n"
         result += f"  States: {self.states}\n"
@@ -168,15 +469,547 @@ class DFA:
         result += f"  Start State: {self.start_state}\n"
         result += f"  Accept States: {self.accept_states}\n"
         result += "  Transitions:\n"
-        for (state, symbol), next_state in sorted(self.transitions.items()):
+        for (state, symbol), next_state in sorted(
+            self.transitions.items(), key=lambda item: (item[0][0], str(item[0][1]))
+        ):
             result += f"    {state} --{symbol}--> {next_state}\n"
         return result
 
 
+class MultiDFA(DFA):
+    """
+    DFA for several patterns at once, built by build_multi_dfa.
+
+    ``tags`` maps every accepting state to the frozenset of ids (indices into
+    the pattern list) of the patterns that match when the input ends there.
+    """
+
+    def __init__(self, states, alphabet, transitions, start_state, tags):
+        super().__init__(states, alphabet, transitions, start_state, set(tags))
+        self.tags = tags
+        self._compiled = None
+
+    def accept_tag(self, state):
+        return self.tags.get(state, frozenset())
+
+    def matches(self, string):
+        """Return the ids of the patterns matching the whole string."""
+        state = self.start_state
+        for symbol in string:
+            state = self.transitions.get((state, self.label(symbol)))
+            if state is None:
+                return frozenset()
+        return self.accept_tag(state)
+
+    def scan(self, text):
+        """
+        Feed the text once and return (end offset, pattern ids) for every prefix that matches.
+
+        For a DFA built with ``search=True`` these are the ends of all matches
+        of all patterns anywhere in the text.
+        """
+        if self._compiled is None:
+            self._compiled = self.compile()
+        compiled = self._compiled
+        table = compiled.table
+        k = compiled.class_count
+        dead = compiled.dead * k
+        tags = {state * k: tag for state, tag in enumerate(compiled.tags) if tag}
+
+        state = compiled.start * k
+        found = [(0, tags[state])] if state in tags else []
+        for end, symbol_class in enumerate(compiled.translate(text), 1):
+            state = table[state + symbol_class]
+            if state in tags:
+                found.append((end, tags[state]))
+            elif state == dead:
+                break
+        return found
+
+    def minimize(self):
+        representatives, transitions = self._minimal_states()
+        tags = {name: self.tags[state] for name, state in representatives.items() if state in self.tags}
+        return MultiDFA(set(representatives), self.alphabet, transitions, "q0", tags)
+
+
+class _ClassTranslation(dict):
+    """
+    str.translate() mapping from code points to class characters.
+
+    Code points covered by CharClass ranges are looked up on first use and
+    remembered, everything else maps to chr(0), the class of unknown symbols.
+    """
+
+    def __init__(self, symbols, ranges):
+        super().__init__(symbols)
+        self._ranges = ranges
+        self._starts = [first for first, _, _ in ranges]
+
+    def __missing__(self, codepoint):
+        i = bisect.bisect_right(self._starts, codepoint) - 1
+        if i >= 0 and codepoint <= self._ranges[i][1]:
+            value = self[codepoint] = chr(self._ranges[i][2])
+            return value
+        return "\0"
+
+
+class CompiledDFA:
+    """
+    Dense, table-driven form of a DFA.
+
+    States are integers 0..n-1, with the start state first and an explicit
+    dead state last. Symbols are mapped to equivalence classes 0..k-1 (symbols
+    with identical transitions share a class, class 0 holds every symbol
+    outside the alphabet). ``symbol_classes`` maps single characters or
+    CharClass labels to their class. ``table[state * k + symbol_class]`` is the *row
+    offset* of the next state, i.e. ``next_state * k``, so the executor loop
+    is a single indexing operation per input symbol. Automata compiled from a
+    MultiDFA also have ``tags``, the set of matching pattern ids per state.
+    """
+
+    # Number of symbols processed between checks for the dead state.
+    BLOCK_SIZE = 1 << 16
+
+    def __init__(self, table, class_count, accepting, symbol_classes, tags=None):
+        self.table = table
+        self.class_count = class_count
+        self.accepting = accepting
+        self.symbol_classes = symbol_classes
+        self.tags = tags
+        self.state_count = len(accepting)
+        self.start = 0
+        self.dead = self.state_count - 1
+        # The mapped artifact the table is a view of, after load(shared=True).
+        self._buffer = None
+
+        symbols = {}
+        ranges = []
+        for symbol, symbol_class in symbol_classes.items():
+            if isinstance(symbol, CharClass):
+                ranges.extend((first, last, symbol_class) for first, last in symbol.ranges)
+            else:
+                symbols[ord(symbol)] = chr(symbol_class)
+        ranges.sort()
+        self._translation = _ClassTranslation(symbols, ranges)
+
+        # Bytes are read as latin-1, which is only sound if the automaton
+        # cannot tell any two characters beyond latin-1 apart.
+        wide_classes = {class_ for codepoint, class_ in symbols.items() if codepoint >= 256}
+        covered = 256
+        for first, last, symbol_class in ranges:
+            if last < 256:
+                continue
+            if max(first, 256) > covered:
+                wide_classes.add(0)
+            wide_classes.add(symbol_class)
+            covered = max(covered, last + 1)
+        if covered <= MAX_CODEPOINT:
+            wide_classes.add(0)
+        if len(wide_classes) <= 1:
+            byte_table = bytearray(256)
+            for first, last, symbol_class in ranges:
+                if first < 256:
+                    last = min(last, 255)
+                    byte_table[first:last + 1] = bytes((symbol_class,)) * (last - first + 1)
+            for codepoint, class_character in symbols.items():
+                if codepoint < 256:
+                    byte_table[codepoint] = ord(class_character)
+            self._byte_translation = bytes(byte_table)
+        else:
+            self._byte_translation = None
+
+    @classmethod
+    def from_dfa(cls, dfa):
+        for symbol in dfa.alphabet:
+            if not isinstance(symbol, CharClass) and (not isinstance(symbol, str) or len(symbol) != 1):
+                raise ValueError(f"Only single-character symbols can be compiled, got {symbol!r}")
+
+        # The start state gets id 0 and the dead state the last id.
+        state_ids = {dfa.start_state: 0}
+        for state in sorted(dfa.states, key=str):
+            state_ids.setdefault(state, len(state_ids))
+        dead = len(state_ids)
+        state_count = dead + 1
+
+        # Symbols with identical columns behave the same in every state.
+        symbols = sorted(dfa.alphabet, key=str)
+        columns = {}
+        for symbol in symbols:
+            column = tuple(
+                state_ids.get(dfa.transitions.get((state, symbol)), dead) for state in state_ids
+            )
+            columns.setdefault(column, []).append(symbol)
+
+        dead_column = (dead,) * len(state_ids)
+        class_columns = [dead_column]
+        symbol_classes = {}
+        for column, column_symbols in columns.items():
+            if column == dead_column:
+                continue
+            for symbol in column_symbols:
+                symbol_classes[symbol] = len(class_columns)
+            class_columns.append(column)
+        if len(class_columns) > 256:
+            raise ValueError("At most 255 distinct symbol classes are supported")
+
+        class_count = len(class_columns)
+        table = [0] * (state_count * class_count)
+        for state_id in range(dead):
+            for symbol_class, column in enumerate(class_columns):
+                table[state_id * class_count + symbol_class] = column[state_id] * class_count
+        for symbol_class in range(class_count):
+            table[dead * class_count + symbol_class] = dead * class_count
+
+        accepting = bytearray(state_count)
+        for state, state_id in state_ids.items():
+            accepting[state_id] = state in dfa.accept_states
+        tags = None
+        if isinstance(dfa, MultiDFA):
+            tags = [dfa.accept_tag(state) for state in state_ids] + [frozenset()]
+        return cls(table, class_count, bytes(accepting), symbol_classes, tags)
+
+    # Artifact layout, little-endian: the header, the int32 table, one
+    # (first, last, class) uint32 triple per symbol range and the accept bitmap.
+    MAGIC = b"DFA1"
+    _HEADER = struct.Struct("<4sIII")
+
+    def save(self, path):
+        """Write the automaton to a binary artifact that load() can map into memory."""
+        if self.tags is not None:
+            raise ValueError("Automata with pattern tags cannot be saved")
+        ranges = []
+        for symbol, symbol_class in self.symbol_classes.items():
+            if isinstance(symbol, CharClass):
+                ranges.extend((first, last, symbol_class) for first, last in symbol.ranges)
+            else:
+                ranges.append((ord(symbol), ord(symbol), symbol_class))
+        ranges.sort()
+
+        table = array("i", self.table)
+        range_table = array("I", [value for triple in ranges for value in triple])
+        if sys.byteorder != "little":
+            table.byteswap()
+            range_table.byteswap()
+        bitmap = bytearray((self.state_count + 7) // 8)
+        for state, accepting in enumerate(self.accepting):
+            if accepting:
+                bitmap[state >> 3] |= 1 << (state & 7)
+
+        with open(path, "wb") as file:
+            file.write(self._HEADER.pack(self.MAGIC, self.state_count, self.class_count, len(ranges)))
+            file.write(table.tobytes())
+            file.write(range_table.tobytes())
+            file.write(bitmap)
+
+    @classmethod
+    def load(cls, path, shared=True):
+        """
+        Load an artifact written by save().
+
+        The file is mapped read-only and, with ``shared``, the transition table
+        is used in place as a memoryview, so processes loading the same
+        artifact share one copy of it through the page cache and nothing is
+        rebuilt. Indexing a memoryview is slower than indexing a list, so
+        ``shared=False`` copies the table into a private list instead and
+        closes the file. A shared automaton keeps the file mapped until
+        close(), or the end of a ``with`` block.
+        """
+        with open(path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        header_size = cls._HEADER.size
+        if len(buffer) < header_size:
+            buffer.close()
+            raise ValueError(f"{path} is not a DFA artifact")
+        magic, state_count, class_count, range_count = cls._HEADER.unpack_from(buffer)
+        table_end = header_size + 4 * state_count * class_count
+        ranges_end = table_end + 12 * range_count
+        if magic != cls.MAGIC or len(buffer) != ranges_end + (state_count + 7) // 8:
+            buffer.close()
+            raise ValueError(f"{path} is not a DFA artifact")
+
+        with memoryview(buffer) as view, view[header_size:table_end] as table_bytes:
+            if shared and sys.byteorder == "little":
+                table = table_bytes.cast("i")
+            else:
+                table = array("i")
+                table.frombytes(table_bytes)
+                if sys.byteorder != "little":
+                    table.byteswap()
+                if not shared:
+                    table = table.tolist()
+        range_table = array("I")
+        range_table.frombytes(buffer[table_end:ranges_end])
+        if sys.byteorder != "little":
+            range_table.byteswap()
+
+        symbol_classes = {}
+        for i in range(0, len(range_table), 3):
+            first, last, symbol_class = range_table[i:i + 3]
+            symbol = chr(first) if first == last else CharClass([(first, last)])
+            symbol_classes[symbol] = symbol_class
+        bitmap = buffer[ranges_end:]
+        accepting = bytes((bitmap[state >> 3] >> (state & 7)) & 1 for state in range(state_count))
+
+        compiled = cls(table, class_count, accepting, symbol_classes)
+        if isinstance(table, memoryview):
+            compiled._buffer = buffer
+        else:
+            buffer.close()
+        return compiled
+
+    def close(self):
+        """Unmap the artifact of a shared load(), after which the automaton cannot be used."""
+        if self._buffer is not None:
+            self.table.release()
+            self._buffer.close()
+            self._buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def translate(self, data):
+        """Map str or bytes-like input to a bytes object of symbol classes."""
+        if isinstance(data, str):
+            return data.translate(self._translation).encode("latin-1")
+        if self._byte_translation is None:
+            raise TypeError("This DFA has symbols outside of latin-1 and cannot scan bytes")
+        if not isinstance(data, (bytes, bytearray)):
+            data = bytes(data)
+        return data.translate(self._byte_translation)
+
+    def run(self, data, state=0):
+        """Feed the input to the automaton from the given state and return the final state."""
+        classes = self.translate(data)
+        table = self.table
+        k = self.class_count
+        offset = state * k
+        dead = self.dead * k
+        for start in range(0, len(classes), self.BLOCK_SIZE):
+            if offset == dead:
+                break
+            for symbol_class in classes[start:start + self.BLOCK_SIZE]:
+                offset = table[offset + symbol_class]
+        return offset // k
+
+    def accepts(self, data):
+        """Check if the DFA accepts the given str or bytes-like input."""
+        return bool(self.accepting[self.run(data)])
+
+    def matcher(self, search=False):
+        """Create a resumable DFAMatcher over this automaton."""
+        return DFAMatcher(self, search)
+
+
+class DFAMatcher:
+    """
+    Resumable matcher that consumes input in chunks, in constant memory.
+
+    In the default (anchored) mode ``feed`` reports the end offsets of every
+    prefix of the whole input that the DFA accepts. In search mode it reports
+    every offset where *some* match ends, wherever it started, which is what
+    scanning a log file or a socket for a pattern needs. Search mode runs the
+    subset automaton of "start again at every position", built lazily from
+    the compiled table; its size depends on the DFA only, not on the input.
+    Offsets are global (counted from the start of the first chunk) and point
+    just past the last symbol of the match.
+    """
+
+    def __init__(self, dfa, search=False):
+        if isinstance(dfa, DFA):
+            dfa = dfa.compile()
+        self.dfa = dfa
+        self.search = search
+        self.reset()
+
+    def reset(self):
+        """Start over from the beginning of a new input."""
+        self.offset = 0
+        self.finished = False
+        self._started = False
+        k = self.dfa.class_count
+        if self.search:
+            self._subsets = []
+            self._subset_ids = {}
+            self._rows = []
+            self._accepting = []
+            self._state = self._subset_id(frozenset({self.dfa.start}))
+        else:
+            self._state = self.dfa.start * k
+            self._accepting_offsets = {
+                state * k for state in range(self.dfa.state_count) if self.dfa.accepting[state]
+            }
+
+    @property
+    def state(self):
+        """Current state: a DFA state id in anchored mode, a subset id in search mode."""
+        if self.search:
+            return self._state
+        return self._state // self.dfa.class_count
+
+    @property
+    def is_accepting(self):
+        if self.search:
+            return self._accepting[self._state]
+        return self._state in self._accepting_offsets
+
+    def feed(self, chunk):
+        """Consume the next chunk and return the match end offsets found in it."""
+        if self.finished:
+            raise ValueError("Cannot feed a finished matcher, call reset() first")
+
+        matches = []
+        if not self._started:
+            self._started = True
+            if self.is_accepting:
+                matches.append(0)
+        classes = self.dfa.translate(chunk)
+        base = self.offset + 1
+        if self.search:
+            self._feed_search(classes, base, matches)
+        else:
+            self._feed_anchored(classes, base, matches)
+        self.offset += len(classes)
+        return matches
+
+    def finish(self):
+        """Mark the end of the input and return whether a match ends exactly there."""
+        self.finished = True
+        return self.is_accepting
+
+    def _feed_anchored(self, classes, base, matches):
+        table = self.dfa.table
+        dead = self.dfa.dead * self.dfa.class_count
+        accepting = self._accepting_offsets
+        state = self._state
+        if state == dead:
+            return
+        for i, symbol_class in enumerate(classes):
+            state = table[state + symbol_class]
+            if state in accepting:
+                matches.append(base + i)
+            elif state == dead:
+                break
+        self._state = state
+
+    def _feed_search(self, classes, base, matches):
+        rows = self._rows
+        accepting = self._accepting
+        state = self._state
+        for i, symbol_class in enumerate(classes):
+            next_state = rows[state][symbol_class]
+            if next_state is None:
+                next_state = self._step(state, symbol_class)
+            state = next_state
+            if accepting[state]:
+                matches.append(base + i)
+        self._state = state
+
+    def _subset_id(self, subset):
+        subset_id = self._subset_ids.get(subset)
+        if subset_id is None:
+            subset_id = len(self._subsets)
+            self._subset_ids[subset] = subset_id
+            self._subsets.append(subset)
+            self._rows.append([None] * self.dfa.class_count)
+            self._accepting.append(any(self.dfa.accepting[state] for state in subset))
+        return subset_id
+
+    def _step(self, subset_id, symbol_class):
+        dfa = self.dfa
+        k = dfa.class_count
+        next_states = {dfa.table[state * k + symbol_class] // k for state in self._subsets[subset_id]}
+        next_states.discard(dfa.dead)
+        # A new match attempt starts after every symbol.
+        next_states.add(dfa.start)
+        next_id = self._subset_id(frozenset(next_states))
+        self._rows[subset_id][symbol_class] = next_id
+        return next_id
+
+
+class LazyDFA:
+    """
+    DFA that is built on demand while matching, for alphabets too large to explore.
+
+    States are simplified derivatives of the regex, exactly as in build_dfa,
+    but a transition is only computed the first time the input takes it.
+    Computed transitions live in a cache holding at most ``max_transitions``
+    entries. When it fills up the whole cache is flushed and matching goes on
+    from the current state, rebuilding only what the input needs again (the
+    same strategy as RE2's DFA cache).
+    """
+
+    def __init__(self, regex, max_transitions: Optional[int] = 100_000):
+        self.start_state = simplify(regex)
+        self.max_transitions = max_transitions
+        self.flushes = 0
+        self.computed = 0
+        self._transitions = {}
+        self._size = 0
+
+    def next_state(self, state, symbol):
+        """Return the state reached from ``state`` on ``symbol``, computing it if needed."""
+        row = self._transitions.get(state)
+        if row is None:
+            row = self._transitions[state] = {}
+        next_state = row.get(symbol)
+        if next_state is None:
+            if self.max_transitions is not None and self._size >= self.max_transitions:
+                self.flush()
+                row = self._transitions[state] = {}
+            next_state = simplify(state.derivative(symbol))
+            row[symbol] = next_state
+            self._size += 1
+            self.computed += 1
+        return next_state
+
+    def accepts(self, string):
+        """Check if the regex matches the given string."""
+        state = self.start_state
+        empty = Empty()
+        transitions = self._transitions
+        for symbol in string:
+            row = transitions.get(state)
+            next_state = row.get(symbol) if row is not None else None
+            if next_state is None:
+                next_state = self.next_state(state, symbol)
+            state = next_state
+            if state is empty:
+                return False
+        return state.nullable()
+
+    def flush(self):
+        """Drop every cached transition."""
+        self._transitions.clear()
+        self._size = 0
+        self.flushes += 1
+
+    def __len__(self):
+        """Number of transitions currently in the cache."""
+        return self._size
+
+
 def simplify(regex):
     """
     Simplify regex expressions to canonical form to improve state identification.
+
+    Besides the local rules, the canonical form treats an alternative as a
+    sorted set of operands (flattened, deduplicated and rebuilt as a balanced
+    tree) and a concatenation as a flat, right-nested sequence of factors. That
+    way derivatives which only differ by associativity, commutativity or
+    idempotence of | become the same interned node, i.e. the same DFA state.
+    Results are memoized on the nodes.
     """
+    simplified = regex._simplified
+    if simplified is None:
+        simplified = _canonical(_simplify(regex))
+        regex._simplified = simplified
+    return simplified
+
+
+def _simplify(regex):
     if (
         isinstance(regex, Empty)
         or isinstance(regex, Epsilon)
@@ -184,20 +1017,17 @@ def simplify(regex):
     ):
         return regex
 
+    if isinstance(regex, CharClass):
+        # [] = ∅
+        return regex if regex.ranges else Empty()
+
     # For alternatives
     if isinstance(regex, Alternative):
-        left = simplify(regex.left)
-        right = simplify(regex.right)
-
-        if isinstance(left, Empty):
-            return right
-        if isinstance(right, Empty):
-            return left
-
-        if str(left) == str(right):
-            return left
-
-        return Alternative(left, right)
+        # r|∅ = r, r|r = r, (r|s)|t = r|(s|t), r|s = s|r
+        return _alternative_of(
+            _alternative_operands(simplify(regex.left))
+            | _alternative_operands(simplify(regex.right))
+        )
 
     # For concatenations
     if isinstance(regex, Concatenation):
@@ -213,7 +1043,17 @@ def simplify(regex):
         if isinstance(right, Epsilon):
             return left
 
-        return Concatenation(left, right)
+        # (rs)t = r(st); both sides are already flat, so only the factors of
+        # the left side have to be moved in front of the right side
+        factors = _concatenation_factors(left)
+        first = right.left if isinstance(right, Concatenation) else right
+        if factors[-1] is first and isinstance(first, KleeneStar):
+            # r*r* = r*
+            factors.pop()
+        result = right
+        for factor in reversed(factors):
+            result = _canonical(Concatenation(factor, result))
+        return result
 
     # For Kleene star
     if isinstance(regex, KleeneStar):
@@ -228,12 +1068,156 @@ def simplify(regex):
         if isinstance(inner, Empty):
             return Epsilon()
 
+        if isinstance(inner, Alternative):
+            # (ε|r)* = r*, (r*|s)* = (r|s)*
+            operands = set()
+            for operand in _alternative_operands(inner):
+                if isinstance(operand, KleeneStar):
+                    operands |= _alternative_operands(operand.expression)
+                elif not isinstance(operand, Epsilon):
+                    operands.add(operand)
+            inner = _alternative_of(operands)
+
         return KleeneStar(inner)
 
     return regex
 
 
-def build_dfa(regex: RegEx, alphabet: set[str]) -> Optional[DFA]:
+def _canonical(regex):
+    """Mark a node that is already in canonical form."""
+    regex._simplified = regex
+    return regex
+
+
+def _alternative_operands(regex):
+    """Set of operands of a simplified alternative."""
+    operands = set()
+    stack = [regex]
+    while stack:
+        regex = stack.pop()
+        if isinstance(regex, Alternative):
+            stack.append(regex.left)
+            stack.append(regex.right)
+        else:
+            operands.add(regex)
+    return operands
+
+
+def _concatenation_factors(regex):
+    """List of factors of a simplified (right-nested) concatenation."""
+    factors = []
+    while isinstance(regex, Concatenation):
+        factors.append(regex.left)
+        regex = regex.right
+    factors.append(regex)
+    return factors
+
+
+def _alternative_of(operands):
+    """Build the canonical alternative of a set of simplified operands."""
+    operands.discard(Empty())
+    if not operands:
+        return Empty()
+
+    # ε|r = r if r is nullable, r|r* = r*
+    if any(operand.nullable() and not isinstance(operand, Epsilon) for operand in operands):
+        operands.discard(Epsilon())
+    for star in [operand for operand in operands if isinstance(operand, KleeneStar)]:
+        operands.discard(star.expression)
+
+    return _balanced_alternative(sorted(operands, key=_creation_order))
+
+
+def _balanced_alternative(operands):
+    # A balanced tree keeps derivative() recursion logarithmic for big unions,
+    # and every subtree is itself the canonical form of its operands.
+    if len(operands) == 1:
+        return operands[0]
+    middle = len(operands) // 2
+    return _canonical(
+        Alternative(
+            _balanced_alternative(operands[:middle]),
+            _balanced_alternative(operands[middle:]),
+        )
+    )
+
+
+def _creation_order(regex):
+    return regex._order
+
+
+def alphabet_partition(regex, alphabet=None):
+    """
+    Split the alphabet into the classes of symbols the regex cannot tell apart.
+
+    ``regex`` may also be a list of regexes, the classes then work for all of them.
+    Every Symbol and CharClass in the regex is a union of the returned
+    CharClass blocks, so all symbols of a block have the same derivative with
+    respect to every state of the regex, and one representative per block is
+    enough to build the DFA. Without an alphabet the blocks cover all of
+    Unicode. Symbols of the alphabet that are not single characters cannot be
+    put in a range and are returned as they are.
+    """
+    # Sweep over the range boundaries. Leaf i owns bit i of the signature, so
+    # the signature of a stretch of code points is the set of leaves containing it.
+    toggles = {0: 0}
+    bits = {}
+    stack = list(regex) if isinstance(regex, (list, tuple)) else [regex]
+    seen = set(stack)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Symbol):
+            symbol = node.symbol
+            ranges = ((ord(symbol), ord(symbol)),) if isinstance(symbol, str) and len(symbol) == 1 else ()
+        elif isinstance(node, CharClass):
+            ranges = node.ranges
+        else:
+            for child in node._key[1:]:
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+            continue
+        if ranges in bits:
+            continue
+        bit = bits[ranges] = 1 << len(bits)
+        for first, last in ranges:
+            toggles[first] = toggles.get(first, 0) ^ bit
+            toggles[last + 1] = toggles.get(last + 1, 0) ^ bit
+
+    blocks = {}
+    signature = 0
+    points = sorted(toggles)
+    for point, next_point in zip(points, points[1:] + [MAX_CODEPOINT + 1]):
+        signature ^= toggles[point]
+        if point <= MAX_CODEPOINT:
+            blocks.setdefault(signature, []).append((point, next_point - 1))
+    partition = [CharClass(ranges) for ranges in blocks.values()]
+    if alphabet is None:
+        return partition
+
+    # Restrict the blocks to the symbols of the alphabet.
+    starts = []
+    owners = []
+    for i, block in enumerate(partition):
+        for first, _ in block.ranges:
+            starts.append(first)
+            owners.append(i)
+    order = sorted(range(len(starts)), key=starts.__getitem__)
+    starts = [starts[i] for i in order]
+    owners = [owners[i] for i in order]
+
+    members = {}
+    labels = []
+    for symbol in alphabet:
+        if isinstance(symbol, str) and len(symbol) == 1:
+            owner = owners[bisect.bisect_right(starts, ord(symbol)) - 1]
+            members.setdefault(owner, []).append(symbol)
+        else:
+            labels.append(symbol)
+    return [CharClass(symbols) for symbols in members.values()] + labels
+
+
+def build_dfa(regex: RegEx, alphabet: Optional[set[str]] = None) -> Optional[DFA]:
     # DONE: Implement the Brzozowski algorithm to convert regex to DFA
     # Steps:
     # 1. Start with the initial regex as the start state
@@ -249,7 +1233,7 @@ def build_dfa(regex: RegEx, alphabet: set[str]) -> Optional[DFA]:
     state_to_regex = {}  # Maps state names to their regex
     accept_states = set()  # Set of accepting state names
     transitions = {}  # Maps (state, symbol) pairs to next state
-    regex_to_state = {}  # Maps string representations of regex to state names
+    regex_to_state = {}  # Maps (interned) regex nodes to state names
 
     # Initialize state counter for generating unique state names
     state_counter = 0
@@ -258,25 +1242,32 @@ def build_dfa(regex: RegEx, alphabet: set[str]) -> Optional[DFA]:
         """ Funkcja która dla podanego regexu tworzy nowy stan i doda go dodaje go do obu słowników
          state_to_regex i regex_to_state. """
         nonlocal state_counter
-        regex_str = str(regex)
         state_name = f"q{state_counter}"
         state_counter += 1
         states.add(state_name)
         state_to_regex[state_name] = regex
-        regex_to_state[regex_str] = state_name
+        regex_to_state[regex] = state_name
         return state_name
     
+    regex = simplify(regex)
+    # Transitions are built per class of equivalent symbols, not per symbol.
+    labels = alphabet_partition(regex, alphabet)
+    representatives = [
+        (label.representative() if isinstance(label, CharClass) else label, label)
+        for label in labels
+    ]
+    alphabet = set(labels)
     start_state = add_new_state(regex)
     if regex.nullable():
         accept_states.add(start_state)
     ## Dodaje stan dla regexa startowego od razu sprawdzając czy jest to stan akceptujący
     stack = deque()
-    for symbol in alphabet:
-        stack.append((regex, symbol))
+    for symbol, label in representatives:
+        stack.append((regex, symbol, label))
     ## Tworzę stos tranzycji do rozpatrzenia wszystkich osiągalnych stanów i symboli 
 
     while len(stack) > 0:
-        prev_regex, symbol = stack.pop()
+        prev_regex, symbol, label = stack.pop()
         new_regex = simplify(prev_regex.derivative(symbol))
         ## Zdejmuję tranzycje ze stosu i sprawdzam pochodną regexu względem symbolu
 
@@ -284,20 +1275,20 @@ def build_dfa(regex: RegEx, alphabet: set[str]) -> Optional[DFA]:
             continue
             ## Jeśli regex jest niespełnialny to tranzycja nie ma gdzie prowadzić dlatego natychmiast kończę
 
-        if str(new_regex) in regex_to_state:
-            current_state = regex_to_state[str(new_regex)]
-            transitions[(regex_to_state[str(prev_regex)], symbol)] = current_state
+        current_state = regex_to_state.get(new_regex)
+        if current_state is not None:
+            transitions[(regex_to_state[prev_regex], label)] = current_state
             continue
             ## Jeśli istnieje już stan dla uzyskanego regexu to jedynie dodaję tranzycję do tego stanu, unikając nieskończonych pętli
 
         new_state = add_new_state(new_regex)
-        transitions[(regex_to_state[str(prev_regex)], symbol)] = new_state
+        transitions[(regex_to_state[prev_regex], label)] = new_state
         if new_regex.nullable():
-            accept_states.add(str(new_state))
+            accept_states.add(new_state)
         ## Tworzę nowy stan, dodaję do niego tranzycję i sprawdzam czy jest to stan akceptujący
 
-        for symbol in alphabet:
-            stack.append((new_regex, symbol))
+        for symbol, label in representatives:
+            stack.append((new_regex, symbol, label))
         ## Dodaję tranzycje na stos dla nowego regexu i wszystkich symboli z alfabetu
 
     # YOUR CODE HERE
@@ -305,3 +1296,55 @@ def build_dfa(regex: RegEx, alphabet: set[str]) -> Optional[DFA]:
     # Return the constructed DFA
     # You should return DFA(states, alphabet, transitions, start_state, accept_states)
     return DFA(states, alphabet, transitions, start_state, accept_states)
+
+
+def build_multi_dfa(regexes, alphabet=None, search=False) -> MultiDFA:
+    """
+    Build one DFA that runs all the regexes in lockstep (a product construction).
+
+    A state is the tuple of the simplified derivatives of every pattern, and it
+    is tagged with the ids of the patterns whose derivative is nullable. With
+    ``search`` every pattern is prefixed with Σ*, so MultiDFA.scan reports
+    every match of every pattern in one pass over the text.
+    """
+    regexes = [simplify(regex) for regex in regexes]
+    if search:
+        if alphabet is None:
+            anything = CharClass([(0, MAX_CODEPOINT)])
+        else:
+            anything = CharClass(
+                symbol for symbol in alphabet if isinstance(symbol, str) and len(symbol) == 1
+            )
+        regexes = [simplify(Concatenation(KleeneStar(anything), regex)) for regex in regexes]
+
+    labels = alphabet_partition(regexes, alphabet)
+    representatives = [
+        (label.representative() if isinstance(label, CharClass) else label, label)
+        for label in labels
+    ]
+    empty = Empty()
+
+    start = tuple(regexes)
+    names = {start: "q0"}
+    tags = {}
+    transitions = {}
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        name = names[state]
+        tag = frozenset(i for i, regex in enumerate(state) if regex.nullable())
+        if tag:
+            tags[name] = tag
+        for symbol, label in representatives:
+            next_state = tuple(
+                regex if regex is empty else simplify(regex.derivative(symbol)) for regex in state
+            )
+            if all(regex is empty for regex in next_state):
+                continue
+            next_name = names.get(next_state)
+            if next_name is None:
+                next_name = names[next_state] = f"q{len(names)}"
+                queue.append(next_state)
+            transitions[(name, label)] = next_name
+
+    return MultiDFA(set(names.values()), set(labels), transitions, "q0", tags)
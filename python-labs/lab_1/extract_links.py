@@ -1,5 +1,17 @@
+import codecs
 import re
 
+# DONE: Implement a regular expression pattern to extract links from HTML.
+# The pattern should capture three groups:
+# 1. The URL (href attribute value)
+# 2. The title attribute (which might not exist)
+# 3. The link text (content between <a> and </a> tags)
+LINK_PATTERN = re.compile(r"<a href=\"(?P<url>([^\"]+))\"(?: title=\"(?P<title>[^\"]*)\")?>(?P<text>.*?)</a>")
+## URL to dowolna ilość znaków pomiędzy dwoma cudzysłowami, dlatego żaden z nich nie może być cudzysłowem, więc używam [^\"]+.
+## Title to również dowolna ilość znaków pomiędzy cudzysłowami, ale jest opcjonalna, więc używam znaku zapytania.
+## Tekst to dowolna ilość znaków pomiędzy tagami a, więc używam .*?, co dopasowuję się do wszystkiego.
+## Dzięki zdefiniowanym grupom mogę później wydobyć potrzebne dane. 
+
 
 def extract_links(html: str) -> list[dict[str, str]]:
     """
@@ -15,22 +27,226 @@ def extract_links(html: str) -> list[dict[str, str]]:
             - 'text': the text between <a> and </a> tags
     """
 
-    # DONE: Implement a regular expression pattern to extract links from HTML.
-    # The pattern should capture three groups:
-    # 1. The URL (href attribute value)
-    # 2. The title attribute (which might not exist)
-    # 3. The link text (content between <a> and </a> tags)
-    pattern = r"<a href=\"(?P<url>([^\"]+))\"(?: title=\"(?P<title>[^\"]*)\")?>(?P<text>.*?)</a>"
-    ## URL to dowolna ilość znaków pomiędzy dwoma cudzysłowami, dlatego żaden z nich nie może być cudzysłowem, więc używam [^\"]+.
-    ## Title to również dowolna ilość znaków pomiędzy cudzysłowami, ale jest opcjonalna, więc używam znaku zapytania.
-    ## Tekst to dowolna ilość znaków pomiędzy tagami a, więc używam .*?, co dopasowuję się do wszystkiego.
-    ## Dzięki zdefiniowanym grupom mogę później wydobyć potrzebne dane. 
-   
     # DONE: Use re.finditer to find all matches of the pattern in the HTML
     # For each match, extract the necessary information and create a dictionary
     # Then append that dictionary to the 'links' list
     
-    links = [{"url": match.group("url"), "title": match.group("title"), "text": match.group("text")} for match in re.finditer(pattern, html)]
+    links = [match.groupdict() for match in LINK_PATTERN.finditer(html)]
     ## w List comprehension iteruje się po re.finditer i dla każdego matcha wydobywam potrzebne dane i umieszczam w słowniku.
+    # groupdict() builds the same {"url", "title", "text"} dictionary in a single call.
 
     return links
+
+
+def extract_links_batch(htmls) -> list[list[dict[str, str]]]:
+    """
+    Extract the links of many HTML strings, see extract_links.
+
+    Args:
+        htmls (Iterable[str]): HTML contents to analyze
+
+    Returns:
+        list[list[dict]]: The links of each HTML string, in the same order
+    """
+    finditer = LINK_PATTERN.finditer
+    return [[match.groupdict() for match in finditer(html)] for html in htmls]
+
+
+# Size of the blocks read from a file object by extract_links_stream.
+CHUNK_SIZE = 1 << 16
+
+_LINK_START = '<a href="'
+_TITLE_START = ' title="'
+# Candidates are first matched with LINK_PATTERN within this many characters,
+# which bounds the backtracking of ".*?" and handles most links in C.
+_FAST_MATCH_LENGTH = 256
+
+
+class _Finder:
+    """
+    The first occurrence of ``needle`` at or after a position of a growing buffer.
+
+    The result of the last search is kept, so queries at increasing positions
+    read every part of the buffer at most once, even as the buffer grows.
+    """
+
+    __slots__ = ("needle", "start", "found", "searched")
+
+    def __init__(self, needle):
+        self.needle = needle
+        # The last query position, its result (-1 for none yet) and the end of
+        # the part after it known to contain no occurrence.
+        self.start = 0
+        self.found = -1
+        self.searched = 0
+
+    def find(self, text, position):
+        if position < self.start or position > self.found != -1:
+            self.start = self.searched = position
+            self.found = -1
+        elif self.found != -1:
+            return self.found
+        self.found = text.find(self.needle, max(position, self.searched))
+        if self.found == -1:
+            self.searched = max(position, self.searched, len(text) - len(self.needle) + 1)
+        return self.found
+
+    def shift(self, offset):
+        """Account for ``offset`` characters removed from the front of the buffer."""
+        self.start -= offset
+        self.searched -= offset
+        if self.found != -1:
+            self.found -= offset
+
+
+class _LinkScanner:
+    """
+    Tokenizer state machine for LINK_PATTERN, run over a buffer that grows at its end.
+
+    A link candidate starts at every '<a href="'. Its URL runs to the next
+    quote, then comes either ">" or ' title="', the title up to the next quote
+    and ">". The text runs to the first "</a>", and the candidate fails if a
+    newline comes first, as ".*?" cannot match one. That is exactly what the
+    regular expression matches at that position; after a failure the next
+    candidate is tried, after a match the search goes on at its end.
+
+    A match of LINK_PATTERN in a prefix of the text is also its match in the
+    whole text, so a candidate is first tried with the regular expression on
+    a short prefix and only left to the state machine if that fails.
+    """
+
+    def __init__(self):
+        self.url_end = _Finder('"')
+        self.title_end = _Finder('"')
+        self.link_end = _Finder("</a>")
+        self.newline = _Finder("\n")
+
+    def shift(self, offset):
+        for finder in (self.url_end, self.title_end, self.link_end, self.newline):
+            finder.shift(offset)
+
+    def scan(self, text, position, final):
+        """
+        Yield the links in text[position:] and return the position of the first undecided candidate.
+
+        Everything before that position can be dropped from the buffer. With
+        ``final`` the text is complete and every candidate is decided.
+        """
+        fast_match = LINK_PATTERN.match
+        while True:
+            # The searches start after the previous candidate, so this reads every character once.
+            start = text.find(_LINK_START, position)
+            if start == -1:
+                # A '<a href="' may still begin in the last few characters.
+                return max(position, len(text) - len(_LINK_START) + 1)
+            link = fast_match(text, start, start + _FAST_MATCH_LENGTH)
+            if link is not None:
+                yield link.groupdict()
+                position = link.end()
+                continue
+            match = self.match(text, start, final)
+            if match is None:
+                return start
+            if match is False:
+                position = start + 1
+                continue
+            link, position = match
+            yield link
+
+    def match(self, text, start, final):
+        """A (link, end) pair for the candidate at ``start``, False if it fails, None if undecided yet."""
+        undecided = False if final else None
+        url_start = start + len(_LINK_START)
+        url_end = self.url_end.find(text, url_start)
+        if url_end == -1:
+            return undecided
+        if url_end == url_start:
+            return False
+
+        after = url_end + 1
+        if after >= len(text):
+            return undecided
+        if text[after] == ">":
+            title = None
+            text_start = after + 1
+        elif text.startswith(_TITLE_START, after):
+            title_start = after + len(_TITLE_START)
+            title_end = self.title_end.find(text, title_start)
+            if title_end == -1 or title_end + 1 >= len(text):
+                return undecided
+            if text[title_end + 1] != ">":
+                return False
+            title = text[title_start:title_end]
+            text_start = title_end + 2
+        elif _TITLE_START.startswith(text[after:]):
+            return undecided
+        else:
+            return False
+
+        text_end = self.link_end.find(text, text_start)
+        newline = self.newline.find(text, text_start)
+        if newline != -1 and (text_end == -1 or newline < text_end):
+            return False
+        if text_end == -1:
+            return undecided
+        return {"url": text[url_start:url_end], "title": title, "text": text[text_start:text_end]}, text_end + 4
+
+
+def _text_chunks(source, chunk_size):
+    if isinstance(source, str):
+        yield source
+        return
+    if hasattr(source, "read"):
+        file = source
+        source = iter(lambda: file.read(chunk_size), file.read(0))
+    decoder = None
+    for chunk in source:
+        if isinstance(chunk, str):
+            yield chunk
+            continue
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder("utf-8")()
+        yield decoder.decode(chunk)
+    if decoder is not None:
+        yield decoder.decode(b"", final=True)
+
+
+def extract_links_stream(source, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield the links of HTML that arrives in chunks, see extract_links.
+
+    Args:
+        source: An iterable of str or UTF-8 bytes chunks (e.g. read from a
+            socket), a text or binary file object read in blocks of
+            ``chunk_size``, or a whole HTML string
+
+    Yields:
+        dict: The links in the same order and form as extract_links returns
+            them for the whole HTML; links that span chunks are found as well
+
+    The time is linear in the size of the input. Only the undecided link
+    candidate is kept in memory besides the current chunk, so memory is
+    bounded unless a single link (or a '<a href="' with no closing quote or
+    line end) is huge.
+    """
+    scanner = _LinkScanner()
+    buffer = ""
+    # Everything in the buffer before ``position`` is decided.
+    position = 0
+    pending = []
+    pending_size = 0
+    for chunk in _text_chunks(source, chunk_size):
+        pending.append(chunk)
+        pending_size += len(chunk)
+        # While a long candidate stays undecided, wait until the new text is at
+        # least as long as the kept part, so that the buffer is copied O(1) times per character.
+        if pending_size < len(buffer) - position:
+            continue
+        buffer = buffer[position:] + "".join(pending)
+        scanner.shift(position)
+        pending.clear()
+        pending_size = 0
+        position = yield from scanner.scan(buffer, 0, final=False)
+    buffer = buffer[position:] + "".join(pending)
+    scanner.shift(position)
+    yield from scanner.scan(buffer, 0, final=True)
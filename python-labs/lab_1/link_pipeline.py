@@ -0,0 +1,273 @@
+"""
+Crawler-side link extraction: extract_links in worker processes, URL
+normalization and deduplication through a Bloom filter of bounded size.
+"""
+import hashlib
+import math
+import os
+import struct
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from lab_1.extract_links import extract_links
+
+_DEFAULT_PORTS = {"http": 80, "https": 443, "ftp": 21}
+
+
+def normalize_url(url: str, base: str = None) -> str:
+    """
+    Normalize a URL so that different spellings of the same address compare equal.
+
+    The URL is resolved against ``base`` (the address of the page it was
+    found on) with dot segments removed, the scheme and host are lowercased,
+    a default port and the fragment are dropped and an empty path becomes
+    "/". URLs with an invalid port are only resolved and stripped of the
+    fragment.
+    """
+    url = url.strip()
+    if base is not None:
+        url = urljoin(base, url)
+    parts = urlsplit(url)
+    try:
+        port = parts.port
+    except ValueError:
+        return urlunsplit(parts._replace(fragment=""))
+
+    netloc = parts.hostname or ""
+    if ":" in netloc:
+        netloc = f"[{netloc}]"
+    if parts.username is not None:
+        userinfo = parts.username if parts.password is None else f"{parts.username}:{parts.password}"
+        netloc = f"{userinfo}@{netloc}"
+    scheme = parts.scheme.lower()
+    if port is not None and port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+    path = _remove_dot_segments(parts.path) if netloc else parts.path
+    return urlunsplit((scheme, netloc, path or ("/" if netloc else ""), parts.query, ""))
+
+
+def _remove_dot_segments(path):
+    # RFC 3986, section 5.2.4; urljoin only does this for relative URLs.
+    segments = path.split("/")
+    result = []
+    for segment in segments:
+        if segment == "..":
+            if len(result) > 1:
+                result.pop()
+        elif segment != ".":
+            result.append(segment)
+    if segments[-1] in (".", ".."):
+        result.append("")
+    return "/".join(result)
+
+
+class BloomFilter:
+    """
+    Set membership in a fixed bit array, with false positives but no false negatives.
+
+    The array is sized for ``capacity`` items at a false positive rate of
+    ``error_rate``: ``-capacity * ln(error_rate) / ln(2)**2`` bits and
+    ``ln(2)`` times as many hash functions as bits per item, derived from one
+    blake2b digest by double hashing. Past the capacity the filter keeps
+    working with a growing false positive rate, see false_positive_rate().
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity < 1:
+            raise ValueError(f"Capacity must be positive, got {capacity}")
+        if not 0 < error_rate < 1:
+            raise ValueError(f"error_rate must be in (0, 1), got {error_rate}")
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        # Number of items added that were not (seemingly) in the filter already.
+        self.count = 0
+
+    def _hashes(self, item):
+        # Double hashing: the bit positions are position + i * step modulo the size, i < hash_count.
+        digest = hashlib.blake2b(item.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        size = self.size
+        return int.from_bytes(digest[:8], "little") % size, int.from_bytes(digest[8:], "little") % size or 1
+
+    def add(self, item: str) -> bool:
+        """Add an item, return True if it was not in the filter before."""
+        position, step = self._hashes(item)
+        bits = self.bits
+        size = self.size
+        new = False
+        for _ in range(self.hash_count):
+            byte = position >> 3
+            mask = 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+            position += step
+            if position >= size:
+                position -= size
+        self.count += new
+        return new
+
+    def __contains__(self, item):
+        position, step = self._hashes(item)
+        bits = self.bits
+        size = self.size
+        for _ in range(self.hash_count):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            position += step
+            if position >= size:
+                position -= size
+        return True
+
+    def __len__(self):
+        return self.count
+
+    def false_positive_rate(self) -> float:
+        """The expected false positive rate with the items added so far."""
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+
+    def memory_usage(self) -> int:
+        """Bytes taken by the bit array."""
+        return len(self.bits)
+
+    # File layout, little-endian: the header and the bit array.
+    MAGIC = b"BLM1"
+    _HEADER = struct.Struct("<4sQIQ")
+
+    def save(self, path):
+        """Write the filter to a file, so that a later run can load() it and go on."""
+        with open(path, "wb") as file:
+            file.write(self._HEADER.pack(self.MAGIC, self.size, self.hash_count, self.count))
+            file.write(self.bits)
+
+    @classmethod
+    def load(cls, path):
+        """Load a filter written by save()."""
+        with open(path, "rb") as file:
+            data = file.read()
+        if len(data) < cls._HEADER.size:
+            raise ValueError(f"{path} is not a Bloom filter file")
+        magic, size, hash_count, count = cls._HEADER.unpack_from(data)
+        if magic != cls.MAGIC or len(data) != cls._HEADER.size + (size + 7) // 8:
+            raise ValueError(f"{path} is not a Bloom filter file")
+        bloom_filter = cls.__new__(cls)
+        bloom_filter.size = size
+        bloom_filter.hash_count = hash_count
+        bloom_filter.count = count
+        bloom_filter.bits = bytearray(data[cls._HEADER.size:])
+        return bloom_filter
+
+
+def _extract_pages(pages, schemes):
+    """Worker task: the normalized link URLs of each (page URL, HTML) pair."""
+    results = []
+    for page_url, html in pages:
+        urls = []
+        for link in extract_links(html):
+            url = normalize_url(link["url"], page_url)
+            if schemes is None or urlsplit(url).scheme in schemes:
+                urls.append(url)
+        results.append((page_url, urls))
+    return results
+
+
+class LinkPipeline:
+    """
+    Pipeline stage of a crawler: extract the links of fetched pages and keep only new URLs.
+
+    Pages are extracted in ``workers`` processes, ``batch_size`` pages per
+    task, and the URLs are normalized (normalize_url) and filtered by
+    scheme there. The main process deduplicates them in ``index``, a
+    BloomFilter sized for ``capacity`` URLs at ``error_rate``, so the
+    memory of the index does not grow with the crawl. A false positive makes
+    a new URL look seen, with probability about ``error_rate``.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10_000_000,
+        error_rate: float = 0.001,
+        workers: int = None,
+        batch_size: int = 64,
+        schemes=("http", "https"),
+        index: BloomFilter = None,
+    ):
+        self.index = index if index is not None else BloomFilter(capacity, error_rate)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.schemes = frozenset(schemes) if schemes is not None else None
+        self.pages = 0
+        self.links = 0
+        self.new_urls = 0
+        self.seconds = 0.0
+
+    def run(self, pages):
+        """
+        Yield (page URL, new URLs) for each (page URL, HTML) pair of ``pages``, in order.
+
+        The new URLs are those not seen on any page before, each listed once.
+        Pages are read as tasks complete, with a bounded number of tasks in
+        flight, so ``pages`` can be an endless stream.
+        """
+        workers = self.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(workers) as executor:
+            max_in_flight = 2 * workers
+            in_flight = deque()
+            batch = []
+            for page in pages:
+                batch.append(page)
+                if len(batch) == self.batch_size:
+                    self._submit(executor, in_flight, batch)
+                    batch = []
+                    if len(in_flight) >= max_in_flight:
+                        yield from self._collect(in_flight)
+            if batch:
+                self._submit(executor, in_flight, batch)
+            while in_flight:
+                yield from self._collect(in_flight)
+
+    def _submit(self, executor, in_flight, batch):
+        start = time.perf_counter()
+        in_flight.append(executor.submit(_extract_pages, batch, self.schemes))
+        self.seconds += time.perf_counter() - start
+
+    def _collect(self, in_flight):
+        """The (page URL, new URLs) pairs of the oldest task in flight, once it completes."""
+        start = time.perf_counter()
+        results = self._deduplicate(in_flight.popleft().result())
+        self.seconds += time.perf_counter() - start
+        return results
+
+    def _deduplicate(self, results):
+        add = self.index.add
+        deduplicated = []
+        for page_url, urls in results:
+            self.pages += 1
+            self.links += len(urls)
+            new_urls = [url for url in urls if add(url)]
+            self.new_urls += len(new_urls)
+            deduplicated.append((page_url, new_urls))
+        return deduplicated
+
+    def stats(self) -> dict:
+        """
+        Counts and rates of the pages processed so far.
+
+        "seconds" is the time spent in the stage itself: submitting batches
+        to the workers, waiting for their results and deduplicating the URLs.
+        Time spent producing the pages or consuming the results is not
+        counted, so "pages_per_second" is the throughput of link extraction
+        alone, not of the whole crawl.
+        """
+        return {
+            "pages": self.pages,
+            "links": self.links,
+            "new_urls": self.new_urls,
+            "duplicates": self.links - self.new_urls,
+            "seconds": self.seconds,
+            "pages_per_second": self.pages / self.seconds if self.seconds else 0.0,
+            "index_memory": self.index.memory_usage(),
+            "false_positive_rate": self.index.false_positive_rate(),
+        }
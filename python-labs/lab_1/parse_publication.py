@@ -1,6 +1,36 @@
+import operator
 import re
+from array import array
 from typing import Optional
 
+# DONE: Implement regex patterns to match different parts of the reference
+# You need to create patterns for:
+# 1. Authors and year pattern
+# 2. Title and journal pattern
+# 3. Volume, issue, and pages pattern
+
+AUTHORS_YEAR_PATTERN = r"(\w+, \w\., )*\w+, \w\. \((?P<year>\d{4})\)." 
+## Zarówno imię jak i nazwisko autorów mogą być znakami polskimi (albo innymi znakami specjalnymi)
+## dlatego używam \w które wychwyci wszystkie "word characters" zgodnie z definicją.
+## Autorów może być dowolna ilość, z czego wszyscy oprócz ostatniego są oddzieleni przecinkiem i spacją.
+## Minimum jeden autor musi występować, więc ostatni pattern jest poza gwiazdką. Wzór na rok to 4 cyfry w nawiasach, a grupy używam potem do wydobycia roku.
+TITLE_JOURNAL_PATTERN = r" (?P<title>(?:\w| )+)\. (?P<journal>(?:\w| )+),"
+## Tytuł i czasopismo są oddzielone kropką i spacją. Tytuł podobnie jak autorzy może zawierać dowolne znaki specjalne i spacje, więc używam \w| do ich wyłapania.
+## Po tytule jest kropka, a po czasopiśmie przecinek. Grup używam do wydobycia tytułu i czasopisma.
+VOLUME_ISSUE_PAGES_PATTERN = r" (?P<volume>\d+)(?:\((?P<issue>\d+)\))?, (?P<start>\d+)-(?P<end>\d+)\."
+## Wolumin, wydanie i strony to już cyfry dlatego korzystam z \d. Wydanie jest opcjonalne, dlatego po jego grupie występuje znak zapytania.
+## Strony są oddzielone myślnikiem, a całość kończy się kropką. Grupy używam do wydobycia woluminu, wydania, stron początkowej i końcowej.
+
+# DONE: Combine the patterns
+PUBLICATION_PATTERN = re.compile(AUTHORS_YEAR_PATTERN + TITLE_JOURNAL_PATTERN + VOLUME_ISSUE_PAGES_PATTERN)
+
+# DONE: Create a pattern to match individual authors
+
+AUTHOR_PATTERN = re.compile(r"(\w+), (\w)\.")
+## Korzystam z dodatkowego patternu który do każdego nazwiska autora osobno się dopasowuje,
+## a jego grupy wykorzystam do wydobycia nazwiska i inicjału.
+
+
 def parse_publication(reference: str) -> Optional[dict]:
     """
     Parse academic publication reference and extract structured information.
@@ -17,54 +47,168 @@ def parse_publication(reference: str) -> Optional[dict]:
     Returns:
         Optional[dict]: A dictionary containing parsed publication data or None if the reference doesn't match expected format
     """
-    # DONE: Implement regex patterns to match different parts of the reference
-    # You need to create patterns for:
-    # 1. Authors and year pattern
-    # 2. Title and journal pattern
-    # 3. Volume, issue, and pages pattern
-
-    authors_year_pattern = r"(\w+, \w\., )*\w+, \w\. \((?P<year>\d{4})\)." 
-    ## Zarówno imię jak i nazwisko autorów mogą być znakami polskimi (albo innymi znakami specjalnymi)
-    ## dlatego używam \w które wychwyci wszystkie "word characters" zgodnie z definicją.
-    ## Autorów może być dowolna ilość, z czego wszyscy oprócz ostatniego są oddzieleni przecinkiem i spacją.
-    ## Minimum jeden autor musi występować, więc ostatni pattern jest poza gwiazdką. Wzór na rok to 4 cyfry w nawiasach, a grupy używam potem do wydobycia roku.
-    title_journal_pattern = r" (?P<title>(?:\w| )+)\. (?P<journal>(?:\w| )+),"
-    ## Tytuł i czasopismo są oddzielone kropką i spacją. Tytuł podobnie jak autorzy może zawierać dowolne znaki specjalne i spacje, więc używam \w| do ich wyłapania.
-    ## Po tytule jest kropka, a po czasopiśmie przecinek. Grup używam do wydobycia tytułu i czasopisma.
-    volume_issue_pages_pattern = r" (?P<volume>\d+)(?:\((?P<issue>\d+)\))?, (?P<start>\d+)-(?P<end>\d+)\."
-    ## Wolumin, wydanie i strony to już cyfry dlatego korzystam z \d. Wydanie jest opcjonalne, dlatego po jego grupie występuje znak zapytania.
-    ## Strony są oddzielone myślnikiem, a całość kończy się kropką. Grupy używam do wydobycia woluminu, wydania, stron początkowej i końcowej.
-    
-    # DONE: Combine the patterns
-    full_pattern = authors_year_pattern + title_journal_pattern + volume_issue_pages_pattern
     # DONE: Use re.match to try to match the full pattern against the reference
     # If there's no match, return None
-    if not re.match(full_pattern, reference):
+    match = PUBLICATION_PATTERN.match(reference)
+    if not match:
         return None
-    # DONE: Extract information using regex
-    # Each author should be parsed into a dictionary with 'last_name' and 'initial' keys
-    authors_list = []
-    # DONE: Create a pattern to match individual authors
+    return _publication(reference, match)
 
-    author_pattern = r"(\w+), (\w)\."
-    ## Korzystam z dodatkowego patternu który do każdego nazwiska autora osobno się dopasowuje,
-    ## a jego grupy wykorzystam do wydobycia nazwiska i inicjału.
 
+def _publication(reference, match):
+    # DONE: Extract information using regex
+    # Each author should be parsed into a dictionary with 'last_name' and 'initial' keys
     # DONE: Use re.finditer to find all authors and add them to authors_list
-
-    for match in re.finditer(author_pattern, reference):
-        authors_list.append({"last_name": match.group(1), "initial": match.group(2)})
+    authors_list = [{"last_name": last_name, "initial": initial} for last_name, initial in AUTHOR_PATTERN.findall(reference)]
     ## Dla każdego matcha pierwsza grupa to nazwisko, a druga to inicjał, te dane umieszczem w liście autorów.
 
     # DONE: Create and return the final result dictionary with all the parsed information
     # It should include authors, year, title, journal, volume, issue, and pages
-    match = re.match(full_pattern, reference)
+    year, title, journal, volume, issue, start, end = match.group("year", "title", "journal", "volume", "issue", "start", "end")
     result = {"authors": authors_list,
-              "year": int(match.group('year')),
-              "title": match.group('title'),
-              "journal": match.group('journal'),
-              "volume": int(match.group('volume')),
-              "issue": int(match.group('issue')) if match.group('issue') else None,
-              "pages": {'start': int(match.group('start')), 'end': int(match.group('end'))}}
+              "year": int(year),
+              "title": title,
+              "journal": journal,
+              "volume": int(volume),
+              "issue": int(issue) if issue else None,
+              "pages": {'start': int(start), 'end': int(end)}}
     ## Wszystkie dane wydobywam za pomocą zdefiniowanych wcześniej grup.
     return result
+
+
+def parse_publication_batch(references) -> list[Optional[dict]]:
+    """
+    Parse many publication references, see parse_publication.
+
+    Args:
+        references (Iterable[str]): Publication reference strings
+
+    Returns:
+        list[Optional[dict]]: The parsed data of each reference (None if it doesn't match), in the same order
+    """
+    match = PUBLICATION_PATTERN.match
+    results = []
+    for reference in references:
+        publication_match = match(reference)
+        results.append(_publication(reference, publication_match) if publication_match else None)
+    return results
+
+
+# Largest volume, issue or page number stored by parse_publications, the limit of a signed 32-bit array item.
+MAX_NUMBER = 2**31 - 1
+
+
+class Publications:
+    """
+    References parsed by parse_publications, stored in columns.
+
+    Row ``i`` holds the reference on line ``line_indexes[i]`` of the input:
+    ``years``, ``volumes``, ``issues`` (-1 when there is none) and the pages
+    ``starts`` and ``ends`` are arrays of numbers, ``titles`` a list. Journals
+    are stored as ``journal_ids`` into ``journal_names``, which holds each
+    distinct name once. The authors of row ``i`` are the items
+    ``author_offsets[i]:author_offsets[i + 1]`` of ``author_last_names`` and
+    ``author_initials``, whose equal strings are shared. ``failures`` holds
+    the indexes of the lines that are not references.
+
+    Indexing a row gives the dictionary that parse_publication returns, a
+    slice a list of them.
+    """
+
+    def __init__(self):
+        self.line_indexes = array("q")
+        self.years = array("H")
+        self.volumes = array("i")
+        self.issues = array("i")
+        self.starts = array("i")
+        self.ends = array("i")
+        self.titles = []
+        self.journal_ids = array("I")
+        self.journal_names = []
+        self.author_offsets = array("I", [0])
+        self.author_last_names = []
+        self.author_initials = []
+        self.failures = array("q")
+
+    def __len__(self):
+        return len(self.line_indexes)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        row = operator.index(row)
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("Publication row out of range")
+        first, last = self.author_offsets[row], self.author_offsets[row + 1]
+        return {
+            "authors": [
+                {"last_name": last_name, "initial": initial}
+                for last_name, initial in zip(self.author_last_names[first:last], self.author_initials[first:last])
+            ],
+            "year": self.years[row],
+            "title": self.titles[row],
+            "journal": self.journal_names[self.journal_ids[row]],
+            "volume": self.volumes[row],
+            "issue": None if self.issues[row] == -1 else self.issues[row],
+            "pages": {"start": self.starts[row], "end": self.ends[row]},
+        }
+
+    def __iter__(self):
+        return (self[row] for row in range(len(self)))
+
+
+def parse_publications(lines) -> Publications:
+    """
+    Parse a stream of publication references, one per line, into columns.
+
+    Lines are read one at a time, so ``lines`` may be an open file. A line is
+    parsed like parse_publication parses it; lines that it would not parse,
+    or with a volume, issue or page above MAX_NUMBER, are reported in
+    ``failures`` by their index.
+
+    Args:
+        lines (Iterable[str]): Publication reference strings
+
+    Returns:
+        Publications: The parsed references and the indexes of the failed lines
+    """
+    publications = Publications()
+    match = PUBLICATION_PATTERN.match
+    findall = AUTHOR_PATTERN.findall
+    journal_ids = {}
+    # One object per distinct author name or initial.
+    strings = {}
+    intern = strings.setdefault
+    for index, line in enumerate(lines):
+        publication_match = match(line)
+        if publication_match is None:
+            publications.failures.append(index)
+            continue
+        year, title, journal, volume, issue, start, end = publication_match.group(
+            "year", "title", "journal", "volume", "issue", "start", "end"
+        )
+        volume, start, end = int(volume), int(start), int(end)
+        issue = int(issue) if issue else -1
+        if max(volume, issue, start, end) > MAX_NUMBER:
+            publications.failures.append(index)
+            continue
+
+        publications.line_indexes.append(index)
+        publications.years.append(int(year))
+        publications.volumes.append(volume)
+        publications.issues.append(issue)
+        publications.starts.append(start)
+        publications.ends.append(end)
+        publications.titles.append(title)
+        journal_id = journal_ids.get(journal)
+        if journal_id is None:
+            journal_id = journal_ids[journal] = len(publications.journal_names)
+            publications.journal_names.append(journal)
+        publications.journal_ids.append(journal_id)
+        for last_name, initial in findall(line):
+            publications.author_last_names.append(intern(last_name, last_name))
+            publications.author_initials.append(intern(initial, initial))
+        publications.author_offsets.append(len(publications.author_last_names))
+    return publications
@@ -0,0 +1,40 @@
+"""
+Registry of the compiled regular expressions used by the lab_1 extractors.
+
+Each pattern is compiled once, when its module is imported, and the
+extractors call its methods directly. A call therefore skips the cache lookup
+of the ``re`` module, and the extractors never push other patterns out of
+that cache, which holds only 512 entries.
+"""
+import re
+
+from lab_1.analyze_text_file import (
+    DATE_PATTERNS,
+    EMAIL_PATTERN,
+    PARAGRAPH_SEPARATOR,
+    SENTENCE_END_PATTERN,
+    SENTENCE_PATTERN,
+    WORD_PATTERN,
+)
+from lab_1.extract_links import LINK_PATTERN
+from lab_1.parse_publication import AUTHOR_PATTERN, PUBLICATION_PATTERN
+
+PATTERNS: dict[str, re.Pattern] = {
+    "link": LINK_PATTERN,
+    "publication": PUBLICATION_PATTERN,
+    "author": AUTHOR_PATTERN,
+    "word": WORD_PATTERN,
+    "sentence": SENTENCE_PATTERN,
+    "sentence_end": SENTENCE_END_PATTERN,
+    "email": EMAIL_PATTERN,
+    "paragraph_separator": PARAGRAPH_SEPARATOR,
+    **{f"date_{index}": pattern for index, pattern in enumerate(DATE_PATTERNS)},
+}
+
+
+def get_pattern(name: str) -> re.Pattern:
+    """The compiled pattern registered under ``name``."""
+    try:
+        return PATTERNS[name]
+    except KeyError:
+        raise KeyError(f"Unknown pattern {name!r}, expected one of {', '.join(PATTERNS)}") from None
@@ -0,0 +1,274 @@
+"""
+Parser for regex pattern strings, feeding the derivative-based DFA builder.
+
+Supported syntax: literals, ``.`` (any character but a newline), character
+classes ``[a-z]``/``[^...]``, the escapes ``\\d \\w \\s \\D \\W \\S``
+(ASCII) and ``\\n \\t \\r \\f \\v``, groups ``(...)`` and ``(?:...)``,
+alternation ``|`` and the quantifiers ``* + ? {m} {m,} {m,n}``. Patterns
+always match the whole input, so anchors and other zero-width assertions are
+rejected, as are backreferences.
+"""
+import functools
+
+from lab_1.build_dfa import (
+    Alternative,
+    CharClass,
+    Concatenation,
+    Empty,
+    Epsilon,
+    KleeneStar,
+    RegEx,
+    Symbol,
+    build_dfa,
+)
+
+
+class RegexSyntaxError(ValueError):
+    """Raised for patterns that cannot be parsed, ``position`` is the offset of the problem."""
+
+    def __init__(self, message, pattern, position):
+        super().__init__(f"{message} at position {position} in {pattern!r}")
+        self.pattern = pattern
+        self.position = position
+
+
+_DIGITS = (("0", "9"),)
+_WORD = (("a", "z"), ("A", "Z"), ("0", "9"), "_")
+_SPACE = (" ", "\t", "\n", "\r", "\f", "\v")
+
+_CLASS_ESCAPES = {
+    "d": (_DIGITS, False),
+    "D": (_DIGITS, True),
+    "w": (_WORD, False),
+    "W": (_WORD, True),
+    "s": (_SPACE, False),
+    "S": (_SPACE, True),
+}
+_CHARACTER_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v", "0": "\0"}
+
+# Characters that cannot appear unescaped as a literal outside of a class.
+_SPECIAL = set("\\.^$|?*+()[]{}")
+
+
+def _balanced(node_class, items):
+    """Combine the items pairwise into a balanced tree of binary nodes."""
+    while len(items) > 1:
+        items = [
+            node_class(items[i], items[i + 1]) if i + 1 < len(items) else items[i]
+            for i in range(0, len(items), 2)
+        ]
+    return items[0]
+
+
+class _Parser:
+    """Recursive descent parser, one method per grammar rule."""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.position = 0
+
+    def error(self, message, position=None):
+        return RegexSyntaxError(message, self.pattern, self.position if position is None else position)
+
+    def peek(self):
+        if self.position < len(self.pattern):
+            return self.pattern[self.position]
+        return None
+
+    def take(self):
+        character = self.peek()
+        if character is None:
+            raise self.error("Unexpected end of pattern")
+        self.position += 1
+        return character
+
+    def parse(self):
+        regex = self.alternative()
+        if self.peek() is not None:
+            # Only an unmatched ")" can stop the top-level alternative early.
+            raise self.error("Unbalanced parenthesis")
+        return regex
+
+    def alternative(self):
+        # alternative := sequence ("|" sequence)*
+        operands = [self.sequence()]
+        while self.peek() == "|":
+            self.position += 1
+            operands.append(self.sequence())
+        return _balanced(Alternative, operands)
+
+    def sequence(self):
+        # sequence := (atom quantifier*)*
+        factors = []
+        while self.peek() not in (None, "|", ")"):
+            factors.append(self.quantified(self.atom()))
+        if not factors:
+            return Epsilon()
+        return _balanced(Concatenation, factors)
+
+    def quantified(self, regex):
+        while True:
+            start = self.position
+            character = self.peek()
+            if character == "*":
+                self.position += 1
+                regex = KleeneStar(regex)
+            elif character == "+":
+                self.position += 1
+                regex = Concatenation(regex, KleeneStar(regex))
+            elif character == "?":
+                self.position += 1
+                regex = Alternative(regex, Epsilon())
+            elif character == "{":
+                bounds = self.bounds()
+                if bounds is None:
+                    return regex
+                regex = self.repeat(regex, *bounds)
+            else:
+                return regex
+            if self.peek() == "?":
+                # Laziness only changes which match re reports, the language is the same.
+                self.position += 1
+            if self.peek() in ("*", "+", "?"):
+                raise self.error("Multiple repeat", start)
+
+    def bounds(self):
+        """Parse {m}, {m,} or {m,n}; None if the brace does not start a quantifier."""
+        start = self.position
+        end = self.pattern.find("}", start)
+        if end == -1:
+            return None
+        low, comma, high = self.pattern[start + 1:end].partition(",")
+        if not (low or high) or not (low + high).isascii():
+            return None
+        if (low and not low.isdigit()) or (high and not high.isdigit()):
+            return None
+        self.position = end + 1
+        low = int(low) if low else 0
+        high = int(high) if high else (None if comma else low)
+        if high is not None and high < low:
+            raise self.error("Min repeat greater than max repeat", start)
+        return low, high
+
+    @staticmethod
+    def repeat(regex, low, high):
+        # r{m,n} = r...r (r(r(...)?)?)?, nesting the optional copies keeps the DFA small.
+        if high is None:
+            tail = KleeneStar(regex)
+        else:
+            tail = Epsilon()
+            for _ in range(high - low):
+                tail = Alternative(Concatenation(regex, tail), Epsilon())
+        return _balanced(Concatenation, [regex] * low + [tail])
+
+    def atom(self):
+        start = self.position
+        character = self.take()
+        if character == "(":
+            if self.pattern.startswith("?:", self.position):
+                self.position += 2
+            elif self.peek() == "?":
+                raise self.error("Unsupported group extension", start)
+            regex = self.alternative()
+            if self.peek() != ")":
+                raise self.error("Missing ), unterminated subpattern", start)
+            self.position += 1
+            return regex
+        if character == "[":
+            return self.char_class(start)
+        if character == ".":
+            return CharClass(["\n"], negated=True)
+        if character == "\\":
+            return self.escape(start)
+        if character in "^$":
+            raise self.error("Anchors are not supported, patterns always match the whole input", start)
+        if character in "*+?":
+            raise self.error("Nothing to repeat", start)
+        if character == "{" and self.bounds_at(start):
+            raise self.error("Nothing to repeat", start)
+        if character == ")":
+            raise self.error("Unbalanced parenthesis", start)
+        return Symbol(character)
+
+    def bounds_at(self, start):
+        saved = self.position
+        self.position = start
+        try:
+            return self.bounds() is not None
+        finally:
+            self.position = saved
+
+    def escape(self, start):
+        character = self.take()
+        if character in _CLASS_ESCAPES:
+            items, negated = _CLASS_ESCAPES[character]
+            return CharClass(items, negated)
+        if character in _CHARACTER_ESCAPES:
+            return Symbol(_CHARACTER_ESCAPES[character])
+        if character in _SPECIAL or not character.isalnum():
+            return Symbol(character)
+        raise self.error(f"Unsupported escape \\{character}", start)
+
+    def class_item(self):
+        """One member of a [...] class: a character, or the ranges of a class escape."""
+        start = self.position
+        character = self.take()
+        if character != "\\":
+            return character, None
+        character = self.take()
+        if character in _CLASS_ESCAPES:
+            items, negated = _CLASS_ESCAPES[character]
+            return None, CharClass(items, negated).ranges
+        if character in _CHARACTER_ESCAPES:
+            return _CHARACTER_ESCAPES[character], None
+        if character == "b":
+            return "\b", None
+        if not character.isalnum():
+            return character, None
+        raise self.error(f"Unsupported escape \\{character}", start)
+
+    def char_class(self, start):
+        negated = self.peek() == "^"
+        if negated:
+            self.position += 1
+        items = []
+        first = True
+        while first or self.peek() != "]":
+            if self.peek() is None:
+                raise self.error("Unterminated character set", start)
+            item_start = self.position
+            character, ranges = self.class_item()
+            first = False
+            if ranges is not None:
+                items.extend(ranges)
+                continue
+            if self.peek() == "-" and self.pattern[self.position + 1:self.position + 2] not in ("]", ""):
+                self.position += 1
+                last, last_ranges = self.class_item()
+                if last_ranges is not None or ord(last) < ord(character):
+                    raise self.error("Bad character range", item_start)
+                items.append((character, last))
+            else:
+                items.append(character)
+        self.position += 1
+        regex = CharClass(items, negated)
+        return regex if regex.ranges else Empty()
+
+
+def parse(pattern: str) -> RegEx:
+    """Parse a pattern string into a RegEx tree."""
+    if not isinstance(pattern, str):
+        raise TypeError(f"Pattern must be a str, got {type(pattern).__name__}")
+    return _Parser(pattern).parse()
+
+
+@functools.lru_cache(maxsize=1024)
+def compile(pattern: str):
+    """
+    Compile a pattern into a minimal, table-driven CompiledDFA.
+
+    Results are kept in a process-wide LRU cache keyed by the pattern text, so
+    compiling the same pattern again is a dictionary lookup. Use
+    ``compile.cache_info()`` and ``compile.cache_clear()`` to inspect or reset it.
+    """
+    return build_dfa(parse(pattern)).minimize().compile()
@@ -1,6 +1,22 @@
+import io
+import mmap
 import os
+import re
 
-from lab_1.analyze_text_file import analyze_text_file
+from lab_1 import analyze_text_file as analyze_text_file_module
+from lab_1.analyze_text_file import (
+    DATE_PATTERNS,
+    EMAIL_PATTERN,
+    SENTENCE_PATTERN,
+    AnalysisCache,
+    SpaceSaving,
+    analyze_corpus,
+    analyze_text_file,
+    analyze_text_files,
+    count_sentences,
+    TextStatistics,
+    find_shards,
+)
 
 TEST_FILE_PATH = os.path.join("test_file.md")
 
@@ -148,3 +164,188 @@ class TestAnalyzeTextFile:
         assert (
             0.9 <= total_words_in_paras / result["word_count"] <= 1.1
         ), "Total words in paragraphs doesn't match overall word count"
+
+    def test_single_pass_matches_whole_content_scans(self, tmp_path):
+        content = (
+            "Dr. Smith wrote to jane.smith@university.edu on 2023-09-15.\n"
+            "It was a long, long day!\n \t\n"
+            "Second paragraph ends here.\n\n\n"
+            "Dates: 15.03.2023 and May 23, 1977. The THE the text text\n"
+            "  \n"
+            "no sentence end in this run of words, none at all"
+        )
+        path = tmp_path / "content.md"
+        path.write_text(content, encoding="utf-8")
+        result = analyze_text_file(path)
+
+        words = re.findall(r"\b\w+\b", content)
+        assert result["word_count"] == len(words)
+        assert result["sentence_count"] == len(SENTENCE_PATTERN.findall(content)) == 5
+        assert result["emails"] == [match.group() for match in EMAIL_PATTERN.finditer(content)]
+        assert result["dates"] == [
+            date for pattern in DATE_PATTERNS for date in pattern.findall(content)
+        ]
+        assert result["frequent_words"] == {"smith": 2, "2023": 2, "long": 2, "text": 2}
+        assert result["paragraph_sizes"] == {
+            i: len(re.findall(r"\b\w+\b", paragraph))
+            for i, paragraph in enumerate(re.split(r"\n\s*\n", content))
+        }
+
+    def test_count_sentences(self):
+        for text in ["", "a. b. c.\n", "a.. b!? c, d -e. ", "x" * 1000 + ".", " . .\n.\n", "Hi. There. "]:
+            assert count_sentences(text) == len(SENTENCE_PATTERN.findall(text)), text
+        assert count_sentences("a. b. c. ", 3, 7) == len(SENTENCE_PATTERN.findall("a. b. c. ", 3, 7))
+
+    def test_streaming_in_small_chunks(self):
+        expected = analyze_text_file(TEST_FILE_PATH)
+        with open(TEST_FILE_PATH, "rb") as file:
+            data = file.read()
+
+        # Chunks of a few bytes split words, emails, dates, separators and UTF-8 characters.
+        for chunk_size in (1, 7, 64):
+            assert analyze_text_file(TEST_FILE_PATH, chunk_size) == expected
+        assert analyze_text_file(io.BytesIO(data), 5) == expected
+        with open(TEST_FILE_PATH, encoding="utf-8") as file:
+            assert analyze_text_file(file, 5) == expected
+        with open(TEST_FILE_PATH, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                assert analyze_text_file(mapped, 3) == expected
+
+    def test_streaming_edge_cases(self):
+        # \r\n split between chunks, a paragraph longer than a chunk and
+        # trailing whitespace that could still become a separator.
+        content = "Line one.\r\nLine two ends.\r\n \r\n" + "word " * 50 + "\nlast.\n\n \n"
+        expected = {
+            "word_count": 56,
+            "sentence_count": 3,
+            "emails": [],
+            "frequent_words": {"line": 2, "word": 50},
+            "dates": [],
+            "paragraph_sizes": {0: 5, 1: 51, 2: 0},
+        }
+        for chunk_size in (1, 2, 3, 10, 1000):
+            assert analyze_text_file(io.BytesIO(content.encode()), chunk_size) == expected
+        assert analyze_text_file(b"") == analyze_text_file(io.BytesIO(b"")) == {
+            "word_count": 0,
+            "sentence_count": 0,
+            "emails": [],
+            "frequent_words": {},
+            "dates": [],
+            "paragraph_sizes": {0: 0},
+        }
+        assert "error" in analyze_text_file(io.BytesIO(b"ok\n\n" * 1000 + b"\xff"), 16)
+        assert "error" in analyze_text_file("missing_file.md")
+
+    def test_streaming_without_newlines(self, monkeypatch):
+        # A single line is cut at whitespace once it is longer than
+        # MAX_LINE_LENGTH, never inside a word, email, date or sentence end.
+        content = "Dr. Who met jane@example.org on May 23, 1977 and 2023-09-15. Then left!  It ends  . here? " * 40
+        expected = analyze_text_file(content.encode())
+        monkeypatch.setattr(analyze_text_file_module, "MAX_LINE_LENGTH", 16)
+        for chunk_size in (1, 5, 64):
+            assert analyze_text_file(io.BytesIO(content.encode()), chunk_size) == expected
+
+        statistics = TextStatistics()
+        for start in range(0, len(content), 50):
+            statistics.feed(content[start:start + 50])
+            assert len(statistics._rest) < 16 + 50
+        statistics.feed("", final=True)
+        assert statistics.result() == expected
+        assert expected["paragraph_sizes"] == {0: expected["word_count"]}
+
+    def test_find_shards(self, tmp_path):
+        path = tmp_path / "shards.md"
+        path.write_bytes(b"One two.\n\nThree\n \r\nfour.\n\n\nfive")
+        assert find_shards(path, 100) == [(0, 31)]
+        # Each shard ends after the first newline of a separator, the next one starts after the last.
+        assert find_shards(path, 4) == [(0, 9), (10, 16), (19, 25), (27, 31)]
+        path.write_bytes(b"no paragraph breaks at all")
+        assert find_shards(path, 4) == [(0, 26)]
+
+    def test_analyze_corpus(self, tmp_path):
+        expected = analyze_text_file(TEST_FILE_PATH)
+        for shard_size in (50, 1000, 1 << 20):
+            result = analyze_corpus([TEST_FILE_PATH], workers=2, shard_size=shard_size)
+            assert result.pop("errors") == {}
+            assert result == expected
+
+        first = tmp_path / "first.md"
+        first.write_text("Mail jd@agh.edu on 2024-01-02.\n\nHello hello world.\n")
+        second = tmp_path / "second.md"
+        second.write_text("Hello again, see 05/06/2024.\n\nBye jd@agh.edu!\n")
+        result = analyze_corpus([first, tmp_path / "missing.md", second], workers=2, shard_size=10)
+        assert result == {
+            "word_count": 21,
+            "sentence_count": 4,
+            "emails": ["jd@agh.edu", "jd@agh.edu"],
+            "frequent_words": {"agh": 2, "edu": 2, "2024": 2, "hello": 3},
+            "dates": ["2024-01-02", "05/06/2024"],
+            "paragraph_sizes": {0: 8, 1: 3, 2: 6, 3: 4},
+            "errors": {str(tmp_path / "missing.md"): result["errors"][str(tmp_path / "missing.md")]},
+        }
+        assert result["errors"][str(tmp_path / "missing.md")].startswith("Could not read file")
+
+    def test_space_saving(self):
+        summary = SpaceSaving(3)
+        for item in "aababcdaae":
+            summary.add(item)
+        # d replaced c (count 1), then e replaced b, the smallest of the counts 2.
+        assert summary.most_common() == [("a", 5), ("e", 3), ("d", 2)]
+        assert summary.error() == 2
+        assert summary.total == 10
+
+        other = SpaceSaving(3)
+        other.add("b", 4)
+        assert summary.merge(other).most_common(2) == [("b", 6), ("a", 5)]
+        assert summary.error() == 3
+        assert summary.memory_usage() > 0
+
+    def test_approximate_frequent_words(self):
+        expected = analyze_text_file(TEST_FILE_PATH)
+        result = analyze_text_file(TEST_FILE_PATH, word_error=0.001)
+        error = result.pop("frequent_words_error")
+        assert result.pop("frequent_words_memory") > 0
+        assert {key: value for key, value in result.items() if key != "frequent_words"} == {
+            key: value for key, value in expected.items() if key != "frequent_words"
+        }
+        # Counts are never too low, at most the reported error too high, and
+        # every word counted more often than the error is kept.
+        for word, count in result["frequent_words"].items():
+            assert 0 <= count - expected["frequent_words"].get(word, 1) <= error
+        for word, count in expected["frequent_words"].items():
+            assert count <= error or word in result["frequent_words"]
+
+        top = analyze_text_file(TEST_FILE_PATH, top_k=3)["frequent_words"]
+        assert top == dict(sorted(expected["frequent_words"].items(), key=lambda item: -item[1])[:3])
+        assert analyze_text_file(TEST_FILE_PATH, word_error=0.001, top_k=3)["frequent_words"].keys() <= result[
+            "frequent_words"
+        ].keys()
+
+    def test_analysis_cache(self, tmp_path):
+        expected = analyze_text_file(TEST_FILE_PATH)
+        with open(TEST_FILE_PATH, encoding="utf-8") as file:
+            content = file.read()
+        path = tmp_path / "document.md"
+        path.write_text(content, encoding="utf-8")
+
+        with AnalysisCache(tmp_path / "cache.sqlite") as cache:
+            assert analyze_text_file(path, cache=cache) == expected
+            paragraphs = cache.misses - 1
+            assert paragraphs > 10
+        with AnalysisCache(tmp_path / "cache.sqlite") as cache:
+            # Unchanged content: the whole result comes from the cache.
+            assert analyze_text_file(path, cache=cache) == expected
+            assert (cache.hits, cache.misses) == (1, 0)
+
+            # Only the edited paragraph is counted again.
+            first, separator, rest = content.partition("\n\n")
+            edited = first + " Extra words, see jd@agh.edu." + separator + rest
+            path.write_text(edited, encoding="utf-8")
+            assert analyze_text_file(path, cache=cache) == analyze_text_file(io.StringIO(edited))
+            assert cache.misses == 2
+            assert cache.hits == 1 + paragraphs - 1
+
+    def test_analyze_text_files(self):
+        results = analyze_text_files([TEST_FILE_PATH, "missing_file.md", TEST_FILE_PATH])
+        assert results[0] == results[2] == analyze_text_file(TEST_FILE_PATH)
+        assert "error" in results[1]
@@ -1,11 +1,24 @@
+import mmap
+import pickle
+
+import pytest
+
 from lab_1.build_dfa import (
     Alternative,
+    CharClass,
+    CompiledDFA,
     Concatenation,
+    DFAMatcher,
+    DerivativeCache,
     Empty,
     Epsilon,
     KleeneStar,
+    LazyDFA,
     Symbol,
+    alphabet_partition,
     build_dfa,
+    build_multi_dfa,
+    derivative_cache,
     simplify,
 )
 
@@ -144,3 +157,323 @@ class TestBrzozowskiDFA:
         assert str(simplify(KleeneStar(KleeneStar(a)))) == "(a)*"
         assert str(simplify(KleeneStar(Epsilon()))) == "ε"
         assert str(simplify(KleeneStar(Empty()))) == "ε"
+
+    def test_interning(self):
+        a = Symbol("a")
+        b = Symbol("b")
+
+        assert Symbol("a") is a
+        assert Empty() is Empty()
+        assert Epsilon() is Epsilon()
+        assert Concatenation(a, b) is Concatenation(Symbol("a"), Symbol("b"))
+        assert KleeneStar(Alternative(a, b)) is KleeneStar(Alternative(a, b))
+        assert Concatenation(a, b) is not Concatenation(b, a)
+        assert hash(Alternative(a, b)) == hash(Alternative(a, b))
+
+        star = KleeneStar(a)
+        assert star.derivative("a") is Concatenation(Epsilon(), star)
+        assert pickle.loads(pickle.dumps(star)) is star
+
+    def test_derivative_cache(self):
+        a = Symbol("a")
+        b = Symbol("b")
+        regex = Concatenation(KleeneStar(Alternative(a, b)), b)
+
+        cache = DerivativeCache(maxsize=2)
+        first = cache.derivative(regex, "a")
+        assert (cache.hits, cache.misses) == (0, 1)
+        assert cache.derivative(regex, "a") is first
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        cache.derivative(regex, "b")
+        cache.derivative(KleeneStar(a), "a")
+        assert len(cache) == 2
+        cache.derivative(regex, "a")
+        assert cache.misses == 4
+
+        cache.resize(0)
+        assert len(cache) == 0
+        cache.derivative(regex, "a")
+        assert len(cache) == 0
+
+        derivative_cache.clear()
+        dfa = build_dfa(regex, {"a", "b"})
+        assert dfa.accepts("abab")
+        assert derivative_cache.misses > 0
+
+    def test_aci_normal_form(self):
+        a = Symbol("a")
+        b = Symbol("b")
+        c = Symbol("c")
+
+        assert simplify(Alternative(a, Alternative(b, a))) is simplify(Alternative(b, a))
+        assert simplify(Alternative(a, b)) is simplify(Alternative(b, a))
+        assert simplify(Alternative(Alternative(a, b), c)) is simplify(Alternative(a, Alternative(b, c)))
+        assert simplify(Concatenation(Concatenation(a, b), c)) is simplify(
+            Concatenation(a, Concatenation(b, c))
+        )
+
+        star = KleeneStar(a)
+        assert simplify(Alternative(Epsilon(), star)) is star
+        assert simplify(Alternative(a, star)) is star
+        assert simplify(KleeneStar(KleeneStar(star))) is star
+        assert simplify(KleeneStar(Alternative(Epsilon(), a))) is star
+        assert simplify(Concatenation(star, star)) is star
+        assert simplify(KleeneStar(Alternative(star, b))) is simplify(KleeneStar(Alternative(a, b)))
+
+    def test_state_counts(self):
+        a = Symbol("a")
+        b = Symbol("b")
+        a_or_b = Alternative(a, b)
+
+        regex = Concatenation(KleeneStar(a_or_b), a)
+        for _ in range(5):
+            regex = Concatenation(regex, a_or_b)
+        dfa = build_dfa(regex, {"a", "b"})
+        assert len(dfa.states) == 64
+        assert dfa.accepts("babbbbb")
+        assert not dfa.accepts("bbabbbb")
+
+        regex = Concatenation(
+            KleeneStar(Concatenation(KleeneStar(a_or_b), KleeneStar(Alternative(b, a)))), b
+        )
+        dfa = build_dfa(regex, {"a", "b"})
+        assert len(dfa.states) == 2
+        assert dfa.accepts("aab")
+        assert not dfa.accepts("aba")
+
+    def test_minimize(self):
+        a = Symbol("a")
+        b = Symbol("b")
+        a_or_b = Alternative(a, b)
+
+        # (a*b*)*|(a|b)* and (a|b)* are the same language, but different regexes.
+        regex = Concatenation(
+            Alternative(KleeneStar(Concatenation(KleeneStar(a), KleeneStar(b))), KleeneStar(a_or_b)),
+            b,
+        )
+        dfa = build_dfa(regex, {"a", "b"})
+        minimal = dfa.minimize()
+        assert len(dfa.states) > len(minimal.states) == 2
+        for string in ["", "a", "b", "ab", "ba", "abab", "babb", "aaba"]:
+            assert minimal.accepts(string) == dfa.accepts(string)
+
+        assert len(minimal.minimize().states) == 2
+
+        empty = build_dfa(Concatenation(a, Empty()), {"a"}).minimize()
+        assert empty.states == {"q0"}
+        assert not empty.accepts("")
+        assert not empty.accepts("a")
+
+    def test_compiled_dfa(self):
+        a = Symbol("a")
+        b = Symbol("b")
+        c = Symbol("c")
+        # (a|b)*abb|c
+        regex = Alternative(
+            Concatenation(Concatenation(Concatenation(KleeneStar(Alternative(a, b)), a), b), b), c
+        )
+        dfa = build_dfa(regex, {"a", "b", "c"})
+        compiled = dfa.compile()
+
+        assert compiled.start == 0
+        assert compiled.dead == compiled.state_count - 1
+        assert len(compiled.table) == compiled.state_count * compiled.class_count
+        for string in ["", "abb", "aabb", "babb", "ab", "c", "cc", "abbc", "abbx", "xabb"]:
+            assert compiled.accepts(string) == dfa.accepts(string), string
+            assert compiled.accepts(string.encode()) == dfa.accepts(string), string
+
+        assert compiled.accepts("ab" * 100_000 + "abb")
+        assert not compiled.accepts("c" + "ab" * 100_000 + "abb")
+
+    def test_streaming_matcher(self):
+        a = Symbol("a")
+        b = Symbol("b")
+        # (a|b)*abb
+        regex = Concatenation(Concatenation(Concatenation(KleeneStar(Alternative(a, b)), a), b), b)
+        dfa = build_dfa(regex, {"a", "b"}).minimize()
+
+        matcher = DFAMatcher(dfa)
+        assert matcher.feed("ab") == []
+        assert matcher.feed("bab") == [3]
+        assert matcher.feed(b"b") == [6]
+        assert matcher.finish()
+        with pytest.raises(ValueError):
+            matcher.feed("a")
+
+        text = "xxabbabbbaabbxabb"
+        expected = [
+            end
+            for end in range(len(text) + 1)
+            if any(dfa.accepts(text[start:end]) for start in range(end + 1))
+        ]
+        matcher = dfa.compile().matcher(search=True)
+        found = []
+        for i in range(0, len(text), 3):
+            found += matcher.feed(text[i:i + 3])
+        assert found == expected == [5, 8, 13, 17]
+        assert matcher.finish()
+
+        matcher.reset()
+        assert matcher.feed("abbx") == [3]
+        assert not matcher.finish()
+
+    def test_lazy_dfa(self):
+        a = Symbol("a")
+        b = Symbol("b")
+        # (a|b)*abb
+        regex = Concatenation(Concatenation(Concatenation(KleeneStar(Alternative(a, b)), a), b), b)
+        dfa = build_dfa(regex, {"a", "b"})
+
+        lazy = LazyDFA(regex)
+        assert len(lazy) == 0
+        for string in ["", "abb", "aabb", "babb", "ab", "abba", "bbabbabb"]:
+            assert lazy.accepts(string) == dfa.accepts(string), string
+        # Symbols outside any declared alphabet simply lead to the empty state.
+        assert not lazy.accepts("abbż")
+        assert not lazy.accepts("żabb")
+        assert lazy.computed == len(lazy) < 2 * 4 + 2
+        assert lazy.flushes == 0
+
+        tiny = LazyDFA(regex, max_transitions=2)
+        for string in ["", "abb", "aabb", "babb", "ab", "abba", "bbabbabb"]:
+            assert tiny.accepts(string) == dfa.accepts(string), string
+        assert tiny.flushes > 0
+        assert len(tiny) <= 2
+
+    def test_char_class(self):
+        alnum = CharClass([("a", "z"), ("0", "9")])
+        assert alnum is CharClass(["0", ("1", "9"), (ord("a"), ord("m")), ("n", "z")])
+        assert alnum.ranges == ((ord("0"), ord("9")), (ord("a"), ord("z")))
+        assert str(alnum) == "[0-9a-z]"
+        assert str(CharClass(["\n"], negated=True)) == "[^\n]"
+        assert "q" in alnum and "7" in alnum and "A" not in alnum and "ab" not in alnum
+        assert simplify(CharClass([])) == Empty()
+        assert pickle.loads(pickle.dumps(alnum)) is alnum
+
+        # Every leaf is a union of blocks: [0-9a-z], [a-f] and Symbol("x") give
+        # [0-9g-wyz], [a-f], x and everything else.
+        hex_letter = CharClass([("a", "f")])
+        regex = Concatenation(KleeneStar(alnum), Alternative(hex_letter, Symbol("x")))
+        blocks = alphabet_partition(regex)
+        assert len(blocks) == 4
+        assert sum(last - first + 1 for block in blocks for first, last in block.ranges) == 0x110000
+        assert set(alphabet_partition(regex, {"a", "b", "x", "0", "?"})) == {
+            CharClass(["a", "b"]), CharClass(["x"]), CharClass(["0"]), CharClass(["?"])
+        }
+
+    def test_char_class_dfa(self):
+        word = CharClass([("a", "z"), ("0", "9")])
+        # [a-z0-9]+@[a-z0-9]+
+        regex = Concatenation(
+            Concatenation(word, KleeneStar(word)),
+            Concatenation(Symbol("@"), Concatenation(word, KleeneStar(word))),
+        )
+        dfa = build_dfa(regex)
+        for string, expected in [
+            ("jd42@example", True), ("a@b", True), ("@b", False), ("a@", False),
+            ("a@b@c", False), ("Jd@example", False), ("ż@b", False), ("", False),
+        ]:
+            assert dfa.accepts(string) == expected, string
+
+        # The transitions depend on the classes only, not on the size of the alphabet.
+        small = build_dfa(regex, {"a", "b", "1", "@"})
+        large = build_dfa(regex, {chr(codepoint) for codepoint in range(0x3000)})
+        assert len(small.transitions) == len(large.transitions) == len(dfa.transitions)
+        assert not small.accepts("c@a")
+        assert large.accepts("c@a")
+
+        minimal = dfa.minimize()
+        compiled = minimal.compile()
+        for string in ["jd42@example", "a@b", "@b", "a@b@c", "Jd@example", "ż@b"]:
+            assert minimal.accepts(string) == dfa.accepts(string), string
+            assert compiled.accepts(string) == dfa.accepts(string), string
+        assert compiled.accepts(b"jd42@example")
+        assert not compiled.accepts(b"\xff@example")
+
+        # Any character but a newline, then a Polish letter.
+        regex = Concatenation(KleeneStar(CharClass(["\n"], negated=True)), CharClass(["ą", "ż"]))
+        compiled = build_dfa(regex).minimize().compile()
+        assert compiled.accepts("zażółć gęślą jaż")
+        assert not compiled.accepts("ż\nż ")
+        with pytest.raises(TypeError):
+            compiled.accepts(b"abc")
+
+    def test_save_and_load(self, tmp_path):
+        # [a-z0-9]+@[a-z]+ followed by anything but a newline, then "ż"
+        word = CharClass([("a", "z"), ("0", "9")])
+        letters = CharClass([("a", "z")])
+        regex = Concatenation(
+            Concatenation(Concatenation(word, KleeneStar(word)), Concatenation(Symbol("@"), letters)),
+            Concatenation(KleeneStar(CharClass(["\n"], negated=True)), Symbol("ż")),
+        )
+        compiled = build_dfa(regex).minimize().compile()
+        path = tmp_path / "email.dfa"
+        compiled.save(path)
+
+        for shared in (True, False):
+            loaded = CompiledDFA.load(path, shared)
+            assert loaded.class_count == compiled.class_count
+            assert loaded.accepting == compiled.accepting
+            assert list(loaded.table) == list(compiled.table)
+            for string in ["jd@agh ż", "jd@agh\nż", "@agh ż", "jd@ż", "jd@aż", "Jd@aż", ""]:
+                assert loaded.accepts(string) == compiled.accepts(string), string
+            assert loaded.matcher(search=True).feed("x jd@a ż") == [8]
+
+        (tmp_path / "broken.dfa").write_bytes(b"DFA0" + bytes(20))
+        with pytest.raises(ValueError):
+            CompiledDFA.load(tmp_path / "broken.dfa")
+
+    def test_load_closes_the_artifact(self, tmp_path, monkeypatch):
+        compiled = build_dfa(Concatenation(Symbol("a"), KleeneStar(Symbol("b")))).minimize().compile()
+        path = tmp_path / "ab.dfa"
+        compiled.save(path)
+        maps = []
+
+        def mapping(*args, **kwargs):
+            maps.append(open_map(*args, **kwargs))
+            return maps[-1]
+
+        open_map = mmap.mmap
+        monkeypatch.setattr(mmap, "mmap", mapping)
+
+        loaded = CompiledDFA.load(path, shared=False)
+        assert maps[-1].closed
+        assert loaded.accepts("abb") and not loaded.accepts("ba")
+
+        with CompiledDFA.load(path) as loaded:
+            assert not maps[-1].closed
+            assert loaded.accepts("abb")
+        assert maps[-1].closed
+        with pytest.raises(ValueError):
+            loaded.table[0]
+        loaded.close()
+
+    def test_multi_dfa(self):
+        a = Symbol("a")
+        b = Symbol("b")
+        digit = CharClass([("0", "9")])
+        patterns = [
+            Concatenation(a, b),  # ab
+            Concatenation(KleeneStar(Alternative(a, b)), b),  # (a|b)*b
+            Concatenation(digit, KleeneStar(digit)),  # [0-9]+
+        ]
+
+        multi = build_multi_dfa(patterns)
+        assert multi.matches("ab") == {0, 1}
+        assert multi.matches("bb") == {1}
+        assert multi.matches("42") == {2}
+        assert multi.matches("a") == set()
+        assert multi.matches("x") == set()
+        minimal = multi.minimize()
+        assert len(minimal.states) <= len(multi.states)
+        for string in ["", "ab", "abb", "bab", "a", "1", "123", "1a"]:
+            assert minimal.matches(string) == multi.matches(string), string
+
+        search = build_multi_dfa(patterns, search=True).minimize()
+        assert search.scan("xab 12b") == [
+            (3, {0, 1}), (5, {2}), (6, {2}), (7, {1}),
+        ]
+        assert search.scan("") == []
+        with pytest.raises(ValueError):
+            search.compile().save("unused.dfa")
@@ -1,4 +1,10 @@
-from lab_1.extract_links import extract_links
+import io
+import re
+
+import pytest
+
+from lab_1.extract_links import extract_links, extract_links_batch, extract_links_stream
+from lab_1.patterns import PATTERNS, get_pattern
 
 
 class TestHtmlLinkExtraction:
@@ -42,3 +48,37 @@ class TestHtmlLinkExtraction:
         assert result[0]["title"] == "Strona główna"
         assert result[1]["text"] == "Lista wydziałów"
         assert result[2]["title"] == "Informacje dla studentów"
+
+    def test_batch(self):
+        htmls = [
+            "",
+            '<a href="https://www.agh.edu.pl">AGH</a>',
+            '<p><a href="a.html" title="A">a</a> <a href="b.html">b</a></p>',
+        ]
+        assert extract_links_batch(htmls) == [extract_links(html) for html in htmls]
+        assert extract_links_batch(iter(htmls[1:])) == [extract_links(html) for html in htmls[1:]]
+        assert extract_links_batch([]) == []
+
+    def test_pattern_registry(self):
+        assert get_pattern("link") is PATTERNS["link"]
+        assert all(isinstance(pattern, re.Pattern) for pattern in PATTERNS.values())
+        with pytest.raises(KeyError):
+            get_pattern("missing")
+
+    def test_stream(self):
+        html = (
+            '<p><a href="https://www.agh.edu.pl" title="Strona główna">AGH</a> <a href="">pusty</a> '
+            '<a href="a.html" title="x" class="y">a</a> <a href="b.html">bez\nkońca</a> <a href="c.html">c</a>\n'
+            '<a href="d.html" title="Wydziały">Wydziały AGH</a></p><a href="e.html">niedokończony'
+        )
+        expected = extract_links(html)
+        assert len(expected) == 3
+        # Every split point, also inside tags, titles and UTF-8 characters.
+        for split in range(len(html) + 1):
+            assert list(extract_links_stream([html[:split], html[split:]])) == expected
+        data = html.encode()
+        assert list(extract_links_stream(data[i:i + 1] for i in range(len(data)))) == expected
+        assert list(extract_links_stream(io.BytesIO(data), 5)) == expected
+        assert list(extract_links_stream(io.StringIO(html), 3)) == expected
+        assert list(extract_links_stream(html)) == expected
+        assert list(extract_links_stream([])) == []
@@ -0,0 +1,87 @@
+import random
+import time
+
+import pytest
+
+from lab_1.link_pipeline import BloomFilter, LinkPipeline, normalize_url
+
+
+class TestLinkPipeline:
+    def test_normalize_url(self):
+        assert normalize_url("HTTP://WWW.AGH.edu.pl") == "http://www.agh.edu.pl/"
+        assert normalize_url("https://agh.edu.pl:443/a/./b/../c?x=1#top") == "https://agh.edu.pl/a/c?x=1"
+        assert normalize_url("http://agh.edu.pl:8080/") == "http://agh.edu.pl:8080/"
+        assert normalize_url("../wydzialy#lista", "https://www.agh.edu.pl/studenci/info") == (
+            "https://www.agh.edu.pl/wydzialy"
+        )
+        assert normalize_url(" /a ", "https://Agh.edu.pl") == "https://agh.edu.pl/a"
+        assert normalize_url("http://User:Pass@[::1]:80/") == "http://User:Pass@[::1]/"
+        assert normalize_url("http://agh.edu.pl:port/#x") == "http://agh.edu.pl:port/"
+        assert normalize_url("mailto:jd@agh.edu.pl") == "mailto:jd@agh.edu.pl"
+
+    def test_bloom_filter(self, tmp_path):
+        bloom_filter = BloomFilter(10_000, 0.01)
+        assert bloom_filter.hash_count == 7
+        items = [f"https://example.com/{i}" for i in range(10_000)]
+        added = sum(bloom_filter.add(item) for item in items)
+        assert all(item in bloom_filter for item in items)
+        assert not bloom_filter.add(items[0])
+        false_positives = sum(f"https://example.org/{i}" in bloom_filter for i in range(10_000))
+        assert false_positives < 200
+        assert added == len(bloom_filter) > 9_900
+        assert bloom_filter.false_positive_rate() == pytest.approx(0.01, rel=0.2)
+        assert bloom_filter.memory_usage() == 11_982
+
+        bloom_filter.save(tmp_path / "index.bloom")
+        loaded = BloomFilter.load(tmp_path / "index.bloom")
+        assert loaded.bits == bloom_filter.bits
+        assert len(loaded) == len(bloom_filter)
+        assert all(item in loaded for item in items)
+        (tmp_path / "broken.bloom").write_bytes(b"BLM1")
+        with pytest.raises(ValueError):
+            BloomFilter.load(tmp_path / "broken.bloom")
+        with pytest.raises(ValueError):
+            BloomFilter(10, 1.5)
+
+    def test_pipeline(self):
+        rng = random.Random(0)
+        pages = []
+        for i in range(300):
+            links = "".join(
+                f'<a href="/page/{rng.randrange(100)}#s">strona</a> <a href="HTTPS://example.com/{i}">x</a>'
+                for _ in range(3)
+            )
+            pages.append((f"https://example.com/dir/{i}", links + '<a href="mailto:jd@agh.edu.pl">mail</a>'))
+
+        pipeline = LinkPipeline(capacity=10_000, error_rate=0.0001, workers=2, batch_size=16)
+        results = list(pipeline.run(iter(pages)))
+        assert [page_url for page_url, _ in results] == [page_url for page_url, _ in pages]
+        new_urls = [url for _, urls in results for url in urls]
+        expected = {f"https://example.com/page/{n}" for n in range(100)} & set(new_urls)
+        assert len(new_urls) == len(set(new_urls))
+        assert set(new_urls) == expected | {f"https://example.com/{i}" for i in range(300)}
+        assert "https://example.com/0" in results[0][1]
+
+        stats = pipeline.stats()
+        assert stats["pages"] == 300
+        assert stats["links"] == 1800
+        assert stats["new_urls"] == len(new_urls)
+        assert stats["duplicates"] == 1800 - len(new_urls)
+        assert stats["pages_per_second"] > 0
+        assert stats["index_memory"] == pipeline.index.memory_usage()
+
+    def test_rate_excludes_producer_and_consumer(self):
+        # A crawler fetching pages lazily and a slow consumer of the new URLs
+        # take 1 s together, which must not count as time of the stage.
+        def fetch():
+            for i in range(50):
+                time.sleep(0.01)
+                yield f"https://example.com/{i}", f'<a href="/{i + 1}">next</a>'
+
+        pipeline = LinkPipeline(capacity=1_000, workers=1, batch_size=4)
+        start = time.perf_counter()
+        for _ in pipeline.run(fetch()):
+            time.sleep(0.01)
+        assert time.perf_counter() - start >= 1.0
+        assert pipeline.stats()["pages"] == 50
+        assert pipeline.stats()["seconds"] < 0.5
@@ -1,4 +1,8 @@
-from lab_1.parse_publication import parse_publication
+import io
+
+import pytest
+
+from lab_1.parse_publication import parse_publication, parse_publication_batch, parse_publications
 
 
 class TestPublicationParsing:
@@ -47,3 +51,42 @@ class TestPublicationParsing:
     def test_invalid_references(self):
         assert parse_publication("Niepoprawna referencja") is None
         assert parse_publication("") is None
+
+    def test_batch(self):
+        references = [
+            "Kowalski, J., Nowak, A. (2023). Analiza algorytmów tekstowych. Journal of Computer Science, 45(2), 123-145.",
+            "Niepoprawna referencja",
+            "Kowalski, J. (2021). Podstawy wyrażeń regularnych. Computer Science Review, 30, 45-67.",
+        ]
+        assert parse_publication_batch(references) == [parse_publication(reference) for reference in references]
+        assert parse_publication_batch(reference for reference in references)[1] is None
+
+    def test_columnar_parsing(self):
+        lines = [
+            "Kowalski, J., Nowak, A. (2023). Analiza algorytmów tekstowych. Journal of Computer Science, 45(2), 123-145.\n",
+            "Niepoprawna referencja\n",
+            "Kowalski, J. (2021). Podstawy wyrażeń regularnych. Computer Science Review, 30, 45-67.\n",
+            "Nowak, A. (2020). Automaty skończone. Journal of Computer Science, 12(1), 1-9.\n",
+            "Nowak, A. (2020). Za duży tom. Journal of Computer Science, 99999999999, 1-9.\n",
+        ]
+        result = parse_publications(io.StringIO("".join(lines)))
+
+        assert len(result) == 3
+        assert list(result.line_indexes) == [0, 2, 3]
+        assert list(result.failures) == [1, 4]
+        assert list(result.years) == [2023, 2021, 2020]
+        assert list(result.issues) == [2, -1, 1]
+        assert list(result.starts) == [123, 45, 1]
+        assert result.journal_names == ["Journal of Computer Science", "Computer Science Review"]
+        assert list(result.journal_ids) == [0, 1, 0]
+        assert list(result.author_offsets) == [0, 2, 3, 4]
+        assert result.author_last_names[0] is result.author_last_names[2]
+        assert list(result) == [parse_publication(lines[i]) for i in (0, 2, 3)]
+        assert result[-1] == parse_publication(lines[3])
+        assert result[1:] == [parse_publication(lines[i]) for i in (2, 3)]
+        assert result[::-2] == [parse_publication(lines[i]) for i in (3, 0)]
+        assert result[5:] == []
+        with pytest.raises(IndexError):
+            result[3]
+        with pytest.raises(TypeError):
+            result["0"]
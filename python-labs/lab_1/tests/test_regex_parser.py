@@ -0,0 +1,55 @@
+import re
+
+import pytest
+
+from lab_1.build_dfa import Alternative, CharClass, Concatenation, Epsilon, KleeneStar, Symbol
+from lab_1.regex_parser import RegexSyntaxError, compile, parse
+
+
+class TestRegexParser:
+    def test_parse(self):
+        a = Symbol("a")
+        b = Symbol("b")
+        assert parse("") is Epsilon()
+        assert parse("ab") is Concatenation(a, b)
+        assert parse("a|b") is Alternative(a, b)
+        assert parse("(?:a|b)*") is KleeneStar(Alternative(a, b))
+        assert parse("a+") is Concatenation(a, KleeneStar(a))
+        assert parse("a?") is Alternative(a, Epsilon())
+        assert parse("[a-c_]") is CharClass([("a", "c"), "_"])
+        assert parse("[^\\n]") is parse(".")
+        assert parse("\\d") is CharClass([("0", "9")])
+        assert parse("\\.") is Symbol(".")
+
+    def test_matches_like_re(self):
+        patterns = [
+            "", "(a|b)*abb", "[a-c]+x?", "\\d{2,4}", "\\w+@\\w+\\.[a-z]{2,}", "[^ab]*",
+            ".*a.*", "a{3}", "a{,2}b", "(?:ab)+|c", "[\\d_-]+", "x{y", "[]a]+", "\\s\\S",
+        ]
+        words = [
+            "", "a", "abb", "babb", "ab", "aax", "12", "1234", "12345", "jd@agh.edu",
+            "jd@agh.e", "cd", "banana", "aaa", "aaab", "b", "abab", "c", "1_-2", "x{y",
+            "]a]", " x", "\n", "ą",
+        ]
+        for pattern in patterns:
+            compiled = compile(pattern)
+            expected = re.compile(pattern)
+            for word in words:
+                assert compiled.accepts(word) == bool(expected.fullmatch(word)), (pattern, word)
+
+    def test_syntax_errors(self):
+        for pattern in ["(", ")", "a**", "*", "[a", "^a", "a$", "\\b", "\\1", "[z-a]", "a{3,1}", "(?=a)"]:
+            with pytest.raises(RegexSyntaxError):
+                parse(pattern)
+
+        with pytest.raises(RegexSyntaxError) as error:
+            parse("ab(c")
+        assert error.value.position == 2
+
+    def test_compile_cache(self):
+        compile.cache_clear()
+        first = compile("[a-z]+@[a-z]+")
+        assert compile("[a-z]+@[a-z]+") is first
+        info = compile.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
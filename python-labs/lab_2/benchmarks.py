@@ -0,0 +1,273 @@
+"""
+Benchmarks for the lab_2 modules.
+
+Run them from the python-labs directory, either all at once or by name:
+
+    python -m lab_2.benchmarks
+    python -m lab_2.benchmarks calibrate
+
+The calibrate benchmark measures the thresholds used by lab_2.search. The
+size of the file searched by the stream benchmark (in GB, 0.5 by default) can be
+set with the STREAM_GB environment variable, e.g. STREAM_GB=10 for a file much
+larger than the memory.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from lab_2.boyer_moore_algorithm import BoyerMooreMatcher, boyer_moore_pattern_match
+from lab_2.kmp_algorithm import KMPMatcher, KMPStream, kmp_pattern_match
+from lab_2.rabin_karp_algorithm import RabinKarpMatcher
+from lab_2.search import ALGORITHMS, BOYER_MOORE_MIN_LENGTH, NAIVE_MAX_TEXT_RATIO, Matcher, search
+from lab_2.z_algorithm import ZMatcher, z_pattern_match
+
+ALPHABETS = {
+    2: "ab",
+    4: "ACGT",
+    26: "abcdefghijklmnopqrstuvwxyz",
+    94: "".join(map(chr, range(33, 127))),
+}
+PATTERN_LENGTHS = (2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64, 96, 128)
+
+
+def _best_time(function, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def _random_text(rng, alphabet, length):
+    return "".join(rng.choices(alphabet, k=length))
+
+
+def _patterns(rng, text, length, count):
+    """Substrings of the text, so that the pattern uses the alphabet of the text."""
+    starts = [rng.randrange(len(text) - length) for _ in range(count)]
+    return [text[start:start + length] for start in starts]
+
+
+def benchmark_calibrate(text_length=100_000, patterns=5, seed=0):
+    """Measure the crossover points of choose_algorithm() and print them as constants."""
+    rng = random.Random(seed)
+    print(f"calibrate (random texts of {text_length:,} characters, KMP / Boyer-Moore matchers):")
+    min_lengths = []
+    for alphabet_size, alphabet in ALPHABETS.items():
+        text = _random_text(rng, alphabet, text_length)
+        timings = []
+        for length in PATTERN_LENGTHS:
+            sample = _patterns(rng, text, length, patterns)
+            kmp = sum(_best_time(Matcher(pattern, "kmp").search, text) for pattern in sample)
+            boyer_moore = sum(_best_time(Matcher(pattern, "boyer_moore").search, text) for pattern in sample)
+            timings.append((length, kmp, boyer_moore))
+        print(
+            f"  alphabet {alphabet_size:>2}: "
+            + " ".join(f"{length}:{kmp / boyer_moore:.2f}" for length, kmp, boyer_moore in timings)
+        )
+        # The shortest length from which Boyer-Moore stays faster.
+        min_length = PATTERN_LENGTHS[-1] * 2
+        for length, kmp, boyer_moore in reversed(timings):
+            if boyer_moore >= kmp:
+                break
+            min_length = length
+        min_lengths.append(min_length)
+    print("  (KMP time / Boyer-Moore time by pattern length)")
+
+    # Single searches in texts a few times longer than the pattern, where the
+    # preprocessing of the pattern costs more than the naive algorithm saves.
+    ratios = (1, 2, 3, 4, 6, 8, 16)
+    naive_times = dict.fromkeys(ratios, 0.0)
+    other_times = dict.fromkeys(ratios, 0.0)
+    for length in (4, 16, 64):
+        pattern = _random_text(rng, ALPHABETS[26], length)
+        algorithm = Matcher(pattern).algorithm
+        for ratio in ratios:
+            texts = [_random_text(rng, ALPHABETS[26], ratio * length) for _ in range(500)]
+            naive_times[ratio] += _best_time(lambda: [search(text, pattern, "naive") for text in texts], repeat=5)
+            other_times[ratio] += _best_time(lambda: [search(text, pattern, algorithm) for text in texts], repeat=5)
+    print(
+        "  text / pattern length: "
+        + " ".join(f"{ratio}x:{naive_times[ratio] / other_times[ratio]:.2f}" for ratio in ratios)
+    )
+    print("  (naive time / chosen algorithm time, 500 searches with patterns of 4, 16 and 64 characters)")
+    # The text length ratio from which the preprocessing pays off.
+    naive_max_ratio = ratios[-1]
+    for ratio in reversed(ratios):
+        if naive_times[ratio] <= other_times[ratio]:
+            break
+        naive_max_ratio = ratio
+
+    # Merge the alphabet sizes that ended with the same length into the last one.
+    thresholds = [(size, length) for size, length in zip(ALPHABETS, min_lengths)]
+    thresholds[-1] = (None, thresholds[-1][1])
+    thresholds = tuple(
+        threshold for i, threshold in enumerate(thresholds)
+        if i + 1 == len(thresholds) or thresholds[i + 1][1] != threshold[1]
+    )
+    print(f"BOYER_MOORE_MIN_LENGTH = {thresholds}  # now {BOYER_MOORE_MIN_LENGTH}")
+    print(f"NAIVE_MAX_TEXT_RATIO = {naive_max_ratio}  # now {NAIVE_MAX_TEXT_RATIO}")
+
+
+def benchmark_search(text_length=200_000, seed=0):
+    """Compare search() with "auto" to every algorithm on a few kinds of inputs."""
+    rng = random.Random(seed)
+    cases = []
+    for alphabet_size in (2, 4, 26):
+        text = _random_text(rng, ALPHABETS[alphabet_size], text_length)
+        for length in (4, 16, 64):
+            cases.append((f"alphabet {alphabet_size}, pattern {length}", text, _patterns(rng, text, length, 1)[0]))
+    print(f"search (texts of {text_length:,} characters, ms):")
+    print(f"  {'':<26}" + "".join(f"{name:>12}" for name in ["auto", *ALGORITHMS]))
+    for name, text, pattern in cases:
+        timings = [_best_time(search, text, pattern, algorithm) for algorithm in ["auto", *ALGORITHMS]]
+        print(f"  {name:<26}" + "".join(f"{seconds * 1000:12.1f}" for seconds in timings))
+
+
+def benchmark_compiled_matchers(patterns=200, documents=1000, document_length=200, seed=0):
+    """Search many patterns in many documents, preprocessing per call or once per pattern."""
+    rng = random.Random(seed)
+    words = [_random_text(rng, ALPHABETS[26], rng.randint(2, 10)) for _ in range(2000)]
+    texts = [" ".join(rng.choices(words, k=document_length // 6))[:document_length] for _ in range(documents)]
+    sample = [" ".join(rng.choices(words, k=rng.randint(1, 3))) for _ in range(patterns)]
+    print(f"compiled matchers ({patterns} patterns, {documents} documents of {document_length} characters):")
+    for name, function, matcher_class in [
+        ("kmp", kmp_pattern_match, KMPMatcher),
+        ("boyer_moore", boyer_moore_pattern_match, BoyerMooreMatcher),
+        ("z", z_pattern_match, ZMatcher),
+    ]:
+        _, per_call = _timed(lambda: [function(text, pattern) for pattern in sample for text in texts])
+        matchers, compile_time = _timed(lambda: [matcher_class(pattern) for pattern in sample])
+        _, compiled = _timed(lambda: [matcher.findall(text) for matcher in matchers for text in texts])
+        _, count = _timed(lambda: [matcher.count(text) for matcher in matchers for text in texts])
+        print(
+            f"  {name:<12} per call {per_call:7.3f} s   compiled {compile_time:6.3f} s + findall {compiled:7.3f} s"
+            f" / count {count:7.3f} s"
+        )
+
+
+def benchmark_lazy_matches(megabytes=10):
+    """Time and peak memory of findall, count and the first match on a text full of matches."""
+    text = "ab" * (megabytes * 2**20 // 2)
+    matcher = KMPMatcher("ab")
+    print(f"lazy matches (KMP, {megabytes} MB text, {len(text) // 2:,} matches):")
+    for name, function in [
+        ("findall", matcher.findall),
+        ("count", matcher.count),
+        ("first match", lambda text: next(matcher.finditer(text))),
+    ]:
+        _, elapsed = _timed(function, text)
+        tracemalloc.start()
+        function(text)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {name:<12} {elapsed:8.3f} s, peak {peak / 2**20:8.1f} MB")
+
+
+def _write_stream_file(path, size, pattern, seed=0):
+    """Write a file of ``size`` bytes (in whole 64 KB blocks) of random words with the pattern in every 64 KB block."""
+    rng = random.Random(seed)
+    words = [_random_text(rng, ALPHABETS[26], rng.randint(2, 10)).encode() for _ in range(5000)]
+    blocks = []
+    for _ in range(1024):
+        block = b" ".join(rng.choices(words, k=11_000))[: (1 << 16) - len(pattern) - 2]
+        blocks.append(block + b" " + pattern + b" ")
+    data = b"".join(blocks)
+    size = max(size >> 16, 1) << 16
+    with open(path, "wb") as file:
+        for _ in range(size // len(data)):
+            file.write(data)
+        file.write(data[: size % len(data)])
+    return os.path.getsize(path)
+
+
+def benchmark_stream(gigabytes=None, chunk_size=1 << 20):
+    """Grep a file of STREAM_GB gigabytes with KMPStream and compare with reading it alone."""
+    gigabytes = gigabytes or float(os.environ.get("STREAM_GB", 0.5))
+    pattern = b"needle in a haystack"
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stream.txt")
+        size = _write_stream_file(path, int(gigabytes * 2**30), pattern)
+        print(f"stream ({size / 2**30:.2f} GB file, {chunk_size // 1024} KB chunks):")
+
+        def read_all():
+            with open(path, "rb", buffering=0) as file:
+                while file.read(chunk_size):
+                    pass
+
+        def grep():
+            with open(path, "rb", buffering=0) as file:
+                return sum(1 for _ in KMPStream(pattern).scan(file, chunk_size))
+
+        # Read the file first, so that both runs start from the same page cache state.
+        read_all()
+        _, read_time = _timed(read_all)
+        matches, grep_time = _timed(grep)
+        assert matches == size // (1 << 16)
+        print(f"  read only    {read_time:8.3f} s {size / 2**20 / read_time:8.0f} MB/s")
+        print(f"  KMPStream    {grep_time:8.3f} s {size / 2**20 / grep_time:8.0f} MB/s, {matches:,} matches")
+
+        with open(path, "rb") as file:
+            head = file.read(16 * 2**20)
+        _, automaton_time = _timed(lambda: sum(1 for _ in KMPMatcher(pattern).finditer(head)))
+        print(f"  KMP automaton alone on {len(head) / 2**20:.0f} MB: {len(head) / 2**20 / automaton_time:8.1f} MB/s")
+
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), "..", "lab_1", "tests", "test_file.md")
+
+
+def benchmark_rabin_karp(megabytes=1, patterns=20, seed=0):
+    """Verification rate and time of Rabin-Karp with the default modulus and in production mode."""
+    rng = random.Random(seed)
+    with open(TEST_FILE, encoding="utf-8") as file:
+        text = file.read()
+    text = (text * (megabytes * 2**20 // len(text) + 1))[: megabytes * 2**20]
+    words = [word for word in set(text.split()) if len(word) >= 4]
+    sample = rng.sample(sorted(words), patterns)
+    # Every window of "aaa..." has the hash of this pattern modulo 101 and only differs in the middle.
+    colliding = "a" * 25_000 + chr(ord("a") + 101) + "a" * 24_999
+    cases = [
+        (f"{megabytes} MB of natural-language text, {patterns} words", text, sample),
+        ("250,000 times 'a', a 50,000-character pattern colliding modulo 101", "a" * 250_000, [colliding]),
+    ]
+    print("rabin karp:")
+    for case, text, sample in cases:
+        print(f"  {case}:")
+        for name, matcher_class in [
+            ("prime 101", RabinKarpMatcher),
+            ("2**61 - 1", lambda pattern: RabinKarpMatcher.production(pattern, seed=seed)),
+            ("double", lambda pattern: RabinKarpMatcher.production(pattern, double=True, seed=seed)),
+        ]:
+            stats = {}
+            matchers = [matcher_class(pattern) for pattern in sample]
+            matches, elapsed = _timed(lambda: sum(matcher.count(text, stats) for matcher in matchers))
+            rate = stats["verifications"] / stats["windows"]
+            print(
+                f"    {name:<10} {elapsed:7.3f} s {matches:>7,} matches {stats['verifications']:>9,} verifications"
+                f" {stats['collisions']:>9,} collisions, verification rate {rate:.2e}"
+            )
+
+
+BENCHMARKS = {
+    "calibrate": benchmark_calibrate,
+    "search": benchmark_search,
+    "compiled_matchers": benchmark_compiled_matchers,
+    "lazy_matches": benchmark_lazy_matches,
+    "stream": benchmark_stream,
+    "rabin_karp": benchmark_rabin_karp,
+}
+
+
+if __name__ == "__main__":
+    for benchmark_name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[benchmark_name]()
@@ -1,3 +1,8 @@
+from types import MappingProxyType
+
+from lab_2.compiled_pattern import CompiledPattern
+
+
 def compute_bad_character_table(pattern: str) -> dict:
     """
     Compute the bad character table for the Boyer-Moore algorithm.
@@ -9,12 +14,13 @@ def compute_bad_character_table(pattern: str) -> dict:
         A dictionary with keys as characters and values as the rightmost position
         of the character in the pattern (0-indexed)
     """
-    # TODO: Implement the bad character heuristic for Boyer-Moore algorithm
+    # DONE: Implement the bad character heuristic for Boyer-Moore algorithm
     # This table maps each character to its rightmost occurrence in the pattern
     # For characters not in the pattern, they should not be in the dictionary
     # Remember that this is used to determine how far to shift when a mismatch occurs
 
-    return {}
+    # Later positions overwrite earlier ones, so each character keeps its rightmost position.
+    return {char: i for i, char in enumerate(pattern)}
 
 
 def compute_good_suffix_table(pattern: str) -> list[int]:
@@ -28,13 +34,37 @@ def compute_good_suffix_table(pattern: str) -> list[int]:
         A list where shift[i] stores the shift required when a mismatch
         happens at position i of the pattern
     """
-    # TODO: Implement the good suffix heuristic for Boyer-Moore algorithm
+    # DONE: Implement the good suffix heuristic for Boyer-Moore algorithm
     # This is a more complex rule that handles:
     # 1. When we have seen a suffix before elsewhere in the pattern
     # 2. When only a prefix of the suffix matches a prefix of the pattern
     # Hint: This involves two-phase preprocessing of the pattern
 
-    return [0] * (len(pattern) + 1)
+    m = len(pattern)
+    shift = [0] * (m + 1)
+    # border[i] is the start of the widest border of the suffix pattern[i:].
+    border = [0] * (m + 1)
+
+    # Phase 1: the suffix pattern[i:] occurs again in the pattern, preceded by another character.
+    i, j = m, m + 1
+    border[i] = j
+    while i > 0:
+        while j <= m and pattern[i - 1] != pattern[j - 1]:
+            if shift[j] == 0:
+                shift[j] = j - i
+            j = border[j]
+        i -= 1
+        j -= 1
+        border[i] = j
+
+    # Phase 2: only a part of the matched suffix is a prefix of the pattern.
+    j = border[0]
+    for i in range(m + 1):
+        if shift[i] == 0:
+            shift[i] = j
+        if i == j:
+            j = border[j]
+    return shift
 
 
 def boyer_moore_pattern_match(text: str, pattern: str) -> list[int]:
@@ -48,10 +78,58 @@ def boyer_moore_pattern_match(text: str, pattern: str) -> list[int]:
     Returns:
         A list of starting positions (0-indexed) where the pattern was found in the text
     """
-    # TODO: Implement the Boyer-Moore string matching algorithm
+    # DONE: Implement the Boyer-Moore string matching algorithm
     # 1. Preprocess the pattern to create the bad character and good suffix tables
     # 2. Start matching from the end of the pattern and move backwards
     # 3. When a mismatch occurs, use the maximum shift from both tables
     # 4. Return all positions where the pattern is found in the text
 
-    return []
+    return list(iter_boyer_moore_pattern_match(text, pattern))
+
+
+def iter_boyer_moore_pattern_match(text: str, pattern: str):
+    """Yield the positions of boyer_moore_pattern_match() one by one, without building a list."""
+    return BoyerMooreMatcher(pattern).finditer(text)
+
+
+def count_boyer_moore_pattern_match(text: str, pattern: str) -> int:
+    """Number of positions boyer_moore_pattern_match() would return, without building a list."""
+    return BoyerMooreMatcher(pattern).count(text)
+
+
+class BoyerMooreMatcher(CompiledPattern):
+    """A pattern compiled for the Boyer-Moore algorithm: both shift tables are computed once."""
+
+    __slots__ = ("_bad_character", "good_suffix")
+
+    def __init__(self, pattern: str):
+        super().__init__(pattern)
+        object.__setattr__(self, "_bad_character", compute_bad_character_table(pattern))
+        object.__setattr__(self, "good_suffix", tuple(compute_good_suffix_table(pattern)))
+
+    @property
+    def bad_character(self):
+        """The bad character table, as a read-only view."""
+        return MappingProxyType(self._bad_character)
+
+    def finditer(self, text: str):
+        """Yield the starting positions (0-indexed) of the pattern in the text, in order."""
+        pattern = self.pattern
+        good_suffix = self.good_suffix
+        rightmost = self._bad_character.get
+        m = len(pattern)
+        n = len(text)
+        if m == 0 or m > n:
+            return
+        s = 0
+        while s <= n - m:
+            j = m - 1
+            while j >= 0 and pattern[j] == text[s + j]:
+                j -= 1
+            if j < 0:
+                yield s
+                s += good_suffix[0]
+            else:
+                # The good suffix shift for pattern[j + 1:], or aligning the mismatched character
+                # with its rightmost occurrence in the pattern, whichever goes further.
+                s += max(good_suffix[j + 1], j - rightmost(text[s + j], -1))
@@ -0,0 +1,49 @@
+"""
+Base class of the compiled matchers (NaiveMatcher, RabinKarpMatcher,
+KMPMatcher, BoyerMooreMatcher and ZMatcher).
+"""
+import abc
+
+
+class CompiledPattern(abc.ABC):
+    """
+    A pattern with the tables of one algorithm computed once, for searching many texts.
+
+    Instances are immutable: the tables are tuples or read-only views and are
+    set only in the constructor, and a search keeps its state in local
+    variables. One matcher can therefore be shared by any number of threads.
+    Subclasses set their attributes with object.__setattr__ and implement
+    finditer().
+    """
+
+    __slots__ = ("pattern",)
+
+    def __init__(self, pattern: str):
+        object.__setattr__(self, "pattern", pattern)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @abc.abstractmethod
+    def finditer(self, text: str):
+        """Yield the starting positions (0-indexed) of the pattern in the text, in order."""
+
+    def findall(self, text: str) -> list[int]:
+        """A list of the starting positions (0-indexed) of the pattern in the text."""
+        return list(self.finditer(text))
+
+    def count(self, text: str) -> int:
+        """Number of (possibly overlapping) occurrences of the pattern in the text."""
+        count = 0
+        for _ in self.finditer(text):
+            count += 1
+        return count
+
+    def __reduce__(self):
+        return type(self), (self.pattern,)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.pattern!r})"
@@ -1,3 +1,6 @@
+from lab_2.compiled_pattern import CompiledPattern
+
+
 def compute_lps_array(pattern: str) -> list[int]:
     """
     Compute the Longest Proper Prefix which is also Suffix array for KMP algorithm.
@@ -8,13 +11,22 @@ def compute_lps_array(pattern: str) -> list[int]:
     Returns:
         The LPS array
     """
-    # TODO: Implement the Longest Prefix Suffix (LPS) array computation
+    # DONE: Implement the Longest Prefix Suffix (LPS) array computation
     # The LPS array helps in determining how many characters to skip when a mismatch occurs
     # For each position i, compute the length of the longest proper prefix of pattern[0...i]
     # that is also a suffix of pattern[0...i]
     # Hint: Use the information from previously computed values to avoid redundant comparisons
 
-    return [0] * len(pattern)
+    lps = [0] * len(pattern)
+    length = 0
+    for i in range(1, len(pattern)):
+        # Fall back to shorter borders until the next character extends one of them.
+        while length and pattern[i] != pattern[length]:
+            length = lps[length - 1]
+        if pattern[i] == pattern[length]:
+            length += 1
+        lps[i] = length
+    return lps
 
 
 def kmp_pattern_match(text: str, pattern: str) -> list[int]:
@@ -28,10 +40,148 @@ def kmp_pattern_match(text: str, pattern: str) -> list[int]:
     Returns:
         A list of starting positions (0-indexed) where the pattern was found in the text
     """
-    # TODO: Implement the KMP string matching algorithm
+    # DONE: Implement the KMP string matching algorithm
     # 1. Preprocess the pattern to compute the LPS array
     # 2. Use the LPS array to determine how much to shift the pattern when a mismatch occurs
     # 3. This avoids redundant comparisons by using information about previous matches
     # 4. Return all positions where the pattern is found in the text
 
-    return []
\ No newline at end of file
+    return list(iter_kmp_pattern_match(text, pattern))
+
+
+def iter_kmp_pattern_match(text: str, pattern: str):
+    """Yield the positions of kmp_pattern_match() one by one, without building a list."""
+    return KMPMatcher(pattern).finditer(text)
+
+
+def count_kmp_pattern_match(text: str, pattern: str) -> int:
+    """Number of positions kmp_pattern_match() would return, without building a list."""
+    return KMPMatcher(pattern).count(text)
+
+
+class KMPMatcher(CompiledPattern):
+    """A pattern compiled for the KMP algorithm: its LPS array is computed once."""
+
+    __slots__ = ("lps",)
+
+    def __init__(self, pattern: str):
+        super().__init__(pattern)
+        object.__setattr__(self, "lps", tuple(compute_lps_array(pattern)))
+
+    def finditer(self, text: str):
+        """Yield the starting positions (0-indexed) of the pattern in the text, in order."""
+        pattern = self.pattern
+        lps = self.lps
+        m = len(pattern)
+        if m == 0 or m > len(text):
+            return
+        # Number of characters of the pattern matched so far, the state of the automaton.
+        matched = 0
+        for i, char in enumerate(text):
+            while matched and char != pattern[matched]:
+                matched = lps[matched - 1]
+            if char == pattern[matched]:
+                matched += 1
+                if matched == m:
+                    yield i - m + 1
+                    matched = lps[matched - 1]
+
+# Size of the blocks read from a file object, socket or mmap by KMPStream.scan.
+CHUNK_SIZE = 1 << 20
+
+
+def _advance(pattern, lps, chunk, matched, offset, matches):
+    """Run the KMP automaton over a chunk starting in state ``matched``, return the end state."""
+    m = len(pattern)
+    for i, char in enumerate(chunk):
+        while matched and char != pattern[matched]:
+            matched = lps[matched - 1]
+        if char == pattern[matched]:
+            matched += 1
+            if matched == m:
+                matches.append(offset + i - m + 1)
+                matched = lps[matched - 1]
+    return matched
+
+
+class KMPStream:
+    """
+    KMP over a text that arrives in chunks, with offsets counted from the start of the stream.
+
+    The only state carried from one chunk to the next is the state of the KMP
+    automaton, the number of pattern characters matched at the end of the
+    data so far, which is less than the pattern length m. The automaton runs
+    only over the first m - 1 characters of each chunk, where a match that
+    began in earlier chunks can end, and over the last m - 1, to find the
+    state for the next chunk. The matches inside a chunk are found with its
+    find() method, in C, so that a scan keeps up with a disk.
+
+    The pattern and the chunks are all bytes (offsets are byte offsets) or
+    all str (offsets are character offsets). Besides bytes, a chunk can be a
+    bytearray or an mmap.
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.lps = tuple(compute_lps_array(pattern))
+        self.matched = 0
+        self.offset = 0
+
+    def reset(self):
+        """Start a new stream."""
+        self.matched = 0
+        self.offset = 0
+
+    def feed(self, chunk) -> list[int]:
+        """The offsets of the matches that end in this chunk, in order."""
+        pattern = self.pattern
+        m = len(pattern)
+        n = len(chunk)
+        offset = self.offset
+        matches = []
+        if m == 0:
+            self.offset += n
+            return matches
+
+        matched = self.matched
+        if matched or n < m - 1:
+            matched = _advance(pattern, self.lps, chunk[:m - 1], matched, offset, matches)
+        # Matches that start in this chunk; the overlapping ones too. The explicit
+        # start matters for an mmap, whose find() starts at its file position.
+        find = chunk.find
+        position = find(pattern, 0)
+        while position != -1:
+            matches.append(offset + position)
+            position = find(pattern, position + 1)
+        if n >= m - 1:
+            # A match in progress at the end of the chunk began in its last m - 1 characters.
+            matched = _advance(pattern, self.lps, chunk[n - m + 1:], 0, 0, [])
+
+        self.matched = matched
+        self.offset = offset + n
+        return matches
+
+    def scan(self, source, chunk_size: int = CHUNK_SIZE):
+        """
+        Yield the offsets of the pattern in a stream, in order.
+
+        Args:
+            source: A file object or an mmap (read with read()), a socket
+                (read with recv()) or an iterable of chunks
+            chunk_size: Size of the blocks read from a file object, mmap or socket
+
+        Yields:
+            int: Offset of each match from the start of the stream, including
+                the data fed before
+        """
+        if hasattr(source, "recv"):
+            sock = source
+            source = iter(lambda: sock.recv(chunk_size), b"")
+        elif hasattr(source, "read"):
+            file = source
+            source = iter(lambda: file.read(chunk_size), file.read(0))
+        for chunk in source:
+            yield from self.feed(chunk)
+
+    def __repr__(self):
+        return f"KMPStream({self.pattern!r}, offset={self.offset})"
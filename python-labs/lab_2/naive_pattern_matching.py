@@ -1,3 +1,6 @@
+from lab_2.compiled_pattern import CompiledPattern
+
+
 def naive_pattern_match(text: str, pattern: str) -> list[int]:
     """
     Implementation of the naive pattern matching algorithm.
@@ -9,11 +12,38 @@ def naive_pattern_match(text: str, pattern: str) -> list[int]:
     Returns:
         A list of starting positions (0-indexed) where the pattern was found in the text
     """
-    # TODO: Implement the naive pattern matching algorithm
+    # DONE: Implement the naive pattern matching algorithm
     # This is the most straightforward approach to string matching:
     # 1. Check every possible starting position in the text
     # 2. For each position, compare the pattern with the text character by character
     # 3. If all characters match, add the starting position to the results
     # 4. Handle edge cases like empty patterns and patterns longer than the text
 
-    return []
\ No newline at end of file
+    return list(iter_naive_pattern_match(text, pattern))
+
+
+def iter_naive_pattern_match(text: str, pattern: str):
+    """Yield the positions of naive_pattern_match() one by one, without building a list."""
+    return NaiveMatcher(pattern).finditer(text)
+
+
+def count_naive_pattern_match(text: str, pattern: str) -> int:
+    """Number of positions naive_pattern_match() would return, without building a list."""
+    return NaiveMatcher(pattern).count(text)
+
+
+class NaiveMatcher(CompiledPattern):
+    """The naive algorithm with the interface of the compiled matchers; it has no tables."""
+
+    __slots__ = ()
+
+    def finditer(self, text: str):
+        """Yield the starting positions (0-indexed) of the pattern in the text, in order."""
+        pattern = self.pattern
+        m = len(pattern)
+        if m == 0 or m > len(text):
+            return
+        for i in range(len(text) - m + 1):
+            # The slice comparison checks the characters one by one and stops at the first mismatch.
+            if text[i:i + m] == pattern:
+                yield i
\ No newline at end of file
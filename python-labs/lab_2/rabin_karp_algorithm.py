@@ -1,3 +1,14 @@
+import random
+
+from lab_2.compiled_pattern import CompiledPattern
+
+# Characters are digits of a number in this base, reduced modulo the prime.
+BASE = 256
+# Moduli of RabinKarpMatcher.production(), the Mersenne primes 2**61 - 1 and 2**31 - 1.
+MERSENNE_PRIME = (1 << 61) - 1
+SECOND_MERSENNE_PRIME = (1 << 31) - 1
+
+
 def rabin_karp_pattern_match(text: str, pattern: str, prime: int = 101) -> list[int]:
     """
     Implementation of the Rabin-Karp pattern matching algorithm.
@@ -10,7 +21,7 @@ def rabin_karp_pattern_match(text: str, pattern: str, prime: int = 101) -> list[
     Returns:
         A list of starting positions (0-indexed) where the pattern was found in the text
     """
-    # TODO: Implement the Rabin-Karp string matching algorithm
+    # DONE: Implement the Rabin-Karp string matching algorithm
     # This algorithm uses hashing to find pattern matches:
     # 1. Compute the hash value of the pattern
     # 2. Compute the hash value of each text window of length equal to pattern length
@@ -19,4 +30,169 @@ def rabin_karp_pattern_match(text: str, pattern: str, prime: int = 101) -> list[
     # 5. Return all positions where the pattern is found in the text
     # Note: Use the provided prime parameter for the hash function to avoid collisions
 
-    return []
\ No newline at end of file
+    return list(iter_rabin_karp_pattern_match(text, pattern, prime))
+
+
+def iter_rabin_karp_pattern_match(text: str, pattern: str, prime: int = 101):
+    """Yield the positions of rabin_karp_pattern_match() one by one, without building a list."""
+    return RabinKarpMatcher(pattern, prime).finditer(text)
+
+
+def count_rabin_karp_pattern_match(text: str, pattern: str, prime: int = 101) -> int:
+    """Number of positions rabin_karp_pattern_match() would return, without building a list."""
+    return RabinKarpMatcher(pattern, prime).count(text)
+
+
+def _hash(s: str, prime: int, base: int = BASE) -> int:
+    value = 0
+    for char in s:
+        value = (value * base + ord(char)) % prime
+    return value
+
+
+class RabinKarpMatcher(CompiledPattern):
+    """
+    A pattern compiled for the Rabin-Karp algorithm: its hash is computed once.
+
+    A window whose hash equals the pattern hash is verified by comparing the
+    characters. With the default modulus of 101, about one window in 101
+    needs that, whatever the text; production() builds a matcher whose
+    windows almost never collide. With a second prime, a window is verified
+    only if both hashes match.
+
+    finditer() and the methods built on it take an optional ``stats`` dict,
+    to which they add the number of "windows" hashed, "verifications" and
+    "collisions" (verifications that found no match).
+    """
+
+    __slots__ = (
+        "prime", "base", "pattern_hash", "high_power", "second_prime", "second_base", "second_hash", "second_high_power"
+    )
+
+    def __init__(
+        self, pattern: str, prime: int = 101, base: int = BASE, second_prime: int = None, second_base: int = BASE
+    ):
+        super().__init__(pattern)
+        m = len(pattern)
+        object.__setattr__(self, "prime", prime)
+        object.__setattr__(self, "base", base)
+        object.__setattr__(self, "pattern_hash", _hash(pattern, prime, base))
+        # The weight of the character leaving the window, base ** (m - 1) modulo the prime.
+        object.__setattr__(self, "high_power", pow(base, m - 1, prime) if m else 0)
+        object.__setattr__(self, "second_prime", second_prime)
+        object.__setattr__(self, "second_base", second_base)
+        if second_prime is None:
+            object.__setattr__(self, "second_hash", None)
+            object.__setattr__(self, "second_high_power", None)
+        else:
+            object.__setattr__(self, "second_hash", _hash(pattern, second_prime, second_base))
+            object.__setattr__(self, "second_high_power", pow(second_base, m - 1, second_prime) if m else 0)
+
+    @classmethod
+    def production(cls, pattern: str, double: bool = False, seed=None) -> "RabinKarpMatcher":
+        """
+        A matcher modulo the Mersenne prime 2**61 - 1 with a random base.
+
+        Two distinct windows collide with a probability of about m / 2**61 for
+        a random base, whatever the text, so verifications are practically
+        only done for matches. With ``double``, a second hash modulo 2**31 - 1
+        with an independent random base must match too. ``seed`` makes the
+        bases reproducible.
+        """
+        rng = random.Random(seed)
+        if not double:
+            return cls(pattern, MERSENNE_PRIME, rng.randrange(BASE, MERSENNE_PRIME - 1))
+        return cls(
+            pattern,
+            MERSENNE_PRIME,
+            rng.randrange(BASE, MERSENNE_PRIME - 1),
+            SECOND_MERSENNE_PRIME,
+            rng.randrange(BASE, SECOND_MERSENNE_PRIME - 1),
+        )
+
+    def finditer(self, text: str, stats: dict = None):
+        """Yield the starting positions (0-indexed) of the pattern in the text, in order."""
+        m = len(self.pattern)
+        if m == 0 or m > len(text):
+            return
+        # Verifications and collisions, updated as the search goes.
+        counts = [0, 0]
+        search = self._single if self.second_prime is None else self._double
+        last = -1
+        completed = False
+        try:
+            for position in search(text, counts):
+                last = position
+                yield position
+            completed = True
+        finally:
+            if stats is not None:
+                # A search stopped early has hashed the windows up to the last match.
+                windows = len(text) - m + 1 if completed else last + 1
+                for key, value in (("windows", windows), ("verifications", counts[0]), ("collisions", counts[1])):
+                    stats[key] = stats.get(key, 0) + value
+
+    def _single(self, text, counts):
+        pattern = self.pattern
+        prime = self.prime
+        base = self.base
+        pattern_hash = self.pattern_hash
+        high_power = self.high_power
+        m = len(pattern)
+        n = len(text)
+        window_hash = _hash(text[:m], prime, base)
+        for i in range(n - m + 1):
+            if window_hash == pattern_hash:
+                counts[0] += 1
+                # Compares the window in place, without copying it.
+                if text.startswith(pattern, i):
+                    yield i
+                else:
+                    counts[1] += 1
+            if i + m < n:
+                window_hash = ((window_hash - ord(text[i]) * high_power) * base + ord(text[i + m])) % prime
+
+    def _double(self, text, counts):
+        pattern = self.pattern
+        prime, second_prime = self.prime, self.second_prime
+        base, second_base = self.base, self.second_base
+        pattern_hash, second_hash = self.pattern_hash, self.second_hash
+        high_power, second_high_power = self.high_power, self.second_high_power
+        m = len(pattern)
+        n = len(text)
+        window_hash = _hash(text[:m], prime, base)
+        second_window_hash = _hash(text[:m], second_prime, second_base)
+        for i in range(n - m + 1):
+            if window_hash == pattern_hash and second_window_hash == second_hash:
+                counts[0] += 1
+                if text.startswith(pattern, i):
+                    yield i
+                else:
+                    counts[1] += 1
+            if i + m < n:
+                leaving = ord(text[i])
+                entering = ord(text[i + m])
+                window_hash = ((window_hash - leaving * high_power) * base + entering) % prime
+                second_window_hash = (
+                    (second_window_hash - leaving * second_high_power) * second_base + entering
+                ) % second_prime
+
+    def findall(self, text: str, stats: dict = None) -> list[int]:
+        """A list of the starting positions (0-indexed) of the pattern in the text."""
+        return list(self.finditer(text, stats))
+
+    def count(self, text: str, stats: dict = None) -> int:
+        """Number of (possibly overlapping) occurrences of the pattern in the text."""
+        count = 0
+        for _ in self.finditer(text, stats):
+            count += 1
+        return count
+
+    def __reduce__(self):
+        return type(self), (self.pattern, self.prime, self.base, self.second_prime, self.second_base)
+
+    def __repr__(self):
+        arguments = [repr(self.pattern), str(self.prime), str(self.base)]
+        if self.second_prime is not None:
+            arguments += [str(self.second_prime), str(self.second_base)]
+        return f"{type(self).__name__}({', '.join(arguments)})"
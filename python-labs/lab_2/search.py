@@ -0,0 +1,125 @@
+"""
+A single front-end for the lab_2 pattern matching algorithms.
+
+search() picks an algorithm from the length of the pattern, the number of
+distinct characters in it and the length of the text, and Matcher
+preprocesses a pattern once for searching many texts. The thresholds below
+were measured with ``python -m lab_2.benchmarks calibrate`` (rounded over a
+few runs, the crossover points move by a step or two between runs).
+"""
+from lab_2.boyer_moore_algorithm import BoyerMooreMatcher, boyer_moore_pattern_match
+from lab_2.kmp_algorithm import KMPMatcher, kmp_pattern_match
+from lab_2.naive_pattern_matching import NaiveMatcher, naive_pattern_match
+from lab_2.rabin_karp_algorithm import RabinKarpMatcher, rabin_karp_pattern_match
+from lab_2.z_algorithm import ZMatcher, z_pattern_match
+
+ALGORITHMS = {
+    "naive": naive_pattern_match,
+    "rabin_karp": rabin_karp_pattern_match,
+    "kmp": kmp_pattern_match,
+    "z": z_pattern_match,
+    "boyer_moore": boyer_moore_pattern_match,
+}
+
+# Boyer-Moore is chosen for patterns of at least this many characters, by the
+# number of distinct characters in the pattern: the first entry whose
+# alphabet size is at least the pattern's applies. KMP is chosen otherwise.
+BOYER_MOORE_MIN_LENGTH = ((4, 32), (None, 8))
+# search() uses the naive algorithm, which needs no preprocessing, for texts
+# shorter than this many times the length of the pattern.
+NAIVE_MAX_TEXT_RATIO = 6
+
+# The compiled matcher classes, by algorithm.
+_COMPILED = {
+    "naive": NaiveMatcher,
+    "rabin_karp": RabinKarpMatcher,
+    "kmp": KMPMatcher,
+    "z": ZMatcher,
+    "boyer_moore": BoyerMooreMatcher,
+}
+
+
+def choose_algorithm(pattern_length: int, alphabet_size: int, text_length: int = None) -> str:
+    """
+    Name of the algorithm expected to be the fastest for a search.
+
+    Args:
+        pattern_length: Length of the pattern
+        alphabet_size: Number of distinct characters in the pattern
+        text_length: Length of the text, or None when the pattern is preprocessed for any text
+
+    Returns:
+        A key of ALGORITHMS
+    """
+    if text_length is not None and text_length < NAIVE_MAX_TEXT_RATIO * pattern_length:
+        return "naive"
+    for max_alphabet_size, min_length in BOYER_MOORE_MIN_LENGTH:
+        if max_alphabet_size is None or alphabet_size <= max_alphabet_size:
+            return "boyer_moore" if pattern_length >= min_length else "kmp"
+
+
+def _algorithm(algorithm, pattern, text_length=None):
+    if algorithm == "auto":
+        return choose_algorithm(len(pattern), len(set(pattern)), text_length)
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, expected 'auto' or one of {', '.join(ALGORITHMS)}")
+    return algorithm
+
+
+def search(text: str, pattern: str, algorithm: str = "auto") -> list[int]:
+    """
+    Find all occurrences of a pattern in a text.
+
+    Args:
+        text: The text to search in
+        pattern: The pattern to search for
+        algorithm: A key of ALGORITHMS, or "auto" to let choose_algorithm() pick one
+
+    Returns:
+        A list of starting positions (0-indexed) where the pattern was found in the text
+    """
+    return list(iter_search(text, pattern, algorithm))
+
+
+def iter_search(text: str, pattern: str, algorithm: str = "auto"):
+    """Yield the positions of search() one by one, without building a list."""
+    return _COMPILED[_algorithm(algorithm, pattern, len(text))](pattern).finditer(text)
+
+
+def count_search(text: str, pattern: str, algorithm: str = "auto") -> int:
+    """Number of positions search() would return, without building a list."""
+    return _COMPILED[_algorithm(algorithm, pattern, len(text))](pattern).count(text)
+
+
+class Matcher:
+    """
+    A pattern preprocessed for one algorithm, to be searched for in many texts.
+
+    The tables of the algorithm (the LPS array of KMP, the Z array of the
+    pattern, the Boyer-Moore shift tables or the Rabin-Karp pattern hash) are
+    computed once, in the constructor, by the compiled matcher of the
+    algorithm, ``compiled``. With "auto", the algorithm is chosen without
+    regard to the text length.
+    """
+
+    __slots__ = ("pattern", "algorithm", "compiled")
+
+    def __init__(self, pattern: str, algorithm: str = "auto"):
+        self.pattern = pattern
+        self.algorithm = _algorithm(algorithm, pattern)
+        self.compiled = _COMPILED[self.algorithm](pattern)
+
+    def search(self, text: str) -> list[int]:
+        """Starting positions (0-indexed) of the pattern in the text, see search()."""
+        return self.compiled.findall(text)
+
+    def finditer(self, text: str):
+        """Yield the starting positions one by one, see iter_search()."""
+        return self.compiled.finditer(text)
+
+    def count(self, text: str) -> int:
+        """Number of occurrences of the pattern in the text, see count_search()."""
+        return self.compiled.count(text)
+
+    def __repr__(self):
+        return f"Matcher({self.pattern!r}, {self.algorithm!r})"
@@ -0,0 +1,3 @@
+def expected_positions(text, pattern):
+    """All starting positions of a non-empty pattern in a str or bytes text, by brute force; none for an empty one."""
+    return [i for i in range(len(text) - len(pattern) + 1) if text.startswith(pattern, i)] if pattern else []
@@ -0,0 +1,91 @@
+import pickle
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from lab_2 import boyer_moore_algorithm, kmp_algorithm, naive_pattern_matching, rabin_karp_algorithm, z_algorithm
+from lab_2.boyer_moore_algorithm import BoyerMooreMatcher
+from lab_2.compiled_pattern import CompiledPattern
+from lab_2.kmp_algorithm import KMPMatcher
+from lab_2.naive_pattern_matching import NaiveMatcher
+from lab_2.rabin_karp_algorithm import RabinKarpMatcher
+from lab_2.tests.helpers import expected_positions
+from lab_2.z_algorithm import ZMatcher
+
+MATCHERS = [NaiveMatcher, RabinKarpMatcher, KMPMatcher, BoyerMooreMatcher, ZMatcher]
+FUNCTIONS = [
+    (naive_pattern_matching, "naive"),
+    (rabin_karp_algorithm, "rabin_karp"),
+    (kmp_algorithm, "kmp"),
+    (boyer_moore_algorithm, "boyer_moore"),
+    (z_algorithm, "z"),
+]
+
+
+class TestCompiledPattern:
+    @pytest.mark.parametrize("matcher_class", MATCHERS)
+    def test_finditer_and_count(self, matcher_class):
+        matcher = matcher_class("ABA")
+        assert list(matcher.finditer("ABABABABABA")) == [0, 2, 4, 6, 8]
+        assert matcher.findall("ABABABABABA") == [0, 2, 4, 6, 8]
+        assert matcher.count("ABABABABABA") == 5
+        assert matcher.count("XYZ") == 0
+        assert next(matcher.finditer("XXABAXABA")) == 2
+        assert matcher_class("").count("ABC") == 0
+
+        rng = random.Random(0)
+        for _ in range(300):
+            text = "".join(rng.choice("ab") for _ in range(rng.randint(0, 40)))
+            pattern = "".join(rng.choice("ab") for _ in range(rng.randint(1, 5)))
+            matcher = matcher_class(pattern)
+            assert matcher.findall(text) == expected_positions(text, pattern), (text, pattern)
+            assert matcher.count(text) == len(expected_positions(text, pattern))
+
+    @pytest.mark.parametrize("module, name", FUNCTIONS)
+    def test_iter_and_count_functions(self, module, name):
+        iter_function = getattr(module, f"iter_{name}_pattern_match")
+        count_function = getattr(module, f"count_{name}_pattern_match")
+        positions = iter_function("ABABABABABA", "ABA")
+        assert next(positions) == 0
+        assert next(positions) == 2
+        assert list(positions) == [4, 6, 8]
+        assert count_function("ABABABABABA", "ABA") == 5
+        assert count_function("ABABABABABA", "") == 0
+        assert list(iter_function("", "ABC")) == []
+
+    def test_tables(self):
+        assert KMPMatcher("ABABACA").lps == (0, 0, 1, 2, 3, 0, 1)
+        assert ZMatcher("aaaaaa").z == (0, 5, 4, 3, 2, 1)
+        matcher = BoyerMooreMatcher("AAAA")
+        assert matcher.good_suffix == (1, 1, 2, 3, 4)
+        assert matcher.bad_character == {"A": 3}
+        assert RabinKarpMatcher("AB", 101).pattern_hash == (65 * 256 + 66) % 101
+
+    @pytest.mark.parametrize("matcher_class", MATCHERS)
+    def test_immutable(self, matcher_class):
+        matcher = matcher_class("ABC")
+        with pytest.raises(AttributeError):
+            matcher.pattern = "XYZ"
+        with pytest.raises(AttributeError):
+            del matcher.pattern
+        if matcher_class is BoyerMooreMatcher:
+            with pytest.raises(TypeError):
+                matcher.bad_character["X"] = 0
+        copy = pickle.loads(pickle.dumps(matcher))
+        assert copy.pattern == "ABC" and copy.findall("ABCABC") == [0, 3]
+        assert pickle.loads(pickle.dumps(RabinKarpMatcher("ABC", 3))).prime == 3
+
+    def test_abstract_base(self):
+        with pytest.raises(TypeError):
+            CompiledPattern("ABC")
+        assert all(issubclass(matcher_class, CompiledPattern) for matcher_class in MATCHERS)
+
+    @pytest.mark.parametrize("matcher_class", MATCHERS)
+    def test_shared_between_threads(self, matcher_class):
+        matcher = matcher_class("abab")
+        rng = random.Random(0)
+        texts = ["".join(rng.choice("ab") for _ in range(2000)) for _ in range(32)]
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(matcher.findall, texts))
+        assert results == [expected_positions(text, "abab") for text in texts]
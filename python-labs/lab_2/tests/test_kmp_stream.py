@@ -0,0 +1,56 @@
+import io
+import mmap
+import random
+import socket
+import threading
+
+from lab_2.kmp_algorithm import KMPStream
+from lab_2.tests.helpers import expected_positions
+
+
+class TestKMPStream:
+    def test_chunk_boundaries(self):
+        stream = KMPStream(b"ABAB")
+        assert stream.feed(b"xxAB") == []
+        assert stream.matched == 2
+        assert stream.feed(b"A") == []
+        assert stream.feed(b"BABxAB") == [2, 4]
+        assert stream.offset == 11
+
+        rng = random.Random(0)
+        for _ in range(500):
+            text = "".join(rng.choice("ab") for _ in range(rng.randint(0, 80)))
+            pattern = "".join(rng.choice("ab") for _ in range(rng.randint(1, 6)))
+            cuts = sorted(rng.randint(0, len(text)) for _ in range(rng.randint(0, 10)))
+            stream = KMPStream(pattern)
+            chunks = [text[start:end] for start, end in zip([0, *cuts], [*cuts, len(text)])]
+            assert list(stream.scan(chunks)) == expected_positions(text, pattern), (text, pattern, chunks)
+
+    def test_reset(self):
+        stream = KMPStream("abc")
+        assert stream.feed("xab") == []
+        stream.reset()
+        assert stream.feed("cabc") == [1]
+
+    def test_sources(self, tmp_path):
+        data = b"needle" + b"hay" * 5000 + b"needle" + b"hay" * 3000 + b"needleneedle"
+        expected = expected_positions(data, b"needle")
+
+        assert list(KMPStream(b"needle").scan(io.BytesIO(data), chunk_size=7)) == expected
+
+        path = tmp_path / "haystack.txt"
+        path.write_bytes(data)
+        with open(path, "rb") as file:
+            assert list(KMPStream(b"needle").scan(file, chunk_size=1000)) == expected
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            assert list(KMPStream(b"needle").scan(mapped, chunk_size=1000)) == expected
+            assert KMPStream(b"needle").feed(mapped) == expected
+
+        sender, receiver = socket.socketpair()
+        thread = threading.Thread(target=lambda: (sender.sendall(data), sender.close()))
+        thread.start()
+        try:
+            assert list(KMPStream(b"needle").scan(receiver, chunk_size=512)) == expected
+        finally:
+            thread.join()
+            receiver.close()
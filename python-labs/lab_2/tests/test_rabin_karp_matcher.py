@@ -0,0 +1,52 @@
+import pickle
+
+from lab_2.rabin_karp_algorithm import MERSENNE_PRIME, SECOND_MERSENNE_PRIME, RabinKarpMatcher
+
+
+class TestRabinKarpMatcher:
+    def test_collision_statistics(self):
+        # "D" is "A" + 3, so every window has the hash of "AAAA" modulo 3.
+        text = "AAADAAAA"
+        stats = {}
+        assert RabinKarpMatcher("AAAA", prime=3).findall(text, stats) == [4]
+        assert stats == {"windows": 5, "verifications": 5, "collisions": 4}
+
+        # Counts add up over several searches.
+        RabinKarpMatcher("AAAA", prime=3).count(text, stats)
+        assert stats["windows"] == 10
+
+    def test_early_exit_statistics(self):
+        stats = {}
+        positions = RabinKarpMatcher.production("AB").finditer("xxABxxAB", stats)
+        assert next(positions) == 2
+        positions.close()
+        assert stats == {"windows": 3, "verifications": 1, "collisions": 0}
+
+    def test_production(self):
+        matcher = RabinKarpMatcher.production("zadanie", seed=1)
+        assert matcher.prime == MERSENNE_PRIME
+        assert matcher.second_prime is None
+        assert RabinKarpMatcher.production("zadanie", seed=1).base == matcher.base
+        double = RabinKarpMatcher.production("zadanie", double=True, seed=1)
+        assert double.second_prime == SECOND_MERSENNE_PRIME
+
+        text = "Zadanie 1: zadanie domowe. Kolejne zadanie, zadaniem jest zadanie." * 50
+        for candidate in (matcher, double):
+            stats = {}
+            positions = candidate.findall(text, stats)
+            assert positions == RabinKarpMatcher("zadanie").findall(text)
+            assert stats["collisions"] == 0
+            assert stats["verifications"] == len(positions)
+
+        # A colliding window modulo 101 differs from the pattern only by 101 in one character.
+        colliding = "a" * 10 + chr(ord("a") + 101) + "a" * 10
+        assert RabinKarpMatcher(colliding).count("a" * 100, stats := {}) == 0
+        assert stats["collisions"] == 80
+        assert RabinKarpMatcher.production(colliding).count("a" * 100, stats := {}) == 0
+        assert stats["collisions"] == 0
+
+    def test_pickle(self):
+        matcher = RabinKarpMatcher.production("abc", double=True)
+        copy = pickle.loads(pickle.dumps(matcher))
+        assert (copy.base, copy.second_base) == (matcher.base, matcher.second_base)
+        assert copy.findall("abcabc") == [0, 3]
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from lab_2.search import ALGORITHMS, Matcher, choose_algorithm, count_search, iter_search, search
+from lab_2.tests.helpers import expected_positions
+
+
+class TestSearch:
+    def test_choose_algorithm(self):
+        assert choose_algorithm(4, 2) == "kmp"
+        assert choose_algorithm(64, 2) == "boyer_moore"
+        assert choose_algorithm(16, 4) == "kmp"
+        assert choose_algorithm(16, 12) == "boyer_moore"
+        assert choose_algorithm(16, 12, text_length=1_000_000) == "boyer_moore"
+        assert choose_algorithm(16, 12, text_length=20) == "naive"
+
+    def test_all_algorithms_agree(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            alphabet = rng.choice(["ab", "abc", "abcdefgh"])
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+            pattern = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 8)))
+            expected = expected_positions(text, pattern)
+            for algorithm in ["auto", *ALGORITHMS]:
+                assert search(text, pattern, algorithm) == expected, (algorithm, text, pattern)
+                assert Matcher(pattern, algorithm).search(text) == expected, (algorithm, text, pattern)
+                assert list(iter_search(text, pattern, algorithm)) == expected
+                assert count_search(text, pattern, algorithm) == len(expected)
+
+    def test_matcher(self):
+        matcher = Matcher("ABABC")
+        assert matcher.algorithm == "kmp"
+        assert matcher.search("ABABDABACDABABCABAB") == [10]
+        assert matcher.search("ABABCABABC") == [0, 5]
+        assert matcher.search("") == []
+        assert matcher.count("ABABCABABC") == 2
+        assert next(matcher.finditer("ABABCABABC")) == 0
+        assert Matcher("", "boyer_moore").search("ABC") == []
+        assert Matcher("special_characters$").algorithm == "boyer_moore"
+
+    def test_unknown_algorithm(self):
+        with pytest.raises(ValueError):
+            search("ABC", "A", "sunday")
+        with pytest.raises(ValueError):
+            Matcher("A", "sunday")
@@ -1,3 +1,6 @@
+from lab_2.compiled_pattern import CompiledPattern
+
+
 def compute_z_array(s: str) -> list[int]:
     """
     Compute the Z array for a string.
@@ -11,13 +14,24 @@ def compute_z_array(s: str) -> list[int]:
     Returns:
         The Z array for the string
     """
-    # TODO: Implement the Z-array computation
+    # DONE: Implement the Z-array computation
     # For each position i:
     # - Calculate the length of the longest substring starting at i that is also a prefix of s
     # - Use the Z-box technique to avoid redundant character comparisons
     # - Handle the cases when i is inside or outside the current Z-box
 
-    return [0] * len(s)
+    n = len(s)
+    z = [0] * n
+    # The Z-box [left, right) is the rightmost substring found so far that is a prefix of s.
+    left = right = 0
+    for i in range(1, n):
+        if i < right:
+            z[i] = min(z[i - left], right - i)
+        while i + z[i] < n and s[z[i]] == s[i + z[i]]:
+            z[i] += 1
+        if i + z[i] > right:
+            left, right = i, i + z[i]
+    return z
 
 
 def z_pattern_match(text: str, pattern: str) -> list[int]:
@@ -31,11 +45,58 @@ def z_pattern_match(text: str, pattern: str) -> list[int]:
     Returns:
         A list of starting positions (0-indexed) where the pattern was found in the text
     """
-    # TODO: Implement pattern matching using the Z algorithm
+    # DONE: Implement pattern matching using the Z algorithm
     # 1. Create a concatenated string: pattern + special_character + text
     # 2. Compute the Z array for this concatenated string
     # 3. Find positions where Z[i] equals the pattern length
     # 4. Convert these positions in the concatenated string to positions in the original text
     # 5. Return all positions where the pattern is found in the text
 
-    return []
\ No newline at end of file
+    return list(iter_z_pattern_match(text, pattern))
+
+
+def iter_z_pattern_match(text: str, pattern: str):
+    """Yield the positions of z_pattern_match() one by one, without building a list."""
+    return ZMatcher(pattern).finditer(text)
+
+
+def count_z_pattern_match(text: str, pattern: str) -> int:
+    """Number of positions z_pattern_match() would return, without building a list."""
+    return ZMatcher(pattern).count(text)
+
+
+class ZMatcher(CompiledPattern):
+    """
+    A pattern compiled for the Z algorithm: the Z array of the pattern is computed once.
+
+    A search computes the rest of the Z array of pattern + separator + text,
+    without building the concatenation.
+    """
+
+    __slots__ = ("z",)
+
+    def __init__(self, pattern: str):
+        super().__init__(pattern)
+        object.__setattr__(self, "z", tuple(compute_z_array(pattern)))
+
+    def finditer(self, text: str):
+        """Yield the starting positions (0-indexed) of the pattern in the text, in order."""
+        pattern = self.pattern
+        pattern_z = self.z
+        m = len(pattern)
+        n = len(text)
+        if m == 0 or m > n:
+            return
+        # The Z-box [left, right) of the text part, text[left:right] == pattern[:right - left].
+        # The separator caps the Z values in the text part at m.
+        left = right = 0
+        for i in range(n - m + 1):
+            z = 0
+            if i < right:
+                z = min(pattern_z[i - left], right - i)
+            if i + z >= right:
+                while z < m and i + z < n and text[i + z] == pattern[z]:
+                    z += 1
+                left, right = i, i + z
+            if z == m:
+                yield i
\ No newline at end of file